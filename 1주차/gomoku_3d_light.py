@@ -1,19 +1,55 @@
 import pygame
 import numpy as np
-import random
-import math
 import sys
 import os
+import time
+import argparse
+import hashlib
+from collections import OrderedDict
+from contextlib import contextmanager
 
-# Pygame 초기화
-pygame.init()
-pygame.mixer.init()  # 사운드 초기화
+from gomoku_engine import GomokuEngine, BOARD_SIZE, DIFFICULTIES
+from gomoku_record import GameWriter, UNFINISHED, engine_result
+from gomoku_server import NetClient, DEFAULT_PORT
+from gomoku_sparse import FREE_BOARD_SIZE
+from gomoku_worker import AIWorker, AnalysisWorker
+
+class StartupProfile:
+    """시작 단계별 소요 시간 기록"""
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = []  # (단계, 초)
+    
+    @contextmanager
+    def stage(self, name):
+        """with 블록의 소요 시간을 name 단계로 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+    
+    def report(self, assets=None):
+        """단계별 시간과 전체 시간, 그때까지 로드한 자원 출력"""
+        total = time.perf_counter() - self.start
+        print(f"시작 시간: {total * 1000:.0f}ms")
+        for name, elapsed in self.stages:
+            print(f"  {name:<12} {elapsed * 1000:7.1f}ms")
+        if assets is not None:
+            assets.report()
 
-# 화면 설정
-SCREEN_WIDTH = 1200
-SCREEN_HEIGHT = 800
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption('3D 오목 게임 - Light Version')
+startup_profile = StartupProfile()
+
+# Pygame 초기화
+with startup_profile.stage("pygame 초기화"):
+    pygame.init()
+    pygame.mixer.init()  # 사운드 초기화
+    
+    # 화면 설정
+    SCREEN_WIDTH = 1200
+    SCREEN_HEIGHT = 800
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption('3D 오목 게임 - Light Version')
 
 # 색상 정의
 BLACK = (0, 0, 0)
@@ -30,84 +66,472 @@ STONE_BLACK = (20, 20, 20)
 STONE_WHITE = (220, 220, 220)
 BOARD_COLOR = (222, 184, 135)
 
+# 처리한 이미지 등을 저장하는 캐시 폴더
+CACHE_DIR = os.environ.get("GOMOKU_CACHE_DIR",
+                           os.path.join(os.path.expanduser("~"), ".cache", "gomoku_3d"))
+
+# 둔 수를 바로 덧붙여 쓰는 대국 기록 파일 (python gomoku_record.py info|export로 확인)
+RECORD_PATH = os.environ.get("GOMOKU_RECORD", os.path.join(CACHE_DIR, "games.gmr"))
+
+# 한글 폰트 찾는 순서 (GOMOKU_FONT 환경 변수가 있으면 그것부터)
+FONT_SEARCH_PATHS = [
+    "C:/Windows/Fonts/malgun.ttf",                          # Windows: 맑은 고딕
+    "C:/Windows/Fonts/gulim.ttc",                           # Windows: 굴림
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",           # macOS
+    "/Library/Fonts/AppleGothic.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",      # Linux: 나눔고딕
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/google-noto-cjk/NotoSansCJK-Regular.ttc",
+]
+# 경로에 없으면 시스템 폰트 이름으로 찾음 (fc-list 등을 부르므로 느릴 수 있음)
+FONT_NAMES = ["malgungothic", "applesdgothicneo", "nanumgothic", "notosanscjkkr", "notosanskr"]
+
+def find_korean_font():
+    """한글 폰트 파일 경로, 없으면 None (pygame 기본 폰트 사용)"""
+    paths = FONT_SEARCH_PATHS
+    if os.environ.get("GOMOKU_FONT"):
+        paths = [os.environ["GOMOKU_FONT"]] + paths
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    for name in FONT_NAMES:
+        path = pygame.font.match_font(name)
+        if path:
+            return path
+    return None
+
+# 합성한 소리 (SOUND_FILE_CACHE가 켜져 있으면 CACHE_DIR에도 저장)
+SOUND_VERSION = 1  # 합성 방법을 바꾸면 올려서 파일 캐시를 무효화
+SOUND_FILE_CACHE = os.environ.get("GOMOKU_SOUND_CACHE") == "1"
+_SOUND_CACHE = {}
+
+def stone_sound_samples(sample_rate):
+    """돌 놓는 소리: 주파수와 크기가 감쇠하는 사인파 0.1초 (모노 int16)"""
+    t = np.arange(int(sample_rate * 0.1)) / sample_rate
+    frequency = 800 * np.exp(-t * 10)
+    return (32767 * 0.3 * np.sin(2 * np.pi * frequency * t) * np.exp(-t * 20)).astype(np.int16)
+
+def win_sound_samples(sample_rate):
+    """승리 팡파르: 상승하는 음계 0.5초 (모노 int16)"""
+    t = np.arange(int(sample_rate * 0.5)) / sample_rate
+    frequency = 440 + 200 * t
+    return (32767 * 0.2 * np.sin(2 * np.pi * frequency * t) * np.exp(-t * 2)).astype(np.int16)
+
 # 게임 설정
-BOARD_SIZE = 15
 CELL_SIZE = 35
 BOARD_OFFSET_X = 100
 BOARD_OFFSET_Y = 100
+VIEW_CELLS = 19  # 기본 확대에서 한 변에 보이는 최대 칸 수 (19x19까지는 보드 전체가 보임)
+VIEW_PIXELS = VIEW_CELLS * CELL_SIZE  # 보드를 그리는 정사각형 영역의 한 변 (픽셀)
 
-class Particle:
-    """폭죽 파티클 클래스"""
-    def __init__(self, x, y, color):
-        self.x = x
-        self.y = y
-        self.vx = random.uniform(-5, 5)
-        self.vy = random.uniform(-8, -2)
-        self.color = color
-        self.life = 60
-        self.max_life = 60
-        self.size = random.randint(2, 6)
+# 힌트 (H): 둘 차례 기준 수 점수 열지도와 AI 예상 수순
+HEAT_LEVELS = 8       # 열지도 색 단계 수
+HEAT_BITS = 15        # 로그 눈금의 끝 (5목 공격 점수 * 2의 비트 수)
+ANALYSIS_TIME = 1.0   # 국면마다 힌트 분석에 쓰는 탐색 시간 (초)
+PV_LENGTH = 6         # 보여줄 예상 수순 길이
+
+# 서버 메시지가 오면 받는 스레드가 올리는 이벤트 (잠든 메인 루프를 깨움)
+NET_EVENT = pygame.USEREVENT + 1
+# 참가 실패나 서버 AI 실패처럼 대국을 이어갈 수 없는 서버 오류
+NET_FATAL_ERRORS = {"bad-size", "bad-difficulty", "game-exists", "size-mismatch", "game-full",
+                    "ai-failed"}
+
+# 게임 중 방향키 -> 보드 창 스크롤 (칸)
+VIEW_SCROLL_KEYS = {
+    pygame.K_LEFT: (-1, 0), pygame.K_RIGHT: (1, 0),
+    pygame.K_UP: (0, -1), pygame.K_DOWN: (0, 1),
+}
+
+def star_points(size):
+    """별점 좌표 (15x15: 3, 7, 11 / 19x19: 3, 9, 15)"""
+    if size < 13:
+        return [size // 2]
+    return [3, size // 2, size - 4]
+
+class ParticleSystem:
+    """폭죽 파티클 (위치, 속도, 수명, 크기, 색을 NumPy 배열로 한꺼번에 갱신)"""
+    MAX_LIFE = 60
+    MAX_RADIUS = 6
+    ALPHA_LEVELS = 16  # 투명도 단계 (단계별 스프라이트를 캐시)
+    
+    def __init__(self):
+        self.rng = np.random.default_rng()
+        self.palette = []   # 색 번호 -> (r, g, b)
+        self.sprites = []   # 스프라이트 번호 (색, 반지름, 투명도 단계) -> Surface 또는 None
+        self.clear()
+    
+    def clear(self):
+        """모든 파티클 제거"""
+        self.pos = np.zeros((0, 2))
+        self.vel = np.zeros((0, 2))
+        self.life = np.zeros(0, dtype=int)
+        self.size = np.zeros(0)
+        self.color = np.zeros(0, dtype=int)  # palette 번호
+    
+    def __len__(self):
+        return len(self.life)
+    
+    def color_index(self, color):
+        """색의 palette 번호 (처음 보는 색이면 추가)"""
+        color = tuple(color)
+        if color not in self.palette:
+            self.palette.append(color)
+            self.sprites += [None] * ((self.MAX_RADIUS + 1) * self.ALPHA_LEVELS)
+        return self.palette.index(color)
+    
+    def emit(self, x, y, count, colors):
+        """(x, y)에서 count개 터뜨리기 (색은 colors 중 무작위)"""
+        rng = self.rng
+        indices = np.array([self.color_index(color) for color in colors])
+        vel = np.column_stack([rng.uniform(-5, 5, count), rng.uniform(-8, -2, count)])
+        self.pos = np.concatenate([self.pos, np.tile([x, y], (count, 1))])
+        self.vel = np.concatenate([self.vel, vel])
+        self.life = np.concatenate([self.life, np.full(count, self.MAX_LIFE)])
+        self.size = np.concatenate([self.size, rng.integers(2, self.MAX_RADIUS + 1, count).astype(float)])
+        self.color = np.concatenate([self.color, indices[rng.integers(0, len(colors), count)]])
     
     def update(self):
-        self.x += self.vx
-        self.y += self.vy
-        self.vy += 0.3  # 중력
+        """한 프레임 이동 (중력, 수명, 크기 감소) 후 죽은 파티클을 마스크로 한 번에 제거"""
+        if not len(self):
+            return
+        self.pos += self.vel
+        self.vel[:, 1] += 0.3  # 중력
         self.life -= 1
-        self.size = max(0, self.size - 0.1)
+        np.maximum(self.size - 0.1, 0, out=self.size)
+        alive = self.life > 0
+        if not alive.all():
+            self.pos, self.vel = self.pos[alive], self.vel[alive]
+            self.life, self.size, self.color = self.life[alive], self.size[alive], self.color[alive]
+    
+    def make_sprite(self, key):
+        """스프라이트 번호의 반투명 원 생성"""
+        index, level = divmod(key, self.ALPHA_LEVELS)
+        color, radius = divmod(index, self.MAX_RADIUS + 1)
+        alpha = 255 * level // (self.ALPHA_LEVELS - 1)
+        sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, (*self.palette[color], alpha), (radius, radius), radius)
+        self.sprites[key] = sprite
     
-    def draw(self, screen):
-        if self.life > 0:
-            alpha = int(255 * (self.life / self.max_life))
-            color = (*self.color, alpha)
-            pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(self.size))
+    def draw(self, surface):
+        """남은 수명에 비례해 흐려지는 원을 blits 한 번으로 그림"""
+        radius = self.size.astype(int)
+        visible = radius > 0
+        if not visible.any():
+            return
+        radius = radius[visible]
+        level = self.life[visible] * (self.ALPHA_LEVELS - 1) // self.MAX_LIFE
+        keys = ((self.color[visible] * (self.MAX_RADIUS + 1) + radius) * self.ALPHA_LEVELS + level)
+        for key in np.unique(keys).tolist():
+            if self.sprites[key] is None:
+                self.make_sprite(key)
+        corner = (self.pos[visible].astype(int) - radius[:, None]).tolist()
+        sprites = self.sprites
+        surface.blits([(sprites[key], xy) for key, xy in zip(keys.tolist(), corner)], doreturn=False)
+    
+    def bounds(self):
+        """모든 파티클을 덮는 영역 (없으면 None)"""
+        if not len(self):
+            return None
+        reach = self.size.astype(int)[:, None] + 1
+        low = (self.pos.astype(int) - reach).min(axis=0)
+        high = (self.pos.astype(int) + reach).max(axis=0)
+        return pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]) + 1, int(high[1] - low[1]) + 1)
 
-class Gomoku3DLight:
+class TextCache:
+    """글자 서피스 캐시: (글자, 글꼴, 색)별로 한 번만 렌더링하고 오래 안 쓴 것부터 버림"""
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+    
+    def render(self, font, text, color):
+        """font.render(text, True, color)와 같은 서피스 (캐시에 없을 때만 렌더링)"""
+        key = (text, font, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+class LoopStats:
+    """메인 루프 상태별 초당 프레임 수와 CPU 사용률 (5초마다 출력)"""
+    def __init__(self, interval=5.0):
+        self.interval = interval
+        self.totals = {}  # 상태 -> [프레임 수, 경과 시간, CPU 시간]
+        self.last_wall = time.perf_counter()
+        self.last_cpu = time.process_time()
+        self.last_report = self.last_wall
+    
+    def frame(self, state):
+        """한 바퀴 끝: 지난 바퀴부터의 시간을 state에 더함"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        total = self.totals.setdefault(state, [0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += wall - self.last_wall
+        total[2] += cpu - self.last_cpu
+        self.last_wall, self.last_cpu = wall, cpu
+        if wall - self.last_report >= self.interval:
+            self.report()
+            self.totals = {}
+            self.last_report = wall
+    
+    def report(self):
+        """상태별 FPS, CPU 사용률 출력"""
+        for state, (frames, wall, cpu) in sorted(self.totals.items()):
+            if wall > 0:
+                print(f"[루프] {state:<9} {frames / wall:6.1f} fps, CPU {cpu / wall * 100:5.1f}% "
+                      f"({wall:.1f}초)")
+
+class AssetManager:
+    """폰트, 소리, 이미지를 처음 쓸 때 만들고 로드 시간을 기록"""
+    def __init__(self):
+        self.loaders = {}   # 이름 -> 만드는 함수
+        self.assets = {}    # 이름 -> 만든 자원 (실패하면 None)
+        self.loads = []     # (이름, 로드 시간, 시작 후 경과 시간) 로드할 때마다 추가
+        self.verbose = False  # True면 로드할 때마다 출력
+    
+    def register(self, name, loader):
+        """name 자원을 만드는 함수 등록 (아직 만들지 않음)"""
+        self.loaders[name] = loader
+        self.assets.pop(name, None)
+    
+    def get(self, name):
+        """name 자원 (처음이면 만들어서 기록)"""
+        if name not in self.assets:
+            start = time.perf_counter()
+            try:
+                asset = self.loaders[name]()
+            except Exception as e:
+                print(f"자원 로드 실패 ({name}): {e}")
+                asset = None
+            self.assets[name] = asset
+            elapsed = time.perf_counter() - start
+            self.loads.append((name, elapsed, time.perf_counter() - startup_profile.start))
+            if self.verbose:
+                print(f"[자원] {name:<16} {elapsed * 1000:7.1f}ms")
+        return self.assets[name]
+    
+    def reset(self, name):
+        """name 자원을 버려 다음에 쓸 때 다시 만들게 함"""
+        self.assets.pop(name, None)
+    
+    def discard(self, name):
+        """name 자원을 로드에 실패한 것처럼 None으로 두어 이번 실행에서는 다시 만들지 않음"""
+        self.assets[name] = None
+    
+    def peek(self, name):
+        """이미 만든 name 자원 (아직 안 만들었으면 만들지 않고 None)"""
+        return self.assets.get(name)
+    
+    def report(self):
+        """지금까지의 자원 로드 기록 출력"""
+        total = sum(elapsed for _, elapsed, _ in self.loads)
+        print(f"자원 로드 {len(self.loads)}번, {total * 1000:.1f}ms "
+              f"(아직 안 쓴 자원: {', '.join(sorted(set(self.loaders) - set(self.assets))) or '없음'})")
+        for name, elapsed, at in self.loads:
+            print(f"  {name:<16} {elapsed * 1000:7.1f}ms  ({at * 1000:.0f}ms 시점)")
+
+class Viewport:
+    """보드 중 화면에 보이는 정사각형 창 (왼쪽 위 칸, 칸 크기)
+
+    보드가 창보다 크거나 확대했을 때는 방향키/오른쪽 드래그로 스크롤하고 휠로 확대/축소한다.
+    보이는 칸만 그리므로 그리는 비용이 보드 크기와 무관하다.
+    """
+    MIN_CELL = 15
+    MAX_CELL = 60
+    ZOOM_STEP = 5
+    
+    def __init__(self, board_size, cell=CELL_SIZE):
+        self.board_size = board_size
+        self.cell = cell
+        self.x0 = self.y0 = 0
+        self.center_on(board_size // 2, board_size // 2)
+    
+    @property
+    def count(self):
+        """한 변에 보이는 칸 수"""
+        return min(self.board_size, VIEW_PIXELS // self.cell)
+    
+    def state(self):
+        """그린 화면을 다시 써도 되는지 비교할 값"""
+        return self.x0, self.y0, self.cell
+    
+    def clamp(self):
+        """창이 보드 밖으로 나가지 않게 함"""
+        limit = self.board_size - self.count
+        self.x0 = max(0, min(self.x0, limit))
+        self.y0 = max(0, min(self.y0, limit))
+    
+    def center_on(self, x, y):
+        """(x, y)가 창 가운데 오게 함"""
+        self.x0 = x - self.count // 2
+        self.y0 = y - self.count // 2
+        self.clamp()
+    
+    def scroll(self, dx, dy):
+        """칸 단위 스크롤"""
+        self.x0 += dx
+        self.y0 += dy
+        self.clamp()
+    
+    def zoom(self, steps, anchor):
+        """steps만큼 확대(+)/축소(-), 화면 좌표 anchor 아래의 칸은 제자리에 둠"""
+        cell = max(self.MIN_CELL, min(self.MAX_CELL, self.cell + steps * self.ZOOM_STEP))
+        board_x = self.x0 + (anchor[0] - BOARD_OFFSET_X) / self.cell
+        board_y = self.y0 + (anchor[1] - BOARD_OFFSET_Y) / self.cell
+        self.cell = cell
+        self.x0 = round(board_x - (anchor[0] - BOARD_OFFSET_X) / cell)
+        self.y0 = round(board_y - (anchor[1] - BOARD_OFFSET_Y) / cell)
+        self.clamp()
+    
+    def contains(self, x, y):
+        """(x, y) 칸이 창 안에 보이는지"""
+        count = self.count
+        return self.x0 <= x < self.x0 + count and self.y0 <= y < self.y0 + count
+    
+    def to_screen(self, x, y):
+        """보드 칸 -> 화면 좌표 (교차점 중심)"""
+        return (BOARD_OFFSET_X + (x - self.x0) * self.cell,
+                BOARD_OFFSET_Y + (y - self.y0) * self.cell)
+    
+    def to_board(self, px, py):
+        """화면 좌표 -> 가장 가까운 보이는 칸 (보드 영역 밖이면 None)"""
+        size = self.count * self.cell
+        if not (BOARD_OFFSET_X <= px <= BOARD_OFFSET_X + size and
+                BOARD_OFFSET_Y <= py <= BOARD_OFFSET_Y + size):
+            return None
+        x = round((px - BOARD_OFFSET_X) / self.cell) + self.x0
+        y = round((py - BOARD_OFFSET_Y) / self.cell) + self.y0
+        return (x, y) if self.contains(x, y) else None
+
+def heat_level(score):
+    """수 점수 -> 열지도 단계 (0이면 표시 안 함, 로그 눈금이라 전체를 다시 맞출 필요가 없음)"""
+    if score <= 0:
+        return 0
+    return min(HEAT_LEVELS, 1 + (score.bit_length() - 1) * HEAT_LEVELS // HEAT_BITS)
+
+class HeatMap:
+    """둘 차례 기준 칸별 수 점수 단계 (엔진 평가기가 수마다 갱신해 둔 점수를 읽음)
+
+    새 수가 있으면 지난번에 색이 있던 칸과 새 수 주변(평가기가 점수를 바꾼 칸)만 다시 계산한다.
+    돌에서 먼 칸은 점수가 0인 채로 바뀌지 않으므로 보지 않는다.
+    """
     def __init__(self):
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-        self.current_player = 1  # 1: 흑, 2: 백
-        self.game_over = False
-        self.winner = None
-        self.last_move = None
+        self.levels = {}    # 칸 번호 -> 단계 (0이 아닌 칸만)
+        self.moves = None   # levels를 계산한 수순 (None이면 처음부터 계산)
+    
+    def reset(self):
+        """다음 update에서 처음부터 계산"""
+        self.levels = {}
+        self.moves = None
+    
+    def update(self, engine):
+        """단계가 바뀐 칸 목록 [(x, y)], 처음부터 계산했으면 None"""
+        history = engine.history
+        if self.moves == history:
+            return []
+        evaluator = engine.evaluator
+        size = engine.board_size
+        full = self.moves is None or history[:len(self.moves)] != self.moves
+        if full:
+            if getattr(engine.board, "sparse", False):
+                cells = set(evaluator.scores[1]) | set(evaluator.scores[2])
+            else:
+                cells = range(size * size)
+            old = {}
+        else:
+            # 차례가 바뀌면 공격/방어가 뒤바뀌므로 색이 있던 칸은 모두 다시 봄
+            cells = set(self.levels)
+            for x, y, _ in history[len(self.moves):]:
+                c = x * size + y
+                cells.add(c)
+                for per_cell in evaluator.neighbors:
+                    cells.update(nc for nc, _ in per_cell[c])
+            old = self.levels
+        player = engine.current_player
+        own, other = evaluator.scores[player], evaluator.scores[3 - player]
+        occupied = evaluator.occupied
+        levels = {}
+        changed = []
+        for c in cells:
+            level = 0 if engine.game_over or occupied[c] else heat_level(own[c] * 2 + other[c])
+            if level:
+                levels[c] = level
+            if level != old.get(c, 0):
+                changed.append(divmod(c, size))
+        self.levels = levels  # 다시 보지 않은 칸은 0 그대로
+        self.moves = list(history)
+        return None if full else changed
+
+class Gomoku3DLight:
+    def __init__(self, board_size=BOARD_SIZE, record_path=RECORD_PATH, search_workers=1):
+        self.board_size = board_size  # 19보다 크면 일부만 보이고 스크롤 (희소 보드)
+        self.search_workers = search_workers  # "상" 탐색 프로세스 수 (2 이상이면 병렬 탐색)
+        self.record_path = record_path  # None이면 대국을 기록하지 않음
+        self.viewport = Viewport(board_size)
+        self.drag_start = None  # 오른쪽 드래그 시작 (마우스 위치, x0, y0)
         self.ai_mode = True
         self.ai_player = 2  # AI는 백돌
         self.ai_difficulty = "중"  # 난이도: 하, 중, 상
         self.ai_delay = 2000  # AI 지연 시간 (밀리초)
         self.last_ai_time = 0
+        self.ai_worker = AIWorker()  # AI 계산은 백그라운드 스레드에서
+        self.ai_search = None  # 마지막 AI 탐색 결과 (상단에 깊이/노드 표시)
         
         # 폭죽 효과
-        self.particles = []
+        self.particles = ParticleSystem()
         self.show_celebration = False
         self.celebration_timer = 0
         
+        # 화면 캐시 (보드판은 한 번만 그리고, 바뀐 영역만 화면에 반영)
+        self.board_layer = None      # 배경 + 보드판 (변하지 않음)
+        self.scene_surface = None    # 보드판 + 지금까지 둔 돌
+        self.scene_moves = []        # scene_surface에 그린 수순
+        self.scene_view = None       # scene_surface를 그린 창 위치/확대 (Viewport.state)
+        self.scaled_stones = {}      # (돌 이미지, 칸 크기) -> 확대/축소한 이미지
+        self.screen_state = None     # 화면에 마지막으로 그린 상태 (바뀌면 전체 다시 그림)
+        self.header_state = None     # 상단 UI에 마지막으로 그린 내용
+        self.particle_rect = None    # 마지막으로 파티클을 그린 영역
+        self.text_cache = TextCache()  # 메뉴/UI 글자 서피스
+        self.overlay = None          # 게임 종료 메뉴의 반투명 배경 (한 번만 만듦)
+        
         # 3D 효과를 위한 설정
         self.camera_angle = 0
         self.camera_distance = 200
         self.camera_height = 50
         
-        # 폰트 설정 (한글 지원)
-        try:
-            # Windows 기본 한글 폰트
-            self.font = pygame.font.Font("C:/Windows/Fonts/malgun.ttf", 36)
-            self.small_font = pygame.font.Font("C:/Windows/Fonts/malgun.ttf", 24)
-            self.title_font = pygame.font.Font("C:/Windows/Fonts/malgun.ttf", 48)
-        except:
-            try:
-                # 대체 한글 폰트
-                self.font = pygame.font.Font("C:/Windows/Fonts/gulim.ttc", 36)
-                self.small_font = pygame.font.Font("C:/Windows/Fonts/gulim.ttc", 24)
-                self.title_font = pygame.font.Font("C:/Windows/Fonts/gulim.ttc", 48)
-            except:
-                # 기본 폰트 사용
-                self.font = pygame.font.Font(None, 36)
-                self.small_font = pygame.font.Font(None, 24)
-                self.title_font = pygame.font.Font(None, 48)
+        # 폰트, 소리, 돌 이미지는 처음 쓸 때 만듦
+        self.assets = AssetManager()
+        self.register_assets()
         
         # 게임 상태
         self.show_menu = True
-        self.game_mode = "AI"  # "AI" or "2P"
+        self.game_mode = "AI"  # "AI", "2P" or "NET"
         self.menu_selection = 0
         self.difficulty_selection = 1  # 0: 하, 1: 중, 2: 상
         
+        # 온라인 대국 (NET 모드)
+        self.net = None          # 서버 연결 (NetClient)
+        self.net_game = None     # 참가할 대국 이름 (None이면 자동 짝짓기)
+        self.net_ai = None       # 서버 AI 난이도 (None이면 사람끼리)
+        self.net_player = None   # 내 돌 (대국 중이 아니면 None)
+        self.net_status = ""
+        
+        # 힌트 (H): 열지도는 수마다 바뀐 칸만, 예상 수순은 사람 차례에 백그라운드 분석
+        self.show_analysis = False
+        self.heat = HeatMap()
+        self.analysis_worker = AnalysisWorker()
+        self.analysis_position = None  # 분석을 시작한 국면 (수순 길이)
+        self.analysis_pv = []          # 예상 수순 [(x, y)], 지금 둘 차례의 수부터
+        self.analysis_result = None    # 예상 수순을 만든 탐색 결과
+        self.scene_pv = []             # scene_surface에 그린 예상 수순
+        self.heat_tiles = {}           # (단계, 칸 크기) -> 반투명 열지도 칸
+        self.pv_marks = {}             # (돌, 번호, 칸 크기) -> 예상 수순 표시
+        
         # 게임 종료 후 선택 상태
         self.show_game_over_menu = False
         self.game_over_selection = 0  # 0: 다시 하기, 1: 나가기
@@ -115,88 +539,122 @@ class Gomoku3DLight:
         # 돌 선택 기능
         self.stone_selection = 1  # 0: 기본, 1: BC_CARD_CI, 2: 사용자 선택
         self.custom_stone_path = "gomoku_re/BC_CARD_CI.svg"  # 기본 경로 설정
+        self.face_stone_cache = {}  # (원본 파일 해시, 크기) -> 처리한 얼굴 돌
         self.available_stones = [
             "기본 돌",
             "BC_CARD_CI 스타일",
             "사용자 이미지",
             "얼굴 이미지"
         ]
-        
-        # 사운드 로드
-        self.load_sounds()
-        
-        # 이미지 로드
-        self.load_images()
     
-    def load_sounds(self):
-        """사운드 파일 로드"""
-        try:
-            # 간단한 사운드 생성 (실제 파일이 없을 경우)
-            self.stone_sound = self.create_stone_sound()
-            self.win_sound = self.create_win_sound()
-            print("사운드 로드 성공")
-        except Exception as e:
-            print(f"사운드 로드 실패: {e}")
-            self.stone_sound = None
-            self.win_sound = None
+    # 게임 상태는 엔진이 관리 (읽기 전용)
+    @property
+    def engine(self):
+        return self.assets.get("engine")  # 패턴 표를 만드느라 느리므로 게임을 시작할 때 생성
     
-    def load_images(self):
-        """이미지 파일 로드"""
-        try:
-            # 기본 이미지들 생성
-            self.default_black_stone = self.create_stone_image(STONE_BLACK)
-            self.bc_card_black_stone = self.create_special_black_stone()
-            self.white_stone_image = self.create_stone_image(STONE_WHITE)
-            
-            # 현재 선택된 돌 이미지 설정
-            self.update_stone_images()
-            
-            print("이미지 로드 성공")
-            
-        except Exception as e:
-            print(f"이미지 로드 실패: {e}")
-            self.default_black_stone = None
-            self.bc_card_black_stone = None
-            self.white_stone_image = None
-            self.black_stone_image = None
+    @property
+    def board(self):
+        return self.engine.board
+    
+    @property
+    def current_player(self):
+        return self.engine.current_player
+    
+    @property
+    def game_over(self):
+        return self.engine.game_over
+    
+    @property
+    def winner(self):
+        return self.engine.winner
+    
+    @property
+    def last_move(self):
+        return self.engine.last_move
+    
+    # 자원은 AssetManager가 처음 쓸 때 만듦
+    @property
+    def font(self):
+        return self.assets.get("font")
+    
+    @property
+    def small_font(self):
+        return self.assets.get("small_font")
+    
+    @property
+    def title_font(self):
+        return self.assets.get("title_font")
+    
+    @property
+    def stone_sound(self):
+        return self.assets.get("stone_sound")
+    
+    @property
+    def win_sound(self):
+        return self.assets.get("win_sound")
+    
+    @property
+    def white_stone_image(self):
+        return self.assets.get("white_stone")
+    
+    @property
+    def black_stone_image(self):
+        return self.assets.get("black_stone")
+    
+    def register_assets(self):
+        """자원 이름별로 만드는 함수 등록"""
+        self.assets.register("engine", lambda: GomokuEngine(
+            self.board_size, search_workers=self.search_workers))  # 보드 상태와 규칙
+        self.assets.register("font_path", find_korean_font)
+        self.assets.register("font", lambda: self.load_font(36))
+        self.assets.register("small_font", lambda: self.load_font(24))
+        self.assets.register("title_font", lambda: self.load_font(48))
+        self.assets.register("stone_sound", self.create_stone_sound)
+        self.assets.register("win_sound", self.create_win_sound)
+        self.assets.register("default_black_stone", lambda: self.create_stone_image(STONE_BLACK))
+        self.assets.register("bc_card_black_stone", self.create_special_black_stone)
+        self.assets.register("white_stone", lambda: self.create_stone_image(STONE_WHITE))
+        self.assets.register("black_stone", self.load_black_stone)
+        self.assets.register("recorder", self.open_recorder)
+    
+    def load_font(self, size):
+        """한글 폰트 (찾지 못하거나 열 수 없으면 pygame 기본 폰트)"""
+        path = self.assets.get("font_path")
+        if path:
+            try:
+                return pygame.font.Font(path, size)
+            except (OSError, pygame.error) as e:
+                print(f"폰트 로드 실패: {path} ({e}), 기본 폰트 사용")
+        return pygame.font.Font(None, size)
     
     def update_stone_images(self):
-        """선택된 돌에 따라 이미지 업데이트"""
-        print(f"돌 선택 업데이트: {self.stone_selection} - {self.available_stones[self.stone_selection]}")
-        
+        """선택이 바뀌었으므로 흑돌 이미지를 다음에 그릴 때 다시 만듦"""
+        self.assets.reset("black_stone")
+        self.scaled_stones = {}
+        self.scene_surface = None  # 돌 그림이 바뀌었으므로 화면 캐시를 다시 만듦
+    
+    def load_black_stone(self):
+        """선택된 돌에 맞는 흑돌 이미지"""
         if self.stone_selection == 0:  # 기본 돌
-            self.black_stone_image = self.default_black_stone
-            print("기본 돌로 설정됨")
-        elif self.stone_selection == 1:  # BC_CARD_CI 스타일
-            self.black_stone_image = self.bc_card_black_stone
-            print("BC_CARD_CI 스타일로 설정됨")
+            return self.assets.get("default_black_stone")
         elif self.stone_selection == 2:  # 사용자 이미지
             if self.custom_stone_path and os.path.exists(self.custom_stone_path):
                 try:
                     # 사용자 이미지 로드 및 크기 조정
                     user_image = pygame.image.load(self.custom_stone_path)
                     size = CELL_SIZE - 6
-                    self.black_stone_image = pygame.transform.scale(user_image, (size, size))
-                    print(f"사용자 이미지 로드 성공: {self.custom_stone_path}")
+                    return pygame.transform.scale(user_image, (size, size))
                 except Exception as e:
                     print(f"사용자 이미지 로드 실패: {e}, BC_CARD_CI 스타일 사용")
-                    self.black_stone_image = self.bc_card_black_stone
             else:
                 print("사용자 이미지 경로가 없거나 파일이 존재하지 않음, BC_CARD_CI 스타일 사용")
-                self.black_stone_image = self.bc_card_black_stone
         elif self.stone_selection == 3:  # 얼굴 이미지
             face_path = "gomoku_re/IMG_7541.jpeg"
             if os.path.exists(face_path):
-                try:
-                    # 얼굴 이미지 로드 및 배경 제거
-                    self.black_stone_image = self.create_face_stone(face_path)
-                    print(f"얼굴 이미지 로드 성공: {face_path}")
-                except Exception as e:
-                    print(f"얼굴 이미지 로드 실패: {e}, BC_CARD_CI 스타일 사용")
-                    self.black_stone_image = self.bc_card_black_stone
-            else:
-                print("얼굴 이미지 파일이 존재하지 않음, BC_CARD_CI 스타일 사용")
-                self.black_stone_image = self.bc_card_black_stone
+                # 얼굴 이미지 로드 및 배경 제거 (실패하면 기본 돌)
+                return self.create_face_stone(face_path)
+            print("얼굴 이미지 파일이 존재하지 않음, BC_CARD_CI 스타일 사용")
+        return self.assets.get("bc_card_black_stone")
     
     def create_special_black_stone(self):
         """BC_CARD_CI.svg를 기반으로 한 특별한 흑돌 이미지 생성"""
@@ -230,62 +688,30 @@ class Gomoku3DLight:
         return surface
     
     def create_face_stone(self, face_path):
-        """얼굴 이미지를 돌로 변환 (흰색 배경 제거, 고해상도)"""
+        """얼굴 이미지를 돌로 변환 (흰색 배경 제거, 고해상도)
+
+        결과는 원본 파일 해시와 크기별로 메모리와 CACHE_DIR에 저장해 두고 다시 쓴다.
+        """
         try:
-            # 원본 이미지 로드
-            original_image = pygame.image.load(face_path)
-            
-            # 고해상도로 처리하기 위해 더 큰 크기로 먼저 스케일링
-            high_res_size = CELL_SIZE * 2  # 2배 크기로 처리
-            high_res_image = pygame.transform.scale(original_image, (high_res_size, high_res_size))
-            
-            # 최종 돌 크기 (더 크게)
             final_size = CELL_SIZE - 2  # 기존보다 4픽셀 더 크게
+            with open(face_path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()[:16]
+            key = (digest, final_size)
+            if key in self.face_stone_cache:
+                return self.face_stone_cache[key]
             
-            # 투명 배경의 새 서피스 생성
-            surface = pygame.Surface((high_res_size, high_res_size), pygame.SRCALPHA)
-            
-            # 고해상도 이미지 데이터 가져오기
-            image_array = pygame.surfarray.array3d(high_res_image)
-            
-            # 흰색 배경 제거 (임계값 기반) - 고해상도에서 처리
-            for x in range(high_res_size):
-                for y in range(high_res_size):
-                    pixel = image_array[x][y]
-                    # 흰색에 가까운 픽셀을 투명하게 만들기
-                    if (pixel[0] > 200 and pixel[1] > 200 and pixel[2] > 200):
-                        # 투명하게 설정
-                        surface.set_at((x, y), (0, 0, 0, 0))
-                    else:
-                        # 원본 픽셀 유지
-                        surface.set_at((x, y), (*pixel, 255))
-            
-            # 원형 마스크 적용 (돌 모양으로) - 고해상도에서 처리
-            center = high_res_size // 2
-            radius = high_res_size // 2 - 4
-            
-            # 원형 마스크 생성
-            mask_surface = pygame.Surface((high_res_size, high_res_size), pygame.SRCALPHA)
-            pygame.draw.circle(mask_surface, (255, 255, 255, 255), (center, center), radius)
-            
-            # 마스크 적용
-            masked_surface = pygame.Surface((high_res_size, high_res_size), pygame.SRCALPHA)
-            masked_surface.blit(surface, (0, 0))
-            masked_surface.blit(mask_surface, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
-            
-            # 최종 크기로 스케일링 (고해상도에서 처리한 후)
-            final_surface = pygame.transform.scale(masked_surface, (final_size, final_size))
-            
-            # 그림자 효과 추가 (최종 크기에서)
-            shadow_surface = pygame.Surface((final_size, final_size), pygame.SRCALPHA)
-            shadow_center = final_size // 2
-            shadow_radius = final_size // 2 - 2
-            pygame.draw.circle(shadow_surface, (*DARK_BROWN, 128), (shadow_center + 2, shadow_center + 2), shadow_radius)
-            
-            # 최종 이미지에 그림자 합성
-            final_surface.blit(shadow_surface, (0, 0))
-            
-            print(f"얼굴 이미지 처리 완료: {high_res_size}x{high_res_size} -> {final_size}x{final_size}")
+            cache_path = os.path.join(CACHE_DIR, f"face_{digest}_{final_size}.png")
+            if os.path.exists(cache_path):
+                final_surface = pygame.image.load(cache_path).convert_alpha()
+                print(f"얼굴 이미지 캐시 사용: {cache_path}")
+            else:
+                final_surface = self.process_face_image(face_path, final_size)
+                try:
+                    os.makedirs(CACHE_DIR, exist_ok=True)
+                    pygame.image.save(final_surface, cache_path)
+                except (OSError, pygame.error) as e:
+                    print(f"얼굴 이미지 캐시 저장 실패: {e}")
+            self.face_stone_cache[key] = final_surface
             return final_surface
             
         except Exception as e:
@@ -293,6 +719,43 @@ class Gomoku3DLight:
             # 실패 시 기본 돌 반환
             return self.create_stone_image(STONE_BLACK)
     
+    def process_face_image(self, face_path, final_size):
+        """흰색 배경 제거와 원형 마스크를 배열 연산으로 한 번에 처리"""
+        # 원본 이미지 로드
+        original_image = pygame.image.load(face_path)
+        
+        # 고해상도로 처리하기 위해 더 큰 크기로 먼저 스케일링
+        high_res_size = CELL_SIZE * 2  # 2배 크기로 처리
+        surface = pygame.transform.scale(original_image, (high_res_size, high_res_size)).convert_alpha()
+        
+        # 흰색에 가까운 픽셀과 원(돌 모양) 밖은 투명하게
+        center = high_res_size // 2
+        radius = high_res_size // 2 - 4
+        mask_surface = pygame.Surface((high_res_size, high_res_size), pygame.SRCALPHA)
+        pygame.draw.circle(mask_surface, (255, 255, 255, 255), (center, center), radius)
+        outside = pygame.surfarray.array_alpha(mask_surface) == 0
+        rgb = pygame.surfarray.pixels3d(surface)
+        alpha = pygame.surfarray.pixels_alpha(surface)
+        transparent = (rgb > 200).all(axis=2) | outside
+        rgb[transparent] = 0
+        alpha[...] = np.where(transparent, 0, 255)
+        del rgb, alpha  # 픽셀 배열 잠금 해제
+        
+        # 최종 크기로 스케일링 (고해상도에서 처리한 후)
+        final_surface = pygame.transform.scale(surface, (final_size, final_size))
+        
+        # 그림자 효과 추가 (최종 크기에서)
+        shadow_surface = pygame.Surface((final_size, final_size), pygame.SRCALPHA)
+        shadow_center = final_size // 2
+        shadow_radius = final_size // 2 - 2
+        pygame.draw.circle(shadow_surface, (*DARK_BROWN, 128), (shadow_center + 2, shadow_center + 2), shadow_radius)
+        
+        # 최종 이미지에 그림자 합성
+        final_surface.blit(shadow_surface, (0, 0))
+        
+        print(f"얼굴 이미지 처리 완료: {high_res_size}x{high_res_size} -> {final_size}x{final_size}")
+        return final_surface
+    
     def create_stone_image(self, color):
         """돌 이미지 생성"""
         size = CELL_SIZE - 6  # 돌 크기
@@ -325,25 +788,38 @@ class Gomoku3DLight:
         
         return surface
     
+    def make_sound(self, name, synthesize):
+        """합성한 소리를 mixer 형식(샘플레이트, 채널 수)에 맞춰 Sound로 만듦
+        
+        합성 결과는 프로세스 안에서 캐시하고, GOMOKU_SOUND_CACHE=1이면 CACHE_DIR에
+        .npy로 저장해 다음 실행에서 다시 읽는다.
+        """
+        sample_rate, _, channels = pygame.mixer.get_init()
+        key = (name, sample_rate)
+        samples = _SOUND_CACHE.get(key)
+        if samples is None:
+            cache_path = os.path.join(CACHE_DIR, f"sound_{name}_v{SOUND_VERSION}_{sample_rate}.npy")
+            if SOUND_FILE_CACHE and os.path.exists(cache_path):
+                samples = np.load(cache_path)
+            else:
+                samples = synthesize(sample_rate)
+                if SOUND_FILE_CACHE:
+                    try:
+                        os.makedirs(CACHE_DIR, exist_ok=True)
+                        np.save(cache_path, samples)
+                    except OSError as e:
+                        print(f"소리 캐시 저장 실패: {e}")
+            _SOUND_CACHE[key] = samples
+        
+        # 스테레오 mixer는 (샘플 수, 채널 수) 배열이 필요함
+        if channels > 1:
+            samples = np.repeat(samples[:, np.newaxis], channels, axis=1)
+        return pygame.sndarray.make_sound(samples)
+    
     def create_stone_sound(self):
         """돌 놓는 소리 생성"""
         try:
-            sample_rate = 44100
-            duration = 0.1
-            samples = int(sample_rate * duration)
-            
-            # 간단한 딱 소리 생성 (모노)
-            sound_array = np.zeros(samples, dtype=np.int16)
-            for i in range(samples):
-                t = i / sample_rate
-                if t < duration:
-                    # 감쇠하는 사인파
-                    frequency = 800 * math.exp(-t * 10)
-                    sound_array[i] = int(32767 * 0.3 * math.sin(2 * math.pi * frequency * t) * math.exp(-t * 20))
-            
-            # Pygame 사운드 객체 생성
-            sound = pygame.sndarray.make_sound(sound_array)
-            return sound
+            return self.make_sound("stone", stone_sound_samples)
         except Exception as e:
             print(f"돌 소리 생성 실패: {e}")
             return None
@@ -351,133 +827,319 @@ class Gomoku3DLight:
     def create_win_sound(self):
         """승리 소리 생성"""
         try:
-            sample_rate = 44100
-            duration = 0.5
-            samples = int(sample_rate * duration)
-            
-            # 승리 팡파르 생성 (모노)
-            sound_array = np.zeros(samples, dtype=np.int16)
-            for i in range(samples):
-                t = i / sample_rate
-                if t < duration:
-                    # 상승하는 음계
-                    frequency = 440 + 200 * t
-                    sound_array[i] = int(32767 * 0.2 * math.sin(2 * math.pi * frequency * t) * math.exp(-t * 2))
-            
-            sound = pygame.sndarray.make_sound(sound_array)
-            return sound
+            return self.make_sound("win", win_sound_samples)
         except Exception as e:
             print(f"승리 소리 생성 실패: {e}")
             return None
     
     def create_celebration(self, x, y):
         """폭죽 효과 생성"""
-        colors = [RED, GREEN, BLUE, YELLOW, WHITE]
-        for _ in range(50):
-            color = random.choice(colors)
-            self.particles.append(Particle(x, y, color))
+        self.particles.emit(x, y, 50, [RED, GREEN, BLUE, YELLOW, WHITE])
     
     def update_particles(self):
         """파티클 업데이트"""
-        for particle in self.particles[:]:
-            particle.update()
-            if particle.life <= 0:
-                self.particles.remove(particle)
+        self.particles.update()
     
     def draw_particles(self):
         """파티클 그리기"""
-        for particle in self.particles:
-            particle.draw(screen)
+        self.particles.draw(screen)
     
-    def draw_3d_board(self):
-        """3D 효과가 적용된 오목판 그리기"""
+    def draw_3d_board(self, surface=screen):
+        """3D 효과가 적용된 오목판 그리기 (화면 캐시를 만들 때 한 번만 호출, 보이는 칸만)"""
+        viewport = self.viewport
+        cell = viewport.cell
+        board_pixels = viewport.count * cell
+        
         # 보드 배경 (그림자 효과)
         shadow_offset = 5
-        pygame.draw.rect(screen, DARK_BROWN, 
+        pygame.draw.rect(surface, DARK_BROWN, 
                         (BOARD_OFFSET_X + shadow_offset, BOARD_OFFSET_Y + shadow_offset, 
-                         BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE))
+                         board_pixels, board_pixels))
         
         # 보드 배경
-        pygame.draw.rect(screen, BOARD_COLOR, 
+        pygame.draw.rect(surface, BOARD_COLOR, 
                         (BOARD_OFFSET_X, BOARD_OFFSET_Y, 
-                         BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE))
+                         board_pixels, board_pixels))
         
         # 3D 효과를 위한 테두리
-        pygame.draw.rect(screen, DARK_BROWN, 
+        pygame.draw.rect(surface, DARK_BROWN, 
                         (BOARD_OFFSET_X, BOARD_OFFSET_Y, 
-                         BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE), 3)
+                         board_pixels, board_pixels), 3)
         
         # 격자 그리기 (3D 효과)
-        for i in range(BOARD_SIZE):
+        for i in range(viewport.count):
             # 세로선
-            x = BOARD_OFFSET_X + i * CELL_SIZE
+            x = BOARD_OFFSET_X + i * cell
             # 그림자
-            pygame.draw.line(screen, DARK_BROWN, 
+            pygame.draw.line(surface, DARK_BROWN, 
                            (x + 2, BOARD_OFFSET_Y + 2), 
-                           (x + 2, BOARD_OFFSET_Y + BOARD_SIZE * CELL_SIZE - 2), 1)
+                           (x + 2, BOARD_OFFSET_Y + board_pixels - 2), 1)
             # 실제 선
-            pygame.draw.line(screen, BLACK, 
+            pygame.draw.line(surface, BLACK, 
                            (x, BOARD_OFFSET_Y), 
-                           (x, BOARD_OFFSET_Y + BOARD_SIZE * CELL_SIZE), 2)
+                           (x, BOARD_OFFSET_Y + board_pixels), 2)
             
             # 가로선
-            y = BOARD_OFFSET_Y + i * CELL_SIZE
+            y = BOARD_OFFSET_Y + i * cell
             # 그림자
-            pygame.draw.line(screen, DARK_BROWN, 
+            pygame.draw.line(surface, DARK_BROWN, 
                            (BOARD_OFFSET_X + 2, y + 2), 
-                           (BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE - 2, y + 2), 1)
+                           (BOARD_OFFSET_X + board_pixels - 2, y + 2), 1)
             # 실제 선
-            pygame.draw.line(screen, BLACK, 
+            pygame.draw.line(surface, BLACK, 
                            (BOARD_OFFSET_X, y), 
-                           (BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE, y), 2)
+                           (BOARD_OFFSET_X + board_pixels, y), 2)
         
         # 별점 그리기 (3D 효과)
-        star_points = [3, 7, 11]
-        for x in star_points:
-            for y in star_points:
-                center_x = BOARD_OFFSET_X + x * CELL_SIZE
-                center_y = BOARD_OFFSET_Y + y * CELL_SIZE
+        points = star_points(self.board_size)
+        for x in points:
+            for y in points:
+                if not viewport.contains(x, y):
+                    continue
+                center_x, center_y = viewport.to_screen(x, y)
                 
                 # 그림자
-                pygame.draw.circle(screen, DARK_BROWN, (center_x + 2, center_y + 2), 3)
+                pygame.draw.circle(surface, DARK_BROWN, (center_x + 2, center_y + 2), 3)
                 # 실제 별점
-                pygame.draw.circle(screen, BLACK, (center_x, center_y), 3)
+                pygame.draw.circle(surface, BLACK, (center_x, center_y), 3)
+    
+    def scaled_stone(self, image):
+        """현재 칸 크기에 맞춘 돌 이미지 (기본 크기면 그대로)"""
+        cell = self.viewport.cell
+        if image is None or cell == CELL_SIZE:
+            return image
+        key = (image, cell)
+        scaled = self.scaled_stones.get(key)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = pygame.transform.smoothscale(
+                image, (width * cell // CELL_SIZE, height * cell // CELL_SIZE))
+            self.scaled_stones[key] = scaled
+        return scaled
     
-    def draw_3d_stone(self, x, y, player):
+    def draw_3d_stone(self, x, y, player, surface=screen):
         """3D 효과가 적용된 돌 그리기 (이미지 사용)"""
-        center_x = BOARD_OFFSET_X + x * CELL_SIZE
-        center_y = BOARD_OFFSET_Y + y * CELL_SIZE
+        center_x, center_y = self.viewport.to_screen(x, y)
         
         if player == 1:  # 흑돌
-            if self.black_stone_image:
+            black_stone_image = self.scaled_stone(self.black_stone_image)
+            if black_stone_image:
                 # 이미지 사용
-                image_rect = self.black_stone_image.get_rect(center=(center_x, center_y))
-                screen.blit(self.black_stone_image, image_rect)
+                image_rect = black_stone_image.get_rect(center=(center_x, center_y))
+                surface.blit(black_stone_image, image_rect)
             else:
                 # 기본 원형 그리기
-                radius = CELL_SIZE // 2 - 3
-                pygame.draw.circle(screen, DARK_BROWN, (center_x + 3, center_y + 3), radius)
-                pygame.draw.circle(screen, STONE_BLACK, (center_x, center_y), radius)
-                pygame.draw.circle(screen, (50, 50, 50), (center_x - radius//3, center_y - radius//3), radius//3)
+                radius = self.viewport.cell // 2 - 3
+                pygame.draw.circle(surface, DARK_BROWN, (center_x + 3, center_y + 3), radius)
+                pygame.draw.circle(surface, STONE_BLACK, (center_x, center_y), radius)
+                pygame.draw.circle(surface, (50, 50, 50), (center_x - radius//3, center_y - radius//3), radius//3)
         else:  # 백돌
-            if self.white_stone_image:
+            white_stone_image = self.scaled_stone(self.white_stone_image)
+            if white_stone_image:
                 # 이미지 사용
-                image_rect = self.white_stone_image.get_rect(center=(center_x, center_y))
-                screen.blit(self.white_stone_image, image_rect)
+                image_rect = white_stone_image.get_rect(center=(center_x, center_y))
+                surface.blit(white_stone_image, image_rect)
             else:
                 # 기본 원형 그리기
-                radius = CELL_SIZE // 2 - 3
-                pygame.draw.circle(screen, DARK_BROWN, (center_x + 3, center_y + 3), radius)
-                pygame.draw.circle(screen, STONE_WHITE, (center_x, center_y), radius)
-                pygame.draw.circle(screen, (255, 255, 255), (center_x - radius//3, center_y - radius//3), radius//3)
-                pygame.draw.circle(screen, BLACK, (center_x, center_y), radius, 2)
-    
-    def draw_stones(self):
-        """모든 돌 그리기"""
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.board[x][y] != 0:
-                    self.draw_3d_stone(x, y, self.board[x][y])
+                radius = self.viewport.cell // 2 - 3
+                pygame.draw.circle(surface, DARK_BROWN, (center_x + 3, center_y + 3), radius)
+                pygame.draw.circle(surface, STONE_WHITE, (center_x, center_y), radius)
+                pygame.draw.circle(surface, (255, 255, 255), (center_x - radius//3, center_y - radius//3), radius//3)
+                pygame.draw.circle(surface, BLACK, (center_x, center_y), radius, 2)
+    
+    def draw_stones(self, surface=screen):
+        """창에 보이는 돌 그리기"""
+        viewport = self.viewport
+        for x, y, player in self.board.stones():
+            if viewport.contains(x, y):
+                self.draw_3d_stone(x, y, player, surface)
+    
+    def stone_rect(self, x, y):
+        """(x, y) 돌이 차지하는 화면 영역 (그림자 포함)"""
+        center_x, center_y = self.viewport.to_screen(x, y)
+        cell = self.viewport.cell
+        return pygame.Rect(center_x - cell // 2, center_y - cell // 2, cell + 4, cell + 4)
+    
+    def heat_tile(self, level):
+        """열지도 한 칸 (단계가 높을수록 진한 빨강, 칸 크기별로 한 번만 만듦)"""
+        cell = self.viewport.cell
+        key = (level, cell)
+        tile = self.heat_tiles.get(key)
+        if tile is None:
+            # 옆 칸 영역을 건드리지 않도록 칸보다 조금 작게
+            tile = pygame.Surface((cell - 4, cell - 4), pygame.SRCALPHA)
+            strength = level / HEAT_LEVELS
+            tile.fill((255, int(220 * (1 - strength)), 0, int(40 + 130 * strength)))
+            self.heat_tiles[key] = tile
+        return tile
+    
+    def pv_mark(self, player, number):
+        """예상 수순 표시 (둘 돌 색의 반투명 원 + 순서 번호)"""
+        cell = self.viewport.cell
+        key = (player, number, cell)
+        mark = self.pv_marks.get(key)
+        if mark is None:
+            mark = pygame.Surface((cell, cell), pygame.SRCALPHA)
+            fill, text_color = ((20, 20, 20, 170), WHITE) if player == 1 else ((235, 235, 235, 190), BLACK)
+            pygame.draw.circle(mark, fill, (cell // 2, cell // 2), cell // 2 - 4)
+            text = self.small_font.render(str(number), True, text_color)
+            mark.blit(text, text.get_rect(center=(cell // 2, cell // 2)))
+            self.pv_marks[key] = mark
+        return mark
+    
+    def cell_rect(self, x, y):
+        """(x, y) 교차점을 가운데로 한 칸 크기 영역 (열지도 칸과 예상 수순 표시가 들어감)"""
+        center_x, center_y = self.viewport.to_screen(x, y)
+        cell = self.viewport.cell
+        return pygame.Rect(center_x - cell // 2, center_y - cell // 2, cell, cell)
+    
+    def draw_heat(self, surface, x, y):
+        """(x, y) 칸의 열지도 (단계가 0이면 그리지 않음)"""
+        level = self.heat.levels.get(x * self.board_size + y)
+        if level:
+            rect = self.cell_rect(x, y)
+            surface.blit(self.heat_tile(level), (rect.x + 2, rect.y + 2))
+    
+    def draw_pv(self, surface, moves):
+        """예상 수순 번호 표시 (moves 중 보이는 것만)"""
+        player = self.current_player
+        for number, (x, y) in enumerate(self.analysis_pv, 1):
+            if (x, y) in moves and self.viewport.contains(x, y):
+                surface.blit(self.pv_mark(player, number), self.cell_rect(x, y))
+            player = 3 - player
+    
+    def draw_analysis(self, surface):
+        """화면 캐시를 새로 만들 때 돌보다 먼저 보이는 칸의 열지도 전체를 그림"""
+        size = self.board_size
+        viewport = self.viewport
+        for c in self.heat.levels:
+            x, y = divmod(c, size)
+            if viewport.contains(x, y):
+                self.draw_heat(surface, x, y)
+    
+    def redraw_cells(self, cells):
+        """힌트가 바뀐 칸들만 화면 캐시에서 다시 그리고 바뀐 영역 목록 반환
+
+        칸 영역을 보드판에서 복원한 뒤 열지도, 그 영역에 걸친 주변 돌(그림자), 예상 수순 순서로
+        그려서 전체를 다시 그렸을 때와 같게 만든다.
+        """
+        surface = self.scene_surface
+        board = self.board
+        viewport = self.viewport
+        rects = []
+        for x, y in cells:
+            if not viewport.contains(x, y):
+                continue
+            rect = self.cell_rect(x, y)
+            surface.blit(self.board_layer, rect, rect)
+            surface.set_clip(rect)
+            self.draw_heat(surface, x, y)
+            for nx in range(x - 1, x + 2):
+                for ny in range(y - 1, y + 2):
+                    player = board.get(nx, ny) if board.in_bounds(nx, ny) else 0
+                    if player and viewport.contains(nx, ny):
+                        self.draw_3d_stone(nx, ny, player, surface)
+            self.draw_pv(surface, {(x, y)})
+            surface.set_clip(None)
+            rects.append(rect)
+        return rects
+    
+    def update_analysis_scene(self):
+        """힌트가 켜져 있으면 열지도 단계나 예상 수순이 바뀐 칸만 다시 그리고 영역 목록 반환"""
+        changed = self.heat.update(self.engine)
+        if changed is None:
+            return None
+        if self.analysis_pv != self.scene_pv:
+            changed = set(changed) | set(self.scene_pv) | set(self.analysis_pv)
+            self.scene_pv = list(self.analysis_pv)
+        return self.redraw_cells(changed)
+    
+    def update_scene(self):
+        """화면 캐시에 새로 둔 돌만 그리고 바뀐 영역 목록 반환 (다시 만들었으면 None)"""
+        history = self.engine.history
+        drawn = len(self.scene_moves)
+        view = self.viewport.state()
+        if view != self.scene_view:
+            # 스크롤/확대: 보드판부터 다시 그림
+            self.board_layer = None
+            self.scene_surface = None
+            self.scene_view = view
+        if self.scene_surface is None or history[:drawn] != self.scene_moves:
+            # 처음이거나 재시작/무르기로 수순이 바뀜: 보드판 캐시에 돌을 전부 다시 그림
+            if self.board_layer is None:
+                self.board_layer = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+                self.board_layer.fill(LIGHT_BROWN)
+                self.draw_3d_board(self.board_layer)
+            self.scene_surface = self.board_layer.copy()
+            if self.show_analysis:
+                self.heat.update(self.engine)
+                self.draw_analysis(self.scene_surface)
+            self.draw_stones(self.scene_surface)
+            if self.show_analysis:
+                self.draw_pv(self.scene_surface, set(self.analysis_pv))
+                self.scene_pv = list(self.analysis_pv)
+            self.scene_moves = list(history)
+            return None
+        
+        rects = []
+        for x, y, player in history[drawn:]:
+            if self.viewport.contains(x, y):
+                self.draw_3d_stone(x, y, player, self.scene_surface)
+                rects.append(self.stone_rect(x, y))
+        self.scene_moves = list(history)
+        if self.show_analysis:
+            heat_rects = self.update_analysis_scene()
+            if heat_rects is None:
+                self.scene_surface = None  # 열지도를 처음부터 계산함: 전부 다시 그림
+                return self.update_scene()
+            rects += heat_rects
+        return rects
+    
+    def thinking_text(self):
+        """AI 계산 중 표시 문구 (계산 중이 아니면 None)"""
+        if not self.ai_worker.busy or self.game_over:
+            return None
+        progress = self.ai_worker.progress
+        dots = "." * (pygame.time.get_ticks() // 300 % 4)
+        thinking_text = f"AI 생각 중{dots}"
+        if progress.nodes:
+            thinking_text += f" (깊이 {progress.depth}, 노드 {progress.nodes})"
+        return thinking_text
+    
+    def search_text(self):
+        """마지막 AI 탐색 통계 문구 (탐색하지 않은 수였으면 None)"""
+        result = self.ai_search
+        if result is None or not result.nodes or self.game_over:
+            return None
+        return (f"AI 탐색: 깊이 {result.depth}, 노드 {result.nodes}, "
+                f"{result.nps:.0f} nps, {result.elapsed * 1000:.0f}ms")
+    
+    def analysis_text(self):
+        """힌트 분석 표시 문구 (힌트가 꺼져 있으면 None)"""
+        if not self.show_analysis or self.game_over:
+            return None
+        if self.analysis_worker.busy:
+            return f"힌트 분석 중 (깊이 {self.analysis_worker.progress.depth})"
+        if self.analysis_result is not None:
+            return f"힌트: 깊이 {self.analysis_result.depth}, 예상 수순 {len(self.analysis_pv)}수"
+        return "힌트"
+    
+    def ui_state(self):
+        """상단 UI에 그릴 내용 (바뀌었을 때만 다시 그림)"""
+        return (self.game_over, self.winner, self.current_player, self.game_mode,
+                self.ai_difficulty, self.net_status, self.thinking_text(), self.analysis_text(),
+                self.search_text())
+    
+    def ui_rect(self):
+        """상단 UI가 그려지는 영역 (상단 띠 + 조작법 글자)"""
+        controls = pygame.Rect(SCREEN_WIDTH - 250, 20, 250,
+                               (len(self.controls()) - 1) * 20 + self.small_font.get_height())
+        return pygame.Rect(0, 0, SCREEN_WIDTH, 80).union(controls)
+    
+    def particle_bounds(self):
+        """살아 있는 파티클 전체를 덮는 영역 (없으면 None)"""
+        rect = self.particles.bounds()
+        return rect.clip(screen.get_rect()) if rect is not None else None
     
     def draw_ui(self):
         """UI 그리기"""
@@ -493,11 +1155,11 @@ class Gomoku3DLight:
             else:
                 winner_text = "무승부!"
                 text_color = BLUE
-            text = self.font.render(winner_text, True, text_color)
+            text = self.text_cache.render(self.font, winner_text, text_color)
         else:
             current_text = "흑돌 차례" if self.current_player == 1 else "백돌 차례"
             text_color = BLACK
-            text = self.font.render(current_text, True, text_color)
+            text = self.text_cache.render(self.font, current_text, text_color)
         
         screen.blit(text, (20, 25))
         
@@ -505,30 +1167,47 @@ class Gomoku3DLight:
         mode_text = f"모드: {self.game_mode}"
         if self.game_mode == "AI":
             mode_text += f" (난이도: {self.ai_difficulty})"
-        mode_surface = self.small_font.render(mode_text, True, BLACK)
+        elif self.game_mode == "NET":
+            mode_text += f" ({self.net_status})"
+        if self.game_mode != "NET" and self.net_status:
+            mode_text += f" - {self.net_status}"
+        mode_surface = self.text_cache.render(self.small_font, mode_text, BLACK)
         screen.blit(mode_surface, (20, 55))
         
+        # AI 계산 중 표시 (아니면 힌트 분석 상태나 마지막 AI 탐색 통계)
+        thinking_text = self.thinking_text() or self.analysis_text() or self.search_text()
+        if thinking_text:
+            thinking_surface = self.text_cache.render(self.small_font, thinking_text, BLUE)
+            screen.blit(thinking_surface, (300, 55))
+        
         # 조작법 (게임이 끝나지 않았을 때만 표시)
         if not self.game_over:
-            controls = [
-                "R: 게임 재시작",
-                "M: 모드 변경",
-                "D: 난이도 변경",
-                "S: 돌 이미지 설정",
-                "ESC: 메뉴로"
-            ]
-            
-            for i, control in enumerate(controls):
-                control_surface = self.small_font.render(control, True, BLACK)
+            for i, control in enumerate(self.controls()):
+                control_surface = self.text_cache.render(self.small_font, control, BLACK)
                 screen.blit(control_surface, (SCREEN_WIDTH - 250, 20 + i * 20))
     
+    def controls(self):
+        """상단 오른쪽 조작법 목록"""
+        controls = [
+            "R: 게임 재시작",
+            "M: 모드 변경",
+            "D: 난이도 변경",
+            "S: 돌 이미지 설정",
+            "H: 힌트 (열지도/예상 수순)",
+            "ESC: 메뉴로"
+        ]
+        if self.board_size > VIEW_CELLS:
+            controls.append("방향키/휠/C: 보드 이동")
+        return controls
+    
     def draw_game_over_menu(self):
         """게임 종료 후 메뉴 그리기"""
         # 반투명 배경
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        overlay.set_alpha(128)
-        overlay.fill(BLACK)
-        screen.blit(overlay, (0, 0))
+        if self.overlay is None:
+            self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.overlay.set_alpha(128)
+            self.overlay.fill(BLACK)
+        screen.blit(self.overlay, (0, 0))
         
         # 메뉴 박스
         menu_width = 400
@@ -540,7 +1219,7 @@ class Gomoku3DLight:
         pygame.draw.rect(screen, DARK_BROWN, (menu_x, menu_y, menu_width, menu_height), 3)
         
         # 제목
-        title = self.font.render("게임 종료!", True, BLACK)
+        title = self.text_cache.render(self.font, "게임 종료!", BLACK)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, menu_y + 40))
         screen.blit(title, title_rect)
         
@@ -548,7 +1227,7 @@ class Gomoku3DLight:
         buttons = ["다시 한 번 더?", "나갈래요"]
         for i, button_text in enumerate(buttons):
             color = RED if self.game_over_selection == i else BLACK
-            button_surface = self.font.render(button_text, True, color)
+            button_surface = self.text_cache.render(self.font, button_text, color)
             button_rect = button_surface.get_rect(center=(SCREEN_WIDTH//2, menu_y + 100 + i * 50))
             screen.blit(button_surface, button_rect)
     
@@ -558,7 +1237,7 @@ class Gomoku3DLight:
         screen.fill(LIGHT_BROWN)
         
         # 제목
-        title = self.title_font.render("3D 오목 게임", True, BLACK)
+        title = self.text_cache.render(self.title_font, "3D 오목 게임", BLACK)
         title_rect = title.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(title, title_rect)
         
@@ -573,42 +1252,42 @@ class Gomoku3DLight:
         
         for i, (text, value) in enumerate(menu_options):
             color = RED if self.menu_selection == i else BLACK
-            option_surface = self.font.render(text, True, color)
+            option_surface = self.text_cache.render(self.font, text, color)
             option_rect = option_surface.get_rect(center=(SCREEN_WIDTH//2, 300 + i * 50))
             screen.blit(option_surface, option_rect)
         
         # 난이도 설정 화면
         if self.menu_selection == 2:  # 난이도 설정 선택 시
             difficulty_text = f"현재 난이도: {self.ai_difficulty}"
-            diff_surface = self.font.render(difficulty_text, True, BLUE)
+            diff_surface = self.text_cache.render(self.font, difficulty_text, BLUE)
             diff_rect = diff_surface.get_rect(center=(SCREEN_WIDTH//2, 500))
             screen.blit(diff_surface, diff_rect)
             
             difficulties = ["하", "중", "상"]
             for i, diff in enumerate(difficulties):
                 color = RED if self.difficulty_selection == i else BLACK
-                diff_option = self.small_font.render(diff, True, color)
+                diff_option = self.text_cache.render(self.small_font, diff, color)
                 diff_rect = diff_option.get_rect(center=(SCREEN_WIDTH//2 - 100 + i * 100, 550))
                 screen.blit(diff_option, diff_rect)
         
         # 돌 선택 화면
         elif self.menu_selection == 3:  # 돌 선택 선택 시
             stone_text = f"현재 선택: {self.available_stones[self.stone_selection]}"
-            stone_surface = self.font.render(stone_text, True, BLUE)
+            stone_surface = self.text_cache.render(self.font, stone_text, BLUE)
             stone_rect = stone_surface.get_rect(center=(SCREEN_WIDTH//2, 500))
             screen.blit(stone_surface, stone_rect)
             
             # 돌 옵션들
             for i, stone_name in enumerate(self.available_stones):
                 color = RED if self.stone_selection == i else BLACK
-                stone_option = self.small_font.render(stone_name, True, color)
+                stone_option = self.text_cache.render(self.small_font, stone_name, color)
                 stone_rect = stone_option.get_rect(center=(SCREEN_WIDTH//2 - 150 + i * 150, 550))
                 screen.blit(stone_option, stone_rect)
             
             # 사용자 이미지 경로 표시
             if self.stone_selection == 2:
                 path_text = f"경로: {self.custom_stone_path if self.custom_stone_path else '설정되지 않음'}"
-                path_surface = self.small_font.render(path_text, True, BLACK)
+                path_surface = self.text_cache.render(self.small_font, path_text, BLACK)
                 path_rect = path_surface.get_rect(center=(SCREEN_WIDTH//2, 580))
                 screen.blit(path_surface, path_rect)
         
@@ -619,238 +1298,251 @@ class Gomoku3DLight:
         ]
         
         for i, instruction in enumerate(instructions):
-            inst_surface = self.small_font.render(instruction, True, BLACK)
+            inst_surface = self.text_cache.render(self.small_font, instruction, BLACK)
             inst_rect = inst_surface.get_rect(center=(SCREEN_WIDTH//2, 650 + i * 30))
             screen.blit(inst_surface, inst_rect)
     
     def get_board_position(self, mouse_x, mouse_y):
-        """마우스 위치를 보드 좌표로 변환 (정확한 위치 계산)"""
-        if (BOARD_OFFSET_X <= mouse_x <= BOARD_OFFSET_X + BOARD_SIZE * CELL_SIZE and
-            BOARD_OFFSET_Y <= mouse_y <= BOARD_OFFSET_Y + BOARD_SIZE * CELL_SIZE):
-            
-            # 정확한 셀 위치 계산
-            x = round((mouse_x - BOARD_OFFSET_X) / CELL_SIZE)
-            y = round((mouse_y - BOARD_OFFSET_Y) / CELL_SIZE)
-            
-            # 범위 확인
-            if 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE:
-                return x, y
-        return None
+        """마우스 위치를 보드 좌표로 변환 (창에 보이는 칸만)"""
+        return self.viewport.to_board(mouse_x, mouse_y)
+    
+    def open_recorder(self):
+        """대국 기록 파일 열기 (record_path가 None이면 기록하지 않음)"""
+        if self.record_path is None:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(self.record_path)), exist_ok=True)
+        return GameWriter(self.record_path)
+    
+    def record_move(self, x, y):
+        """둔 수를 기록 파일에 바로 덧붙이고, 대국이 끝났으면 결과를 채움"""
+        recorder = self.assets.get("recorder")
+        if recorder is None:
+            return
+        try:
+            if not recorder.in_game:
+                recorder.begin(self.board_size)
+            recorder.move(x, y)
+            if self.game_over:
+                recorder.end(engine_result(self.engine))
+        except OSError as e:
+            print(f"대국 기록 실패: {e}")
+            self.assets.discard("recorder")  # 이번 실행에서는 더 기록하지 않음
+    
+    def close_record(self, close_file=False):
+        """진행 중이던 대국을 끝나지 않은 대국으로 닫음 (close_file이면 파일도 닫음)"""
+        recorder = self.assets.peek("recorder")
+        if recorder is None:
+            return
+        try:
+            if close_file:
+                recorder.close()
+                self.assets.reset("recorder")
+            else:
+                recorder.end(UNFINISHED)
+        except OSError as e:
+            print(f"대국 기록 실패: {e}")
+    
+    def connect(self, address, game_id=None, ai=None):
+        """서버(host:port)에 접속해 온라인 대국 시작 (서버가 돌려준 수만 보드에 둠, ai면 서버 AI와)
+
+        접속하지 못하면 오류를 상단에 표시하고 로컬 AI 대전으로 시작한다.
+        """
+        host, _, port = address.rpartition(":")
+        notify = lambda: pygame.event.post(pygame.event.Event(NET_EVENT))
+        try:
+            self.net = NetClient(host or "localhost", int(port or DEFAULT_PORT), notify)
+        except (OSError, ValueError) as e:
+            print(f"서버 접속 실패 ({address}): {e}")
+            self.play_local("서버 접속 실패, 로컬 대전")
+            return
+        self.net_game = game_id
+        self.net_ai = ai
+        self.game_mode = "NET"
+        self.ai_player = None
+        self.show_menu = False
+        self.reset_game()
+    
+    def play_local(self, status):
+        """서버 연결을 끊고 로컬 AI 대전으로 새로 시작 (상단에 status 표시)"""
+        self.disconnect()
+        self.game_mode = "AI"
+        self.ai_player = 2
+        self.show_menu = False
+        self.reset_game()
+        self.net_status = status
+    
+    def disconnect(self):
+        """서버 연결 끊기"""
+        if self.net is not None:
+            self.net.notify = None
+            self.net.close()
+            self.net = None
+        self.net_player = None
+        self.net_status = ""
+    
+    def handle_net(self):
+        """받은 서버 메시지 처리"""
+        if self.net is None:
+            return
+        for message in self.net.poll():
+            kind = message[0]
+            if kind == "MOVE":
+                self.make_move(int(message[1]), int(message[2]))
+            elif kind == "JOINED":
+                self.net_player = int(message[2])
+                color = "흑" if self.net_player == 1 else "백"
+                self.net_status = f"{color}, 대국 {message[1]}: 상대 기다리는 중"
+            elif kind == "START":
+                self.net_status = self.net_status.split(":")[0]
+            elif kind == "LEFT":
+                self.net_player = None
+                self.net_status = "상대가 나감 (R: 새 대국)"
+            elif kind == "ERROR":
+                error = " ".join(message[1:])
+                print(f"서버 오류: {error}")
+                if error in NET_FATAL_ERRORS:
+                    # 참가하지 못했거나 대국을 이어갈 수 없음 -> 기다리지 않고 로컬 대전
+                    self.play_local(f"서버 오류 {error}, 로컬 대전")
+                    return
+            elif kind == "CLOSED":
+                self.disconnect()
+                self.net_status = "연결 끊김"
+    
+    def quit(self):
+        """기록 파일, 서버 연결, 엔진(병렬 탐색 프로세스 풀)을 닫고 종료"""
+        self.ai_worker.cancel()
+        self.analysis_worker.cancel()
+        self.disconnect()
+        self.close_record(close_file=True)
+        engine = self.assets.peek("engine")
+        if engine is not None:
+            engine.close()
+        pygame.quit()
+        sys.exit()
     
     def is_valid_move(self, x, y):
         """유효한 수인지 확인"""
-        return self.board[x][y] == 0
+        return self.engine.is_valid_move(x, y)
     
     def make_move(self, x, y):
         """수 두기"""
-        if self.is_valid_move(x, y):
-            self.board[x][y] = self.current_player
-            self.last_move = (x, y)
-            
-            # 사운드 재생
-            if self.stone_sound:
-                self.stone_sound.play()
-            
-            if self.check_win(x, y):
-                self.game_over = True
-                self.winner = self.current_player
-                # 승리 효과
-                if self.win_sound:
-                    self.win_sound.play()
-                center_x = BOARD_OFFSET_X + x * CELL_SIZE
-                center_y = BOARD_OFFSET_Y + y * CELL_SIZE
-                self.create_celebration(center_x, center_y)
-                self.show_celebration = True
-                self.celebration_timer = 180  # 3초 (60fps * 3)
-                # 게임 종료 메뉴 표시
-                self.show_game_over_menu = True
-                self.game_over_selection = 0
-            elif self.check_draw():
-                self.game_over = True
-                self.winner = None
-                # 게임 종료 메뉴 표시
-                self.show_game_over_menu = True
-                self.game_over_selection = 0
-            else:
-                self.current_player = 3 - self.current_player  # 1->2, 2->1
-            return True
-        return False
-    
-    def check_win(self, x, y):
-        """승리 조건 확인"""
-        player = self.board[x][y]
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
+        if not self.engine.make_move(x, y):
+            return False
+        self.stop_analysis()  # AI가 생각을 시작하기 전에 힌트 분석을 멈춤
+        self.record_move(x, y)
+        if not self.viewport.contains(x, y):
+            self.viewport.center_on(x, y)  # 창 밖에 둔 수(AI)가 보이게 함
         
-        for dx, dy in directions:
-            count = 1
-            
-            # 양방향으로 확인
-            for direction in [1, -1]:
-                nx, ny = x, y
-                for _ in range(4):
-                    nx += dx * direction
-                    ny += dy * direction
-                    if (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 
-                        self.board[nx][ny] == player):
-                        count += 1
-                    else:
-                        break
-            
-            if count >= 5:
-                return True
-        return False
-    
-    def check_draw(self):
-        """무승부 확인"""
-        return np.all(self.board != 0)
+        # 사운드 재생
+        if self.stone_sound:
+            self.stone_sound.play()
+        
+        if self.winner:
+            # 승리 효과
+            if self.win_sound:
+                self.win_sound.play()
+            center_x, center_y = self.viewport.to_screen(x, y)
+            self.create_celebration(center_x, center_y)
+            self.show_celebration = True
+            self.celebration_timer = 180  # 3초 (60fps * 3)
+        
+        if self.game_over:
+            # 게임 종료 메뉴 표시
+            self.show_game_over_menu = True
+            self.game_over_selection = 0
+        return True
     
     def ai_move(self):
-        """AI 수 두기"""
+        """AI 수 두기 (계산은 백그라운드 스레드, 매 프레임 결과 확인)"""
         if self.game_over:
             return
         
-        # 지연 시간 확인
+        # 계산이 끝났으면 수 두기
+        finished = self.ai_worker.poll(self.engine)
+        if finished:
+            move, result = finished
+            if result:
+                self.engine.last_search = result
+                self.ai_search = result
+            self.make_move(*move)
+            return
+        if self.ai_worker.busy:
+            return
+        
+        # 지연 시간 확인 ("상"은 지연 시간을 탐색 시간으로 사용하므로 바로 시작)
         current_time = pygame.time.get_ticks()
-        if current_time - self.last_ai_time < self.ai_delay:
+        wait = 0 if self.ai_difficulty == "상" else self.ai_delay
+        if current_time - self.last_ai_time < wait:
             return
         
         self.last_ai_time = current_time
         
-        # 난이도에 따른 AI 전략
-        empty_positions = []
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.board[x][y] == 0:
-                    empty_positions.append((x, y))
-        
-        if empty_positions:
-            if self.ai_difficulty == "하":
-                # 하: 완전 랜덤
-                x, y = random.choice(empty_positions)
-            elif self.ai_difficulty == "중":
-                # 중: 기본 전략
-                priority_positions = []
-                for x, y in empty_positions:
-                    priority = 0
-                    # 중앙 근처
-                    center = BOARD_SIZE // 2
-                    if abs(x - center) <= 3 and abs(y - center) <= 3:
-                        priority += 10
-                    # 기존 돌 근처
-                    for dx in [-1, 0, 1]:
-                        for dy in [-1, 0, 1]:
-                            nx, ny = x + dx, y + dy
-                            if (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE and 
-                                self.board[nx][ny] != 0):
-                                priority += 1
-                    
-                    priority_positions.append((priority, x, y))
-                
-                priority_positions.sort(reverse=True)
-                top_choices = priority_positions[:5]
-                _, x, y = random.choice(top_choices)
-            else:  # 상
-                # 상: 고급 전략 (공격 + 방어)
-                best_score = float('-inf')
-                best_move = None
-                
-                for x, y in empty_positions:
-                    # 임시로 수를 두고 평가
-                    self.board[x][y] = self.ai_player
-                    score = self.evaluate_position(x, y)
-                    self.board[x][y] = 0
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_move = (x, y)
-                
-                if best_move:
-                    x, y = best_move
-                else:
-                    x, y = random.choice(empty_positions)
-            
-            self.make_move(x, y)
-    
-    def evaluate_position(self, x, y):
-        """위치 평가 (고급 AI용)"""
-        player = self.ai_player
-        opponent = 3 - player if player is not None else 1
-        score = 0
-        
-        # 공격 점수
-        score += self.evaluate_direction(x, y, player) * 2
-        
-        # 방어 점수
-        self.board[x][y] = opponent
-        score += self.evaluate_direction(x, y, opponent)
-        self.board[x][y] = player
-        
-        return score
-    
-    def evaluate_direction(self, x, y, player):
-        """특정 방향의 점수 평가"""
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-        total_score = 0
-        
-        for dx, dy in directions:
-            count = 1
-            blocked = 0
-            
-            # 양방향 확인
-            for direction in [1, -1]:
-                nx, ny = x, y
-                for _ in range(4):
-                    nx += dx * direction
-                    ny += dy * direction
-                    if (0 <= nx < BOARD_SIZE and 0 <= ny < BOARD_SIZE):
-                        if self.board[nx][ny] == player:
-                            count += 1
-                        elif self.board[nx][ny] != 0:
-                            blocked += 1
-                            break
-                        else:
-                            break
-                    else:
-                        blocked += 1
-                        break
-            
-            # 점수 계산
-            if count >= 5:
-                total_score += 10000
-            elif count == 4 and blocked == 0:
-                total_score += 1000
-            elif count == 3 and blocked == 0:
-                total_score += 100
-            elif count == 2 and blocked == 0:
-                total_score += 10
-        
-        return total_score
+        # 난이도에 따른 AI 전략 (엔진)
+        self.ai_worker.start(self.engine, self.ai_difficulty, self.ai_player,
+                             self.ai_delay / 1000)
     
     def reset_game(self):
         """게임 재시작"""
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-        self.current_player = 1
-        self.game_over = False
-        self.winner = None
-        self.last_move = None
-        self.particles = []
+        self.ai_worker.cancel()
+        self.ai_search = None
+        self.stop_analysis()
+        self.close_record()  # 두다 만 대국도 여기까지 남김
+        self.engine.reset()
+        self.particles.clear()
         self.show_celebration = False
         self.celebration_timer = 0
         self.last_ai_time = 0
         self.show_game_over_menu = False
         self.game_over_selection = 0
+        if self.net is not None:
+            # 온라인: 새 대국에 참가 (이름이 있으면 상대도 R을 누르면 같은 이름으로 다시 만남)
+            self.net_player = None
+            self.net_status = "참가 중"
+            self.net.join(self.net_game, self.board_size, self.net_ai)
+    
+    def stop_analysis(self):
+        """힌트 분석 중단, 예상 수순은 새 국면에서 다시 분석할 때까지 지움"""
+        self.analysis_worker.cancel()
+        self.analysis_position = None
+        self.analysis_pv = []
+        self.analysis_result = None
+    
+    def update_analysis(self):
+        """힌트: 끝난 분석의 예상 수순을 받고, 사람 차례면 새 국면 분석 시작
+
+        AI가 생각하거나 기다리는 동안에는 시작하지 않으므로 AI와 CPU를 나눠 쓰지 않는다.
+        """
+        worker = self.analysis_worker
+        finished = worker.poll(self.engine)
+        if finished:
+            self.analysis_pv, self.analysis_result = finished
+        if (worker.busy or self.game_over or self.show_game_over_menu or self.ai_turn() or
+                self.ai_worker.busy or self.analysis_position == len(self.engine.history)):
+            return
+        if self.game_mode == "NET" and self.current_player != self.net_player:
+            return
+        self.analysis_position = len(self.engine.history)
+        worker.start(self.engine, ANALYSIS_TIME, PV_LENGTH)
+    
+    def toggle_analysis(self):
+        """힌트 켜기/끄기 (화면 캐시를 다시 만듦)"""
+        self.show_analysis = not self.show_analysis
+        self.stop_analysis()
+        self.heat.reset()
+        self.scene_pv = []
+        self.scene_surface = None
     
     def toggle_mode(self):
         """게임 모드 변경"""
+        self.disconnect()
         self.game_mode = "2P" if self.game_mode == "AI" else "AI"
         self.ai_player = 2 if self.game_mode == "AI" else None
         self.reset_game()
     
     def change_difficulty(self):
         """AI 난이도 변경"""
-        difficulties = ["하", "중", "상"]
-        current_index = difficulties.index(self.ai_difficulty)
-        self.ai_difficulty = difficulties[(current_index + 1) % 3]
+        current_index = DIFFICULTIES.index(self.ai_difficulty)
+        self.ai_difficulty = DIFFICULTIES[(current_index + 1) % 3]
     
     def set_custom_stone_path(self):
         """사용자 이미지 경로 설정"""
@@ -862,125 +1554,284 @@ class Gomoku3DLight:
             self.update_stone_images()
     
     def render(self):
-        """화면 렌더링"""
+        """화면 렌더링 (바뀐 것이 없으면 그리지 않고, 게임 중에는 바뀐 영역만 반영)"""
         if self.show_menu:
-            self.draw_menu()
+            state = ("menu", self.menu_selection, self.difficulty_selection,
+                     self.stone_selection, self.ai_difficulty, self.custom_stone_path)
+            if state != self.screen_state:
+                self.draw_menu()
+                pygame.display.flip()
+                self.screen_state = state
+            return
+        
+        stone_rects = self.update_scene()
+        header = self.ui_state()
+        particles = self.show_celebration and self.celebration_timer > 0
+        state = ("game", self.game_over_selection if self.show_game_over_menu else None)
+        full = stone_rects is None or state != self.screen_state
+        if self.show_game_over_menu:
+            # 반투명 메뉴가 화면 전체를 덮으므로 무엇이든 바뀌면 전체를 다시 그림
+            full = (full or bool(stone_rects) or header != self.header_state or
+                    particles or self.particle_rect is not None)
+        elif not (full or stone_rects or header != self.header_state or
+                  particles or self.particle_rect is not None):
+            return  # 바뀐 것 없음
+        
+        if full:
+            screen.blit(self.scene_surface, (0, 0))
+            dirty = None
         else:
-            screen.fill(LIGHT_BROWN)
-            self.draw_3d_board()
-            self.draw_stones()
+            # 새 돌과 지난 프레임의 파티클 자리를 캐시에서 복원
+            dirty = list(stone_rects)
+            if self.particle_rect is not None:
+                dirty.append(self.particle_rect)
+            for rect in dirty:
+                screen.blit(self.scene_surface, rect, rect)
+        
+        # 상단 UI (파티클이 지나갔을 수 있으므로 파티클이 있을 때도 다시 그림)
+        if full or header != self.header_state or dirty:
+            if dirty is not None:
+                # 조작법 글자는 상단 띠 아래로 내려오므로 그 부분도 캐시에서 복원
+                ui_rect = self.ui_rect()
+                screen.blit(self.scene_surface, ui_rect, ui_rect)
+                dirty.append(ui_rect)
             self.draw_ui()
-            
-            # 폭죽 효과
-            if self.show_celebration and self.celebration_timer > 0:
-                self.draw_particles()
-                self.celebration_timer -= 1
-                if self.celebration_timer <= 0:
-                    self.show_celebration = False
-            
-            # 게임 종료 메뉴
-            if self.show_game_over_menu:
-                self.draw_game_over_menu()
         
-        pygame.display.flip()
+        # 폭죽 효과
+        self.particle_rect = None
+        if particles:
+            self.draw_particles()
+            self.particle_rect = self.particle_bounds()
+            if dirty is not None and self.particle_rect is not None:
+                dirty.append(self.particle_rect)
+            self.celebration_timer -= 1
+            if self.celebration_timer <= 0:
+                self.show_celebration = False
+        
+        # 게임 종료 메뉴
+        if self.show_game_over_menu:
+            self.draw_game_over_menu()
+        
+        if dirty is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.screen_state = state
+        self.header_state = header
+    
+    def handle_event(self, event):
+        """이벤트 하나 처리"""
+        if event.type == pygame.QUIT:
+            self.quit()
+        
+        if event.type == NET_EVENT:
+            self.handle_net()
+        
+        if event.type == pygame.VIDEOEXPOSE:
+            self.screen_state = None  # 창이 다시 보이면 전체를 다시 그림
+        
+        if event.type == pygame.KEYDOWN:
+            if self.show_menu:
+                if event.key == pygame.K_UP:
+                    self.menu_selection = (self.menu_selection - 1) % 5
+                elif event.key == pygame.K_DOWN:
+                    self.menu_selection = (self.menu_selection + 1) % 5
+                elif event.key == pygame.K_LEFT and self.menu_selection == 2:
+                    self.difficulty_selection = (self.difficulty_selection - 1) % 3
+                    difficulties = ["하", "중", "상"]
+                    self.ai_difficulty = difficulties[self.difficulty_selection]
+                elif event.key == pygame.K_RIGHT and self.menu_selection == 2:
+                    self.difficulty_selection = (self.difficulty_selection + 1) % 3
+                    difficulties = ["하", "중", "상"]
+                    self.ai_difficulty = difficulties[self.difficulty_selection]
+                elif event.key == pygame.K_LEFT and self.menu_selection == 3:
+                    self.stone_selection = (self.stone_selection - 1) % 4
+                    self.update_stone_images()
+                elif event.key == pygame.K_RIGHT and self.menu_selection == 3:
+                    self.stone_selection = (self.stone_selection + 1) % 4
+                    self.update_stone_images()
+                elif event.key == pygame.K_RETURN:
+                    if self.menu_selection in (0, 1):
+                        self.disconnect()
+                    if self.menu_selection == 0:  # AI 대전
+                        self.game_mode = "AI"
+                        self.ai_player = 2
+                        self.show_menu = False
+                        self.reset_game()
+                    elif self.menu_selection == 1:  # 2인 대전
+                        self.game_mode = "2P"
+                        self.ai_player = None
+                        self.show_menu = False
+                        self.reset_game()
+                    elif self.menu_selection == 2:  # 난이도 설정
+                        pass  # 이미 설정됨
+                    elif self.menu_selection == 3:  # 돌 선택
+                        pass  # 이미 설정됨
+                    elif self.menu_selection == 4:  # 종료
+                        self.quit()
+            else:
+                if event.key == pygame.K_ESCAPE:
+                    self.ai_worker.cancel()
+                    self.stop_analysis()
+                    self.show_menu = True
+                elif event.key == pygame.K_r:
+                    self.reset_game()
+                elif event.key == pygame.K_m:
+                    self.toggle_mode()
+                elif event.key == pygame.K_d:
+                    self.change_difficulty()
+                elif event.key == pygame.K_s:
+                    self.set_custom_stone_path()
+                elif event.key == pygame.K_h:
+                    self.toggle_analysis()
+                elif event.key == pygame.K_c and self.last_move:
+                    self.viewport.center_on(*self.last_move)
+                elif not self.show_game_over_menu and event.key in VIEW_SCROLL_KEYS:
+                    self.viewport.scroll(*VIEW_SCROLL_KEYS[event.key])
+        
+        # 게임 종료 메뉴 키보드 처리
+        if self.show_game_over_menu:
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    self.game_over_selection = (self.game_over_selection - 1) % 2
+                elif event.key == pygame.K_DOWN:
+                    self.game_over_selection = (self.game_over_selection + 1) % 2
+                elif event.key == pygame.K_RETURN:
+                    if self.game_over_selection == 0:  # 다시 하기
+                        self.reset_game()
+                        self.show_game_over_menu = False
+                    elif self.game_over_selection == 1:  # 나가기
+                        self.show_menu = True
+                        self.show_game_over_menu = False
+        
+        # 보드 창 확대(휠)와 스크롤(오른쪽 드래그)
+        if not self.show_menu:
+            if event.type == pygame.MOUSEWHEEL:
+                self.viewport.zoom(event.y, pygame.mouse.get_pos())
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+                self.drag_start = (event.pos, self.viewport.x0, self.viewport.y0)
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 3:
+                self.drag_start = None
+            elif event.type == pygame.MOUSEMOTION and self.drag_start and event.buttons[2]:
+                (start_x, start_y), x0, y0 = self.drag_start
+                cell = self.viewport.cell
+                self.viewport.x0 = x0 - round((event.pos[0] - start_x) / cell)
+                self.viewport.y0 = y0 - round((event.pos[1] - start_y) / cell)
+                self.viewport.clamp()
+        
+        if event.type == pygame.MOUSEBUTTONDOWN and not self.show_menu and not self.show_game_over_menu:
+            if event.button == 1:  # 좌클릭
+                pos = self.get_board_position(event.pos[0], event.pos[1])
+                if pos and self.game_mode == "NET":
+                    # 온라인: 서버에 보내고, 서버가 돌려준 MOVE로 둠
+                    if (self.net is not None and self.current_player == self.net_player and
+                            self.is_valid_move(*pos)):
+                        self.net.move(*pos)
+                elif pos:
+                    if self.make_move(pos[0], pos[1]):
+                        # AI 모드이고 AI 차례라면 지연 시간 설정
+                        if (self.game_mode == "AI" and not self.game_over and 
+                            self.current_player == self.ai_player):
+                            self.last_ai_time = pygame.time.get_ticks()
+    
+    def ai_turn(self):
+        """AI가 둘 차례인지"""
+        return (not self.show_menu and not self.game_over and not self.show_game_over_menu and
+                self.game_mode == "AI" and self.current_player == self.ai_player)
+    
+    def loop_state(self):
+        """메인 루프 상태
+
+        animating(파티클), ai(AI 계산 중)는 60fps로 돌고, analysis(힌트 분석 중)는 10fps로 결과를 확인하고,
+        ai_wait(AI 지연 시간 대기), menu, idle(사람 입력 대기)은 이벤트가 올 때까지 잔다.
+        """
+        if self.show_celebration or self.particle_rect is not None:
+            return "animating"  # 마지막 파티클을 지우는 프레임까지
+        if self.ai_turn():
+            return "ai" if self.ai_worker.busy else "ai_wait"
+        if self.show_analysis and not self.show_menu and self.analysis_worker.busy:
+            return "analysis"
+        return "menu" if self.show_menu else "idle"
+    
+    def wait_timeout(self, state):
+        """잠들 수 있는 최대 시간 (밀리초, 0이면 이벤트가 올 때까지)"""
+        if state == "ai_wait":
+            wait = 0 if self.ai_difficulty == "상" else self.ai_delay
+            return max(1, self.last_ai_time + wait - pygame.time.get_ticks())
+        if state == "analysis":
+            return 100
+        return 0
     
-    def run(self):
-        """게임 메인 루프"""
+    def run(self, loop_stats=False, profile_startup=False):
+        """게임 메인 루프 (움직이는 것이 있을 때만 60fps, 아니면 이벤트를 기다리며 잠듦)"""
         clock = pygame.time.Clock()
+        # AI 스레드가 GIL을 오래 잡고 있지 않도록 전환 간격을 줄임 (기본 5ms)
+        sys.setswitchinterval(0.001)
+        stats = LoopStats() if loop_stats else None
+        
+        # 첫 화면(메뉴)은 이벤트를 기다리지 않고 바로 그림
+        with startup_profile.stage("첫 화면"):
+            self.render()
+        if profile_startup:
+            startup_profile.report(self.assets)
+            self.assets.verbose = True  # 이후 처음 쓰는 자원도 출력
         
         while True:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                
-                if event.type == pygame.KEYDOWN:
-                    if self.show_menu:
-                        if event.key == pygame.K_UP:
-                            self.menu_selection = (self.menu_selection - 1) % 5
-                        elif event.key == pygame.K_DOWN:
-                            self.menu_selection = (self.menu_selection + 1) % 5
-                        elif event.key == pygame.K_LEFT and self.menu_selection == 2:
-                            self.difficulty_selection = (self.difficulty_selection - 1) % 3
-                            difficulties = ["하", "중", "상"]
-                            self.ai_difficulty = difficulties[self.difficulty_selection]
-                        elif event.key == pygame.K_RIGHT and self.menu_selection == 2:
-                            self.difficulty_selection = (self.difficulty_selection + 1) % 3
-                            difficulties = ["하", "중", "상"]
-                            self.ai_difficulty = difficulties[self.difficulty_selection]
-                        elif event.key == pygame.K_LEFT and self.menu_selection == 3:
-                            self.stone_selection = (self.stone_selection - 1) % 4
-                            self.update_stone_images()
-                        elif event.key == pygame.K_RIGHT and self.menu_selection == 3:
-                            self.stone_selection = (self.stone_selection + 1) % 4
-                            self.update_stone_images()
-                        elif event.key == pygame.K_RETURN:
-                            if self.menu_selection == 0:  # AI 대전
-                                self.game_mode = "AI"
-                                self.ai_player = 2
-                                self.show_menu = False
-                                self.reset_game()
-                            elif self.menu_selection == 1:  # 2인 대전
-                                self.game_mode = "2P"
-                                self.ai_player = None
-                                self.show_menu = False
-                                self.reset_game()
-                            elif self.menu_selection == 2:  # 난이도 설정
-                                pass  # 이미 설정됨
-                            elif self.menu_selection == 3:  # 돌 선택
-                                pass  # 이미 설정됨
-                            elif self.menu_selection == 4:  # 종료
-                                pygame.quit()
-                                sys.exit()
-                    else:
-                        if event.key == pygame.K_ESCAPE:
-                            self.show_menu = True
-                        elif event.key == pygame.K_r:
-                            self.reset_game()
-                        elif event.key == pygame.K_m:
-                            self.toggle_mode()
-                        elif event.key == pygame.K_d:
-                            self.change_difficulty()
-                        elif event.key == pygame.K_s:
-                            self.set_custom_stone_path()
-                
-                # 게임 종료 메뉴 키보드 처리
-                if self.show_game_over_menu:
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_UP:
-                            self.game_over_selection = (self.game_over_selection - 1) % 2
-                        elif event.key == pygame.K_DOWN:
-                            self.game_over_selection = (self.game_over_selection + 1) % 2
-                        elif event.key == pygame.K_RETURN:
-                            if self.game_over_selection == 0:  # 다시 하기
-                                self.reset_game()
-                                self.show_game_over_menu = False
-                            elif self.game_over_selection == 1:  # 나가기
-                                self.show_menu = True
-                                self.show_game_over_menu = False
-                
-                if event.type == pygame.MOUSEBUTTONDOWN and not self.show_menu and not self.show_game_over_menu:
-                    if event.button == 1:  # 좌클릭
-                        pos = self.get_board_position(event.pos[0], event.pos[1])
-                        if pos:
-                            if self.make_move(pos[0], pos[1]):
-                                # AI 모드이고 AI 차례라면 지연 시간 설정
-                                if (self.game_mode == "AI" and not self.game_over and 
-                                    self.current_player == self.ai_player):
-                                    self.last_ai_time = pygame.time.get_ticks()
+            state = self.loop_state()
+            if state in ("animating", "ai"):
+                events = pygame.event.get()
+            else:
+                event = pygame.event.wait(self.wait_timeout(state))
+                events = [event] + pygame.event.get()
+            for event in events:
+                self.handle_event(event)
             
             # AI 수 두기
-            if (not self.show_menu and not self.game_over and not self.show_game_over_menu and 
-                self.game_mode == "AI" and self.current_player == self.ai_player):
+            if self.ai_turn():
                 self.ai_move()
             
+            # 힌트 분석 (사람 차례에만)
+            if self.show_analysis and not self.show_menu:
+                self.update_analysis()
+            
             # 파티클 업데이트
             if self.show_celebration:
                 self.update_particles()
             
             self.render()
-            clock.tick(60)
+            if state in ("animating", "ai"):
+                clock.tick(60)
+            if stats:
+                stats.frame(state)
 
 if __name__ == "__main__":
-    game = Gomoku3DLight()
-    game.run() 
+    parser = argparse.ArgumentParser(description="3D 오목 게임")
+    parser.add_argument("--loop-stats", action="store_true",
+                        help="메인 루프 상태별 FPS와 CPU 사용률 출력")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="시작 단계별 시간과 자원 로드 시간 출력")
+    parser.add_argument("--size", type=int, default=BOARD_SIZE,
+                        help="보드 크기 (19보다 크면 스크롤/확대해서 일부만 보임)")
+    parser.add_argument("--free", action="store_true",
+                        help=f"사실상 끝이 없는 자유 보드 ({FREE_BOARD_SIZE}x{FREE_BOARD_SIZE})")
+    parser.add_argument("--record", default=RECORD_PATH,
+                        help=f"대국 기록 파일 (기본 {RECORD_PATH})")
+    parser.add_argument("--no-record", action="store_true", help="대국을 기록하지 않음")
+    parser.add_argument("--connect", metavar="HOST:PORT",
+                        help="오목 서버(python gomoku_server.py serve)에 접속해 온라인 대국")
+    parser.add_argument("--game", help="온라인 대국 이름 (같은 이름끼리 만남, 없으면 자동 짝짓기)")
+    parser.add_argument("--server-ai", choices=DIFFICULTIES,
+                        help="온라인에서 서버 AI와 대국 (서버가 여러 대국의 AI 수를 묶어서 계산)")
+    parser.add_argument("--hint", action="store_true",
+                        help="힌트(수 점수 열지도와 예상 수순)를 켜고 시작 (게임 중 H로 켜고 끔)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="\"상\" 탐색 프로세스 수 (2 이상이면 프로세스 풀 병렬 탐색)")
+    args = parser.parse_args()
+    with startup_profile.stage("게임 객체"):
+        game = Gomoku3DLight(FREE_BOARD_SIZE if args.free else args.size,
+                             record_path=None if args.no_record else args.record,
+                             search_workers=args.workers)
+    game.show_analysis = args.hint
+    if args.connect:
+        game.connect(args.connect, args.game, args.server_ai)
+    game.run(loop_stats=args.loop_stats, profile_startup=args.profile_startup)
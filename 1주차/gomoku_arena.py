@@ -0,0 +1,257 @@
+"""화면 없이 AI끼리 대국시키는 대전장
+
+사용법:
+    python gomoku_arena.py 상:time=0.2 중 [--games 20] [--jobs 4] [--output arena_results.json]
+                           [--record arena.gmr]
+
+AI 설정은 "난이도[:키=값,...]" 형식이다.
+    time=초   "상" 탐색 시간 (기본 SEARCH_TIME_LIMIT)
+    book=0/1  "상" 정석 사용 여부 (기본 1)
+    tt=MB     치환표 크기 (기본 TT_SIZE_MB)
+    workers=N "상" 탐색 프로세스 수 (기본 1, 2 이상이면 gomoku_parallel 병렬 탐색)
+두 설정은 판마다 흑백을 바꿔 두고, 결과는 첫 번째 설정 기준으로 집계한다.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from gomoku_engine import BOARD_SIZE, DIFFICULTIES, GomokuEngine, SEARCH_TIME_LIMIT, TT_SIZE_MB
+from gomoku_record import DRAW, GameRecord, write_games
+
+
+def parse_config(text):
+    """"상:time=0.5,book=0" -> 설정 딕셔너리"""
+    difficulty, _, options = text.partition(":")
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"알 수 없는 난이도: {difficulty}")
+    config = {"name": text, "difficulty": difficulty, "time": SEARCH_TIME_LIMIT,
+              "book": True, "tt": TT_SIZE_MB, "workers": 1}
+    for option in filter(None, options.split(",")):
+        key, _, value = option.partition("=")
+        if key == "time":
+            config["time"] = float(value)
+        elif key == "book":
+            config["book"] = value not in ("0", "false", "no")
+        elif key == "tt":
+            config["tt"] = int(value)
+        elif key == "workers":
+            config["workers"] = int(value)
+        else:
+            raise ValueError(f"알 수 없는 설정: {key}")
+    return config
+
+
+def random_opening(engine, plies, rng):
+    """중앙 5x5 안에 흑백을 번갈아 무작위로 plies수 둠 (대국마다 다른 초반)"""
+    center = engine.board_size // 2
+    cells = [(x, y) for x in range(center - 2, center + 3) for y in range(center - 2, center + 3)]
+    rng.shuffle(cells)
+    for x, y in cells[:plies]:
+        engine.make_move(x, y)
+
+
+def play_game(configs, seed, board_size=BOARD_SIZE, opening_plies=2):
+    """configs[0]이 흑, configs[1]이 백인 한 판. 대국 기록 딕셔너리를 반환."""
+    rng = random.Random(seed)
+    # 두 AI는 각자 엔진(치환표)을 쓰고, 수는 양쪽에 똑같이 둔다
+    engines = [GomokuEngine(board_size, tt_size_mb=config["tt"], search_workers=config["workers"],
+                            use_book=config["book"])
+               for config in configs]
+    try:
+        return _play(engines, configs, seed, board_size, opening_plies, rng)
+    finally:
+        for engine in engines:
+            engine.close()  # 병렬 탐색 프로세스 풀
+
+
+def _play(engines, configs, seed, board_size, opening_plies, rng):
+    """play_game 본체: 만든 엔진들로 초반을 두고 끝까지 둠"""
+    opening = GomokuEngine(board_size, use_book=False)
+    random_opening(opening, opening_plies, rng)
+    for engine in engines:
+        for x, y, _ in opening.history:
+            engine.make_move(x, y)
+
+    sides = [{"moves": 0, "time": 0.0, "search_time": 0.0, "nodes": 0} for _ in configs]
+    game = engines[0]
+    while not game.game_over and not game.check_draw():
+        index = game.current_player - 1
+        config, engine = configs[index], engines[index]
+        engine.last_search = None
+        start = time.perf_counter()
+        move = engine.choose_move(config["difficulty"], rng=rng, time_limit=config["time"])
+        elapsed = time.perf_counter() - start
+        side = sides[index]
+        side["moves"] += 1
+        side["time"] += elapsed
+        if engine.last_search is not None:
+            side["nodes"] += engine.last_search.nodes
+            side["search_time"] += engine.last_search.elapsed
+        for other in engines:
+            other.make_move(*move)
+
+    return {"seed": seed, "black": configs[0]["name"], "white": configs[1]["name"],
+            "winner": game.winner or 0, "length": len(game.history),
+            "moves": [[x, y] for x, y, _ in game.history], "sides": sides}
+
+
+def _play_indexed(args):
+    """프로세스 풀용: (i, 설정 A, 설정 B, 시드, 크기, 초반 수) -> 대국 기록"""
+    i, config_a, config_b, seed, board_size, opening_plies = args
+    configs = (config_a, config_b) if i % 2 == 0 else (config_b, config_a)
+    record = play_game(configs, seed, board_size, opening_plies)
+    record["a_player"] = 1 if i % 2 == 0 else 2  # 설정 A의 돌 색
+    return record
+
+
+def elo_estimate(wins, draws, losses):
+    """점수율로 Elo 차이와 95% 범위 추정 (A가 B보다 몇 점 높은지): (Elo, 하한, 상한)
+
+    범위는 점수율의 Wilson 구간(무승부는 반승)으로 구한다. 전승이면 상한이,
+    전패면 하한이 없으므로 None (Elo 추정값도 None).
+    """
+    games = wins + draws + losses
+    score = (wins + draws / 2) / games
+    z = 1.96
+    center = (score + z * z / (2 * games)) / (1 + z * z / games)
+    half = z / (1 + z * z / games) * math.sqrt(score * (1 - score) / games +
+                                               z * z / (4 * games * games))
+
+    def to_elo(p):
+        return 400 * math.log10(p / (1 - p))
+
+    elo = to_elo(score) if 0 < score < 1 else None
+    low = to_elo(center - half) if score > 0 else None
+    high = to_elo(center + half) if score < 1 else None
+    return elo, low, high
+
+
+def elo_text(elo, low, high):
+    """Elo 추정을 출력용 문자열로 (한쪽이 무한이면 ">+X" / "<-X")"""
+    if high is None:
+        return f">{low:+.0f} (95% 하한)"
+    if low is None:
+        return f"<{high:+.0f} (95% 상한)"
+    return f"{elo:+.0f} (95% 범위 {low:+.0f} ~ {high:+.0f})"
+
+
+def summarize(records, config_a, config_b):
+    """대국 기록을 설정 A 기준으로 집계"""
+    wins = draws = losses = 0
+    totals = [{"moves": 0, "time": 0.0, "search_time": 0.0, "nodes": 0} for _ in range(2)]
+    for record in records:
+        a_player = record["a_player"]
+        if record["winner"] == 0:
+            draws += 1
+        elif record["winner"] == a_player:
+            wins += 1
+        else:
+            losses += 1
+        # sides는 흑, 백 순서이므로 A, B 순서로 바꿔 더함
+        sides = record["sides"] if a_player == 1 else record["sides"][::-1]
+        for total, side in zip(totals, sides):
+            for key in total:
+                total[key] += side[key]
+
+    games = len(records)
+    elo, elo_low, elo_high = elo_estimate(wins, draws, losses)
+    players = []
+    for config, total in zip((config_a, config_b), totals):
+        players.append({
+            "name": config["name"],
+            "ms_per_move": total["time"] / max(total["moves"], 1) * 1000,
+            "nodes": total["nodes"],
+            "nps": total["nodes"] / total["search_time"] if total["search_time"] else 0.0,
+        })
+    return {"games": games, "wins": wins, "draws": draws, "losses": losses,
+            "win_rate": wins / games, "draw_rate": draws / games,
+            "elo": elo, "elo_low": elo_low, "elo_high": elo_high,
+            "avg_length": sum(record["length"] for record in records) / games,
+            "players": players}
+
+
+def run_arena(config_a, config_b, games, jobs=1, seed=0, board_size=BOARD_SIZE, opening_plies=2):
+    """games판을 두고 (대국 기록 목록, 집계) 반환. jobs가 2 이상이면 프로세스 병렬."""
+    tasks = [(i, config_a, config_b, seed + i, board_size, opening_plies) for i in range(games)]
+    records = []
+    start = time.perf_counter()
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            for record in pool.map(_play_indexed, tasks):
+                records.append(record)
+                print_progress(record, len(records), games)
+    else:
+        for task in tasks:
+            record = _play_indexed(task)
+            records.append(record)
+            print_progress(record, len(records), games)
+    summary = summarize(records, config_a, config_b)
+    summary["elapsed"] = time.perf_counter() - start
+    return records, summary
+
+
+def record_games(path, records, board_size):
+    """대국 기록을 대국 기록 파일에 덧붙임 (python gomoku_record.py로 검증/내보내기)"""
+    games = (GameRecord.from_moves(board_size, record["moves"], record["winner"] or DRAW)
+             for record in records)
+    print(f"대국 {write_games(path, games)}개 기록: {path}")
+
+
+def print_progress(record, done, games):
+    """한 판 결과 한 줄 출력"""
+    result = {0: "무승부", 1: "흑 승", 2: "백 승"}[record["winner"]]
+    print(f"[{done}/{games}] 흑 {record['black']} 대 백 {record['white']}: "
+          f"{result} ({record['length']}수)")
+
+
+def print_summary(summary, config_a, config_b):
+    """집계 표 출력"""
+    print()
+    print(f"{config_a['name']} 대 {config_b['name']}: {summary['games']}판 "
+          f"{summary['wins']}승 {summary['draws']}무 {summary['losses']}패 "
+          f"(승률 {summary['win_rate'] * 100:.1f}%, 무승부 {summary['draw_rate'] * 100:.1f}%)")
+    print(f"Elo 차이: {elo_text(summary['elo'], summary['elo_low'], summary['elo_high'])}")
+    print(f"평균 대국 길이: {summary['avg_length']:.1f}수, 전체 {summary['elapsed']:.1f}초")
+    print(f"{'설정':<16} {'ms/수':>9} {'노드':>10} {'노드/초':>9}")
+    for player in summary["players"]:
+        print(f"{player['name']:<16} {player['ms_per_move']:>9.1f} {player['nodes']:>10} "
+              f"{player['nps']:>9.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오목 AI 대전장")
+    parser.add_argument("first", help="첫 번째 AI 설정 (예: 상:time=0.5)")
+    parser.add_argument("second", help="두 번째 AI 설정 (예: 중)")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--jobs", type=int, default=1, help="동시에 둘 대국 수 (프로세스)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    parser.add_argument("--opening-plies", type=int, default=2, help="무작위로 둘 초반 수")
+    parser.add_argument("--output", default="arena_results.json", help="결과 JSON 파일")
+    parser.add_argument("--record", help="대국을 덧붙일 대국 기록 파일 (.gmr)")
+    args = parser.parse_args()
+    if args.games < 1:
+        parser.error("--games는 1 이상이어야 함")
+
+    config_a, config_b = parse_config(args.first), parse_config(args.second)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    records, summary = run_arena(config_a, config_b, args.games, jobs, args.seed, args.size,
+                                 args.opening_plies)
+    print_summary(summary, config_a, config_b)
+
+    result = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "configs": [config_a, config_b],
+              "board_size": args.size, "opening_plies": args.opening_plies, "seed": args.seed,
+              "summary": summary, "games": records}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=1)
+    print(f"결과 저장: {args.output}")
+    if args.record:
+        record_games(args.record, records, args.size)
+
+
+if __name__ == "__main__":
+    main()
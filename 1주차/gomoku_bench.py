@@ -0,0 +1,467 @@
+"""오목 엔진 벤치마크
+
+사용법:
+    python gomoku_bench.py board [--sizes 15 19 31] [--repeat 5]
+    python gomoku_bench.py parallel [--workers 1 2 4 8] [--depth 6]
+    python gomoku_bench.py vector [--positions 50]
+    python gomoku_bench.py micro [--baseline gomoku_bench_baseline.json] [--threshold 0.2]
+                                 [--save-baseline]
+    python gomoku_bench.py sparse [--sizes 15 19 101 1001 32768] [--stones 40]
+    python gomoku_bench.py batch [--counts 1 10 100 500]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from gomoku_engine import Board, BOARD_SIZE, DIFFICULTIES, GomokuEngine
+from gomoku_bitboard import BitBoard
+from gomoku_parallel import PARALLEL_MIN_DEPTH, ParallelSearch
+from gomoku_search import AlphaBetaSearch
+from gomoku_sparse import FREE_BOARD_SIZE, SparseBoard
+from gomoku_vcf import ThreatSolver
+from gomoku_vector import choose_moves, medium_priority_map, position_score_map
+
+
+def random_position(board_factory, size, stones, seed):
+    """시드 고정 랜덤 배치 (흑백 번갈아)"""
+    rng = random.Random(seed)
+    board = board_factory(size)
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    rng.shuffle(cells)
+    for i, (x, y) in enumerate(cells[:stones]):
+        board.set(x, y, 1 + i % 2)
+    return board
+
+
+def seeded_game(seed, plies, board_size=BOARD_SIZE):
+    """시드 고정 "중" 대 "중" 대국을 plies수까지 둔 엔진"""
+    rng = random.Random(seed)
+    engine = GomokuEngine(board_size)
+    while len(engine.history) < plies and not engine.game_over:
+        engine.make_move(*engine.choose_move("중", rng=rng))
+    if engine.game_over:
+        engine.undo()
+    return engine
+
+
+def crowded_position(seed, stones, board_size=BOARD_SIZE, quiet=False):
+    """시드 고정 무작위 배치로 stones개를 둔 엔진 (5목이 되는 칸은 건너뜀)
+
+    quiet이면 두고 나서 어느 쪽이든 4를 만들 수 있는 칸이 생기는 수도 건너뛴다.
+    4를 만들 수 없으면 VCF도 없으므로 "상"이 강제승 탐색으로 바로 끝나지 않고
+    알파베타 탐색을 한다. 이때는 stones개보다 적게 두고 멈출 수 있다.
+    """
+    rng = random.Random(seed)
+    engine = GomokuEngine(board_size, use_book=False)
+    solver = ThreatSolver(engine)
+    cells = engine.empty_positions()
+    rng.shuffle(cells)
+    for x, y in cells:
+        if len(engine.history) >= stones:
+            break
+        engine.make_move(x, y)
+        if engine.game_over or any(solver.five_cells(player) or (quiet and solver.four_moves(player))
+                                   for player in (1, 2)):
+            engine.undo()
+    return engine
+
+
+def best_time(func, repeat):
+    """repeat번 실행한 최소 시간 (초)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def full_scan(board):
+    """모든 돌에 대해 5목 확인 (배열 보드용 전체 스캔)"""
+    for x, y, _ in board.stones():
+        if board.check_win(x, y):
+            return True
+    return False
+
+
+def bitboard_scan(board):
+    """시프트 AND로 양쪽 5목 확인"""
+    return board.has_five(1) or board.has_five(2)
+
+
+def bench_board(sizes, repeat, positions=20):
+    """Board (NumPy) 대 BitBoard 비교"""
+    print(f"{'크기':>4} {'항목':<12} {'NumPy(ms)':>10} {'BitBoard(ms)':>13} {'배속':>7}")
+    for size in sizes:
+        stones = size * size // 3
+        boards = [random_position(Board, size, stones, seed) for seed in range(positions)]
+        bitboards = [random_position(BitBoard, size, stones, seed) for seed in range(positions)]
+
+        # 두 백엔드가 같은 결과를 내는지 먼저 확인
+        for board, bitboard in zip(boards, bitboards):
+            assert board.stones() == bitboard.stones()
+            assert full_scan(board) == bitboard_scan(bitboard)
+            for x, y, _ in board.stones():
+                assert board.check_win(x, y) == bitboard.check_win(x, y)
+
+        def check_all(items):
+            def run():
+                for board in items:
+                    for x, y, _ in board.stones():
+                        board.check_win(x, y)
+            return run
+
+        cases = [
+            ("check_win", check_all(boards), check_all(bitboards)),
+            ("full_scan",
+             lambda: [full_scan(b) for b in boards],
+             lambda: [bitboard_scan(b) for b in bitboards]),
+            ("empty_cells",
+             lambda: [b.empty_cells() for b in boards],
+             lambda: [b.empty_cells() for b in bitboards]),
+        ]
+        for name, numpy_func, bit_func in cases:
+            numpy_time = best_time(numpy_func, repeat) * 1000
+            bit_time = best_time(bit_func, repeat) * 1000
+            print(f"{size:>4} {name:<12} {numpy_time:>10.2f} {bit_time:>13.2f} "
+                  f"{numpy_time / bit_time:>6.1f}x")
+
+
+def bench_parallel(worker_counts, depth, positions=4, plies=4, time_limit=600.0):
+    """작업 수별 고정 깊이 도달 시간과 초당 노드 수"""
+    engines = [seeded_game(seed, plies) for seed in range(positions)]
+
+    # 기준: 단일 프로세스 알파베타
+    serial_time = serial_nodes = 0
+    for engine in engines:
+        result = AlphaBetaSearch(engine).search(time_limit, max_depth=depth)
+        serial_time += result.elapsed
+        serial_nodes += result.nodes
+    print(f"{'작업 수':>6} {'깊이 도달(s)':>12} {'노드':>9} {'노드/초':>9} {'배속':>6}")
+    print(f"{'직렬':>6} {serial_time:>12.2f} {serial_nodes:>9} "
+          f"{serial_nodes / serial_time:>9.0f} {1.0:>5.2f}x")
+
+    for workers in worker_counts:
+        search = ParallelSearch(workers)
+        total_time = total_nodes = 0
+        try:
+            # 프로세스 시작 시간은 빼고 잰다 (얕은 깊이는 직렬이므로 풀을 쓰는 깊이까지,
+            # 작업 프로세스 치환표가 미리 차지 않게 잴 국면이 아닌 국면으로)
+            search.search(seeded_game(positions, plies), time_limit, max_depth=PARALLEL_MIN_DEPTH)
+            for engine in engines:
+                result = search.search(engine, time_limit, max_depth=depth)
+                total_time += result.elapsed
+                total_nodes += result.nodes
+        finally:
+            search.close()
+        print(f"{workers:>6} {total_time:>12.2f} {total_nodes:>9} "
+              f"{total_nodes / total_time:>9.0f} {serial_time / total_time:>5.2f}x")
+
+
+def per_cell_maps(engine, player):
+    """엔진의 칸별 함수로 만든 (evaluate_position 점수표, "중" 점수표)"""
+    size = engine.board_size
+    position_map = np.full((size, size), -1, dtype=np.int64)
+    medium_map = np.full((size, size), -1, dtype=np.int64)
+    for x, y in engine.empty_positions():
+        engine.board.set(x, y, player)
+        position_map[x, y] = engine.evaluate_position(x, y, player)
+        engine.board.set(x, y, 0)
+    for priority, x, y in engine.medium_priorities(engine.empty_positions()):
+        medium_map[x, y] = priority
+    return position_map, medium_map
+
+
+def bench_vector(positions, repeat=3):
+    """벡터화 점수표가 칸별 함수와 같은지 확인하고 시간 비교"""
+    engines = [seeded_game(seed, plies) for seed in range(positions)
+               for plies in (4, 20, 60)]
+    arrays = [engine.board.to_array() for engine in engines]
+
+    # 모든 국면, 양쪽 플레이어에 대해 점수가 정확히 같아야 함
+    for engine, array in zip(engines, arrays):
+        for player in (1, 2):
+            position_map, medium_map = per_cell_maps(engine, player)
+            assert np.array_equal(position_map, position_score_map(array, player))
+            assert np.array_equal(medium_map, medium_priority_map(array))
+    print(f"국면 {len(engines)}개: 벡터화 점수표가 evaluate_position/\"중\" 점수와 일치")
+
+    per_cell = best_time(lambda: [per_cell_maps(e, 2) for e in engines], repeat)
+    vector = best_time(lambda: [(position_score_map(a, 2), medium_priority_map(a))
+                                for a in arrays], repeat)
+    batch = np.stack(arrays)
+    stacked = best_time(lambda: (position_score_map(batch, 2), medium_priority_map(batch)), repeat)
+    count = len(engines)
+    print(f"칸별 함수: {per_cell / count * 1000:.2f}ms/국면")
+    print(f"벡터화:    {vector / count * 1000:.3f}ms/국면 ({per_cell / vector:.0f}x)")
+    print(f"한 번에:   {stacked / count * 1000:.3f}ms/국면 ({per_cell / stacked:.0f}x, {count}개 묶음)")
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "gomoku_bench_baseline.json")
+
+
+def micro_positions():
+    """고정 국면: 초반, 중반, 4 없이 돌이 가득한 종반"""
+    return {
+        "초반": [seeded_game(seed, 6) for seed in range(3)],
+        "중반": [seeded_game(seed, 30) for seed in range(3)],
+        "종반": [crowded_position(seed, 150, quiet=True) for seed in range(3)],
+    }
+
+
+def time_samples(func, samples, calls):
+    """calls번 호출을 samples번 재서 호출 1번당 시간(초) 목록"""
+    result = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        result.append((time.perf_counter() - start) / calls)
+    return result
+
+
+def calibrate(func, min_time=0.005):
+    """한 번 재는 시간이 min_time초 이상이 되는 호출 수"""
+    calls = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        if time.perf_counter() - start >= min_time:
+            return calls
+        calls *= 2
+
+
+def stats(samples):
+    """(최소, 중앙값, p95, 초당 호출 수)"""
+    ordered = sorted(samples)
+    median = ordered[len(ordered) // 2]
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return ordered[0], median, p95, 1 / median
+
+
+def micro_cases(positions, ai_time):
+    """(이름, 함수, 호출 수, 반복 수) 목록. 함수 하나는 국면의 모든 돌(또는 한 번)을 처리."""
+    cases = []
+    for stage, engines in positions.items():
+        stones = [(engine, x, y, player) for engine in engines
+                  for x, y, player in engine.history]
+
+        def check_win(stones=stones):
+            for engine, x, y, _ in stones:
+                engine.check_win(x, y)
+
+        def evaluate_direction(stones=stones):
+            for engine, x, y, player in stones:
+                engine.evaluate_direction(x, y, player)
+
+        def evaluate_position(stones=stones):
+            for engine, x, y, player in stones:
+                engine.evaluate_position(x, y, player)
+
+        def check_draw(engines=engines):
+            for engine in engines:
+                engine.check_draw()
+
+        per_stone = len(stones)
+        cases += [
+            (f"{stage}/check_win", check_win, per_stone),
+            (f"{stage}/evaluate_direction", evaluate_direction, per_stone),
+            (f"{stage}/evaluate_position", evaluate_position, per_stone),
+            (f"{stage}/check_draw", check_draw, len(engines)),
+        ]
+        for difficulty in DIFFICULTIES:
+            rng = random.Random(0)
+
+            def ai_move(engines=engines, difficulty=difficulty, rng=rng):
+                for engine in engines:
+                    # 치환표를 비워 매번 같은 조건에서 탐색
+                    if engine.transposition_table is not None:
+                        engine.transposition_table.clear()
+                    engine.choose_move(difficulty, rng=rng, time_limit=ai_time)
+
+            cases.append((f"{stage}/ai_move({difficulty})", ai_move, len(engines)))
+    return cases
+
+
+def bench_micro(baseline_path, threshold, save_baseline, samples=15, ai_time=0.2):
+    """핫 경로 함수별 중앙값/p95/초당 호출 수, 기준값과 비교해 느려졌으면 False
+
+    기준 비교는 기계 부하의 영향을 가장 덜 받는 최소 시간으로 한다.
+    """
+    positions = micro_positions()
+    results = {}
+    baseline = {}
+    if not save_baseline and os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("ai_time") != ai_time:
+            # "상" ai_move 시간은 탐색 시간에 따라 달라지므로 다른 값끼리는 비교할 수 없음
+            print(f"기준값의 --ai-time {saved.get('ai_time')}과 지금 값 {ai_time}이 달라 비교하지 않음 "
+                  f"(같은 값으로 실행하거나 --save-baseline으로 다시 만들기)")
+            return False
+        baseline = saved["results"]
+    print(f"{'항목':<28} {'중앙값(us)':>11} {'p95(us)':>10} {'초당 호출':>11} {'기준 대비':>9}")
+
+    # 기계 속도가 시간에 따라 바뀌어도 모든 항목이 같이 영향을 받도록 번갈아 잰다
+    cases = micro_cases(positions, ai_time)
+    plans = []
+    for name, func, per_call in cases:
+        # "상" ai_move는 시간 제한까지 탐색할 수 있으므로 적게 잰다
+        plans.append((calibrate(func), 5 if name.endswith("(상)") else samples))
+    measured = [[] for _ in cases]
+    for round_index in range(samples):
+        for (name, func, per_call), (calls, count), times in zip(cases, plans, measured):
+            if round_index < count:
+                times += [t / per_call for t in time_samples(func, 1, calls)]
+
+    regressions = []
+    for (name, _, _), times in zip(cases, measured):
+        best, median, p95, ops = stats(times)
+        results[name] = {"min": best, "median": median, "p95": p95, "ops": ops}
+        change = ""
+        if name in baseline:
+            ratio = best / baseline[name]["min"]
+            change = f"{(ratio - 1) * 100:+.0f}%"
+            if ratio > 1 + threshold:
+                regressions.append((name, ratio))
+                change += " !"
+        print(f"{name:<28} {median * 1e6:>11.2f} {p95 * 1e6:>10.2f} {ops:>11.0f} {change:>9}")
+
+    if save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), "ai_time": ai_time,
+                       "results": results}, f, ensure_ascii=False, indent=1)
+        print(f"기준값 저장: {baseline_path}")
+    elif not baseline:
+        print(f"기준값 파일 없음: {baseline_path} (--save-baseline으로 만들기)")
+    elif regressions:
+        print(f"느려진 항목 {len(regressions)}개 (최소 시간이 기준 +{threshold * 100:.0f}% 초과):")
+        for name, ratio in regressions:
+            print(f"  {name}: {ratio:.2f}배")
+        return False
+    else:
+        print(f"모든 항목이 기준 +{threshold * 100:.0f}% 이내")
+    return True
+
+
+def bench_sparse(sizes, stones, repeat=200):
+    """보드 크기별 엔진 생성, 메모리, 수당 비용 (같은 배치를 가운데로 옮겨 비교)"""
+    moves = [(x - BOARD_SIZE // 2, y - BOARD_SIZE // 2)
+             for x, y, _ in crowded_position(0, stones).history]
+    print(f"돌 {len(moves)}개 배치 (15x15 무작위 배치를 가운데로 옮김)")
+    print(f"{'크기':>6} {'보드':<12} {'생성(ms)':>9} {'메모리(KB)':>11} {'두기+무르기(us)':>16} "
+          f"{'수 정렬(us)':>12}")
+    for size in sizes:
+        factories = [(None, "자동")]
+        if size <= 32:
+            factories.append((SparseBoard, "SparseBoard"))
+        for factory, label in factories:
+            center = size // 2
+            tracemalloc.start()
+            start = time.perf_counter()
+            engine = GomokuEngine(size, board_factory=factory, use_book=False)
+            created = time.perf_counter() - start
+            for dx, dy in moves:
+                engine.make_move(center + dx, center + dy)
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            if label == "자동":
+                label = type(engine.board).__name__
+
+            candidates = engine.candidate_moves()
+
+            def make_undo():
+                for x, y in candidates:
+                    engine.make_move(x, y)
+                    engine.undo()
+
+            search = AlphaBetaSearch(engine)
+            move_time = best_time(make_undo, 5) / len(candidates)
+            order_time = best_time(lambda: search.ordered_moves(engine.current_player),
+                                   repeat) if repeat else 0.0
+            print(f"{size:>6} {label:<12} {created * 1000:>9.2f} {memory / 1024:>11.0f} "
+                  f"{move_time * 1e6:>16.1f} {order_time * 1e6:>12.0f}")
+
+
+def bench_batch(counts, positions=20, repeat=3):
+    """보드 N개의 AI 수: 엔진으로 하나씩 고르기 vs choose_moves 한 번 (중/상)
+
+    국면 positions * 3개를 돌려 써서 N개를 채운다. 상은 탐색 없는 상(hard_move)과 비교한다.
+    """
+    engines = [seeded_game(seed, plies) for seed in range(positions) for plies in (4, 20, 60)]
+    rng = random.Random(0)
+    generator = np.random.default_rng(0)
+    print(f"{'보드 수':>7} {'난이도':>6} {'하나씩(ms)':>11} {'묶음(ms)':>9} {'보드당(us)':>10} {'배속':>6}")
+    for count in counts:
+        subset = [engines[i % len(engines)] for i in range(count)]
+        boards = np.stack([engine.board.to_array() for engine in subset])
+        one_by_one = {
+            "중": lambda: [engine.medium_move(rng) for engine in subset],
+            "상": lambda: [engine.hard_move(engine.candidate_moves(), engine.current_player)
+                          for engine in subset],
+        }
+        for difficulty, single in one_by_one.items():
+            single_time = best_time(single, repeat)
+            batch_time = best_time(lambda: choose_moves(boards, difficulty, rng=generator), repeat)
+            print(f"{count:>7} {difficulty:>6} {single_time * 1000:>11.2f} {batch_time * 1000:>9.2f} "
+                  f"{batch_time / count * 1e6:>10.1f} {single_time / batch_time:>5.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오목 엔진 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    board_parser = subparsers.add_parser("board", help="보드 백엔드 비교")
+    board_parser.add_argument("--sizes", type=int, nargs="+", default=[BOARD_SIZE, 19, 31])
+    board_parser.add_argument("--repeat", type=int, default=5)
+
+    parallel_parser = subparsers.add_parser("parallel", help="병렬 루트 탐색 확장성")
+    parallel_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parallel_parser.add_argument("--depth", type=int, default=6)
+    parallel_parser.add_argument("--positions", type=int, default=4)
+
+    vector_parser = subparsers.add_parser("vector", help="벡터화 점수표 검증/비교")
+    vector_parser.add_argument("--positions", type=int, default=50)
+
+    micro_parser = subparsers.add_parser("micro", help="핫 경로 마이크로 벤치마크 (기준값 비교)")
+    micro_parser.add_argument("--baseline", default=BASELINE_PATH)
+    micro_parser.add_argument("--threshold", type=float, default=0.2,
+                              help="최소 시간이 기준보다 이 비율 넘게 느려지면 실패")
+    micro_parser.add_argument("--save-baseline", action="store_true", help="결과를 기준값으로 저장")
+    micro_parser.add_argument("--ai-time", type=float, default=0.2, help="\"상\" 탐색 시간 (초)")
+
+    sparse_parser = subparsers.add_parser("sparse", help="보드 크기별 비용 (희소 보드)")
+    sparse_parser.add_argument("--sizes", type=int, nargs="+",
+                               default=[BOARD_SIZE, 19, 101, 1001, FREE_BOARD_SIZE])
+    sparse_parser.add_argument("--stones", type=int, default=40)
+
+    batch_parser = subparsers.add_parser("batch", help="보드 묶음 AI 수 (choose_moves)")
+    batch_parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100, 500])
+
+    args = parser.parse_args()
+    if args.command == "board":
+        bench_board(args.sizes, args.repeat)
+    elif args.command == "parallel":
+        bench_parallel(args.workers, args.depth, args.positions)
+    elif args.command == "vector":
+        bench_vector(args.positions)
+    elif args.command == "micro":
+        if not bench_micro(args.baseline, args.threshold, args.save_baseline,
+                           ai_time=args.ai_time):
+            sys.exit(1)
+    elif args.command == "sparse":
+        bench_sparse(args.sizes, args.stones)
+    elif args.command == "batch":
+        bench_batch(args.counts)
+
+
+if __name__ == "__main__":
+    main()
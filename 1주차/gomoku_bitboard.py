@@ -0,0 +1,161 @@
+import numpy as np
+
+from gomoku_engine import BOARD_SIZE, WIN_LENGTH, DIRECTIONS
+
+# 보드 크기별 미리 계산한 마스크 (여러 보드가 공유)
+_MASK_CACHE = {}
+
+
+def _build_masks(size):
+    """크기별 비트 배치, 5목 라인 마스크, 방향별 시프트 계산
+
+    각 행 끝에 빈 비트 1개를 두어 (stride = size + 1) 가로/대각선 시프트가
+    다음 행으로 넘어가지 않게 한다. 칸 (x, y)의 비트 번호는 x * stride + y.
+    """
+    stride = size + 1
+    full = 0
+    for x in range(size):
+        full |= ((1 << size) - 1) << (x * stride)
+
+    # 칸마다 그 칸을 지나는 모든 5칸 라인 마스크
+    line_masks = [[] for _ in range(size * stride)]
+    for dx, dy in DIRECTIONS:
+        for x in range(size):
+            for y in range(size):
+                end_x = x + dx * (WIN_LENGTH - 1)
+                end_y = y + dy * (WIN_LENGTH - 1)
+                if not (0 <= end_x < size and 0 <= end_y < size):
+                    continue
+                cells = [(x + dx * k) * stride + (y + dy * k) for k in range(WIN_LENGTH)]
+                mask = 0
+                for i in cells:
+                    mask |= 1 << i
+                for i in cells:
+                    line_masks[i].append(mask)
+
+    shifts = [dx * stride + dy for dx, dy in DIRECTIONS]
+    return stride, full, line_masks, shifts
+
+
+def get_masks(size):
+    """크기별 마스크 (캐시)"""
+    if size not in _MASK_CACHE:
+        _MASK_CACHE[size] = _build_masks(size)
+    return _MASK_CACHE[size]
+
+
+def iter_bits(bits):
+    """켜진 비트 번호를 작은 것부터 순서대로"""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class BitBoard:
+    """플레이어별 비트보드 (파이썬 정수) 오목판
+
+    Board와 같은 인터페이스를 제공하므로 GomokuEngine(board_factory=BitBoard)로
+    바꿔 쓸 수 있다. 승리 판정은 미리 계산한 라인 마스크로 한다.
+    """
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.stride, self.full_mask, self.line_masks, self.shifts = get_masks(size)
+        self.bits = [0, 0, 0]  # 인덱스 1: 흑, 2: 백
+        self.stone_count = 0
+
+    @classmethod
+    def from_array(cls, array):
+        """(size, size) 배열에서 비트보드 생성"""
+        board = cls(len(array))
+        for x, y in np.argwhere(np.asarray(array) != 0):
+            board.set(int(x), int(y), int(array[x][y]))
+        return board
+
+    def in_bounds(self, x, y):
+        """좌표가 보드 안인지 확인"""
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def index(self, x, y):
+        """칸의 비트 번호"""
+        return x * self.stride + y
+
+    def get(self, x, y):
+        """해당 칸의 돌 (0, 1, 2)"""
+        i = x * self.stride + y
+        if (self.bits[1] >> i) & 1:
+            return 1
+        if (self.bits[2] >> i) & 1:
+            return 2
+        return 0
+
+    def set(self, x, y, player):
+        """해당 칸에 돌을 놓거나 (player=0이면) 치우기"""
+        bit = 1 << (x * self.stride + y)
+        bits = self.bits
+        if bits[1] & bit:
+            bits[1] ^= bit
+            self.stone_count -= 1
+        elif bits[2] & bit:
+            bits[2] ^= bit
+            self.stone_count -= 1
+        if player:
+            bits[player] |= bit
+            self.stone_count += 1
+
+    def is_full(self):
+        """빈 칸이 없는지 확인"""
+        return self.stone_count >= self.size * self.size
+
+    def empty_bits(self):
+        """빈 칸 비트 집합"""
+        return self.full_mask & ~(self.bits[1] | self.bits[2])
+
+    def empty_cells(self):
+        """빈 칸 좌표 목록 (x, y 순서)"""
+        return [divmod(i, self.stride) for i in iter_bits(self.empty_bits())]
+
+    def stones(self):
+        """놓인 돌 (x, y, player) 목록"""
+        result = []
+        for player in (1, 2):
+            for i in iter_bits(self.bits[player]):
+                x, y = divmod(i, self.stride)
+                result.append((x, y, player))
+        result.sort()
+        return result
+
+    def check_win(self, x, y):
+        """(x, y)의 돌이 5목 이상을 만들었는지 확인 (라인 마스크)"""
+        player = self.get(x, y)
+        if player == 0:
+            return False
+        bits = self.bits[player]
+        for mask in self.line_masks[x * self.stride + y]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def has_five(self, player):
+        """보드 전체에 player의 5목이 있는지 확인 (시프트 AND)"""
+        bits = self.bits[player]
+        for shift in self.shifts:
+            m = bits & (bits >> shift)           # 2연속
+            m &= m >> (2 * shift)                # 4연속
+            if m & (bits >> (4 * shift)):        # 5연속
+                return True
+        return False
+
+    def copy(self):
+        """보드 복사본"""
+        board = BitBoard(self.size)
+        board.bits = list(self.bits)
+        board.stone_count = self.stone_count
+        return board
+
+    def to_array(self):
+        """(size, size) NumPy 배열로 변환"""
+        array = np.zeros((self.size, self.size), dtype=int)
+        for x, y, player in self.stones():
+            array[x, y] = player
+        return array
@@ -0,0 +1,251 @@
+"""정석(오프닝 북): 초반 국면의 수를 미리 탐색해 둔 메모리 맵 파일
+
+사용법:
+    python gomoku_book.py build [--plies 5] [--branch 3] [--time 1.0] [--output gomoku_book.bin]
+    python gomoku_book.py info [gomoku_book.bin]
+
+국면은 보드 대칭 8가지 중 Zobrist 해시가 가장 작은 것(정규형)으로 저장하므로
+돌려지거나 뒤집힌 같은 국면은 한 항목을 같이 쓴다.
+파일은 헤더 + 열린 주소 해시 표이고, 찾을 때는 np.memmap으로 필요한 칸만 읽는다.
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from gomoku_engine import BOARD_SIZE, GomokuEngine, zobrist_keys
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gomoku_book.bin")
+MAGIC = b"GMKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHII")  # 매직, 버전, 보드 크기, 최대 수, 표 크기, 항목 수
+HEADER_SIZE = 32
+ENTRY_DTYPE = np.dtype([("key", "<u8"), ("move", "<u2"), ("score", "<i2")])  # 12바이트
+EMPTY_KEY = 1  # 빈 보드의 해시 0은 빈 칸 표시와 겹치므로 이 값으로 저장
+
+_SYMMETRY_CACHE = {}
+_BOOK_CACHE = {}
+
+
+def symmetry_tables(size):
+    """대칭 8가지의 칸 번호 변환표 (변환, 역변환), 각각 (8, size*size) 배열"""
+    if size not in _SYMMETRY_CACHE:
+        x, y = np.divmod(np.arange(size * size), size)
+        forward = []
+        for t in range(8):
+            tx = size - 1 - x if t & 1 else x
+            ty = size - 1 - y if t & 2 else y
+            if t & 4:
+                tx, ty = ty, tx
+            forward.append(tx * size + ty)
+        forward = np.array(forward)
+        _SYMMETRY_CACHE[size] = (forward, np.argsort(forward, axis=1))
+    return _SYMMETRY_CACHE[size]
+
+
+def canonical_key(history, size):
+    """수순의 정규형 해시와 그때 쓴 대칭 번호 (key, t)"""
+    stone_keys, _ = zobrist_keys(size)
+    forward, _ = symmetry_tables(size)
+    best = None
+    for t in range(8):
+        cells = forward[t]
+        key = 0
+        for x, y, player in history:
+            key ^= stone_keys[player][cells[x * size + y]]
+        if best is None or key < best[0]:
+            best = (key, t)
+    return best
+
+
+def _slot_key(key):
+    """표에 저장하는 키 (0은 빈 칸 표시)"""
+    return key or EMPTY_KEY
+
+
+class OpeningBook:
+    """메모리 맵으로 연 정석 파일 (찾을 때 해시 표의 몇 칸만 디스크에서 읽음)"""
+    def __init__(self, path=BOOK_PATH):
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        magic, version, size, max_ply, capacity, count = HEADER.unpack_from(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"정석 파일 형식이 아님: {path}")
+        self.path = path
+        self.size = size
+        self.max_ply = max_ply
+        self.count = count
+        self.mask = capacity - 1
+        self.entries = np.memmap(path, dtype=ENTRY_DTYPE, mode="r", offset=HEADER_SIZE,
+                                 shape=(capacity,))
+
+    def probe(self, key):
+        """정규형 해시로 (정규형 칸 번호, 점수) 찾기, 없으면 None"""
+        key = _slot_key(key)
+        slot = key & self.mask
+        while True:
+            entry = self.entries[slot]
+            stored = int(entry["key"])
+            if stored == key:
+                return int(entry["move"]), int(entry["score"])
+            if stored == 0:
+                return None
+            slot = (slot + 1) & self.mask
+
+    def lookup(self, engine):
+        """엔진 현재 국면의 정석 수 ((x, y), 점수), 없으면 None"""
+        if engine.board_size != self.size or len(engine.history) > self.max_ply:
+            return None
+        key, t = canonical_key(engine.history, self.size)
+        found = self.probe(key)
+        if found is None:
+            return None
+        _, inverse = symmetry_tables(self.size)
+        move = divmod(int(inverse[t][found[0]]), self.size)
+        if not engine.is_valid_move(*move):
+            return None
+        return move, found[1]
+
+
+def open_book(path=BOOK_PATH):
+    """정석 파일 열기 (경로별로 한 번만 열고, 파일이 없으면 None)"""
+    if path not in _BOOK_CACHE:
+        _BOOK_CACHE[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _BOOK_CACHE[path]
+
+
+def write_book(path, positions, size, max_ply):
+    """{정규형 해시: (정규형 칸 번호, 점수)}를 해시 표 파일로 저장 (채움률 50% 이하)"""
+    capacity = 1
+    while capacity < 2 * max(len(positions), 1):
+        capacity *= 2
+    entries = np.zeros(capacity, dtype=ENTRY_DTYPE)
+    for key, (move, score) in positions.items():
+        key = _slot_key(key)
+        slot = key & (capacity - 1)
+        while entries[slot]["key"]:
+            slot = (slot + 1) & (capacity - 1)
+        entries[slot] = (key, move, max(-32767, min(32767, score)))
+    header = HEADER.pack(MAGIC, VERSION, size, max_ply, capacity, len(positions))
+    with open(path, "wb") as f:
+        f.write(header.ljust(HEADER_SIZE, b"\0"))
+        f.write(entries.tobytes())
+
+
+def build_book(path, max_ply=5, branch=3, time_limit=1.0, board_size=BOARD_SIZE):
+    """깊은 탐색으로 정석 만들기
+
+    각 국면에서 "상" 탐색의 최선 수와, 대칭이 다른 상위 후보 branch개로 가지를 뻗어
+    돌 max_ply개까지의 국면을 모두 저장한다. 만든 수순 목록을 반환한다.
+    """
+    from gomoku_search import AlphaBetaSearch
+
+    engine = GomokuEngine(board_size, use_book=False)
+    forward, _ = symmetry_tables(board_size)
+    positions = {}
+    lines = []
+    start = time.perf_counter()
+
+    def visit():
+        key, t = canonical_key(engine.history, board_size)
+        if engine.game_over or key in positions:
+            return
+        move = engine.search_move(time_limit)
+        if move is None:
+            return
+        positions[key] = (int(forward[t][move[0] * board_size + move[1]]),
+                          engine.last_search.score)
+        lines.append(list(engine.history))
+        if len(positions) % 50 == 0:
+            print(f"국면 {len(positions)}개 ({time.perf_counter() - start:.0f}초)")
+        if len(engine.history) >= max_ply:
+            return
+
+        # 최선 수 + 대칭으로 겹치지 않는 상위 후보
+        children, seen = [], set()
+        for x, y in [move] + AlphaBetaSearch(engine).ordered_moves(engine.current_player):
+            engine.make_move(x, y)
+            child_key, _ = canonical_key(engine.history, board_size)
+            engine.undo()
+            if child_key not in seen:
+                seen.add(child_key)
+                children.append((x, y))
+            if len(children) > branch:
+                break
+        for x, y in children:
+            engine.make_move(x, y)
+            visit()
+            engine.undo()
+
+    visit()
+    write_book(path, positions, board_size, max_ply)
+    print(f"정석 저장: {path} (국면 {len(positions)}개, {os.path.getsize(path)}바이트, "
+          f"{time.perf_counter() - start:.0f}초)")
+    return lines
+
+
+def verify_book(path, lines):
+    """만든 수순을 대칭 8가지로 돌려 찾았을 때 모두 같은 정석 수(대칭까지 같음)가 나오는지 확인"""
+    book = OpeningBook(path)
+    size = book.size
+    forward, _ = symmetry_tables(size)
+    checked = 0
+    for line in lines:
+        results = set()
+        for t in range(8):
+            engine = GomokuEngine(size, use_book=False)
+            for x, y, _ in line:
+                engine.make_move(*divmod(int(forward[t][x * size + y]), size))
+            found = book.lookup(engine)
+            assert found is not None, line
+            engine.make_move(*found[0])
+            results.add(canonical_key(engine.history, size)[0])
+            checked += 1
+        assert len(results) == 1, line
+    print(f"검증: 수순 {len(lines)}개 x 대칭 8가지 = {checked}번 찾기, 모두 같은 수")
+
+
+def book_info(path):
+    """정석 파일 정보와 찾기 시간"""
+    book = OpeningBook(path)
+    capacity = book.mask + 1
+    print(f"{path}: 보드 {book.size}, 돌 {book.max_ply}개까지, 국면 {book.count}개, "
+          f"표 {capacity}칸 ({capacity * ENTRY_DTYPE.itemsize}바이트)")
+
+    engine = GomokuEngine(book.size, use_book=False)
+    center = book.size // 2
+    engine.make_move(center, center)
+    repeat = 10000
+    start = time.perf_counter()
+    for _ in range(repeat):
+        book.lookup(engine)
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"찾기: {elapsed * 1e6:.1f}us/회 (1수 국면 -> {book.lookup(engine)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오목 정석 파일")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="깊은 탐색으로 정석 만들기")
+    build_parser.add_argument("--plies", type=int, default=5, help="저장할 최대 돌 수")
+    build_parser.add_argument("--branch", type=int, default=3, help="최선 수 외에 뻗을 후보 수")
+    build_parser.add_argument("--time", type=float, default=1.0, help="국면당 탐색 시간 (초)")
+    build_parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    build_parser.add_argument("--output", default=BOOK_PATH)
+
+    info_parser = subparsers.add_parser("info", help="정석 파일 정보")
+    info_parser.add_argument("path", nargs="?", default=BOOK_PATH)
+
+    args = parser.parse_args()
+    if args.command == "build":
+        lines = build_book(args.output, args.plies, args.branch, args.time, args.size)
+        verify_book(args.output, lines)
+    elif args.command == "info":
+        book_info(args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,500 @@
+import random
+
+import numpy as np
+
+# 게임 설정
+BOARD_SIZE = 15
+WIN_LENGTH = 5
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
+DIFFICULTIES = ["하", "중", "상"]
+SEARCH_TIME_LIMIT = 2.0  # "상" 탐색 기본 시간 (초)
+TT_SIZE_MB = 16  # 치환표 기본 크기 (MB)
+CANDIDATE_RADIUS = 2  # 기존 돌에서 이 거리(체비쇼프) 안의 빈 칸이 후보
+THREAT_TIME_SHARE = 0.2  # "상" 탐색 시간 중 VCF/VCT 강제승 탐색에 쓰는 비율
+DENSE_BOARD_LIMIT = 32  # 이보다 큰 보드는 칸별 표 대신 희소 표현(gomoku_sparse)을 씀
+
+# 보드 크기별 Zobrist 키
+_ZOBRIST_CACHE = {}
+
+
+class HashedKeys:
+    """칸 번호 -> 64비트 키를 splitmix64로 그때그때 계산 (큰 보드에서 칸마다 표를 만들지 않음)"""
+    def __init__(self, seed):
+        self.seed = seed
+
+    def __getitem__(self, c):
+        z = (self.seed + c * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return z ^ (z >> 31)
+
+
+def zobrist_keys(size):
+    """크기별 Zobrist 키: ([빈 칸, 흑, 백]별 칸 키 목록, 차례 키)
+
+    시드를 고정해 같은 크기의 보드는 프로세스가 달라도 같은 해시를 갖는다.
+    DENSE_BOARD_LIMIT보다 큰 보드는 표 대신 HashedKeys를 쓴다 (빈 칸 키는 None).
+    """
+    if size not in _ZOBRIST_CACHE:
+        rng = random.Random(0x5EED0000 + size)
+        if size > DENSE_BOARD_LIMIT:
+            stone_keys = [None, HashedKeys(rng.getrandbits(64)), HashedKeys(rng.getrandbits(64))]
+        else:
+            cells = size * size
+            stone_keys = [[0] * cells,
+                          [rng.getrandbits(64) for _ in range(cells)],
+                          [rng.getrandbits(64) for _ in range(cells)]]
+        _ZOBRIST_CACHE[size] = (stone_keys, rng.getrandbits(64))
+    return _ZOBRIST_CACHE[size]
+
+
+class Board:
+    """NumPy 배열 기반 오목판 (0: 빈 칸, 1: 흑, 2: 백)"""
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.cells = np.zeros((size, size), dtype=int)
+        self.stone_count = 0
+
+    def in_bounds(self, x, y):
+        """좌표가 보드 안인지 확인"""
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def get(self, x, y):
+        """해당 칸의 돌 (0, 1, 2)"""
+        return int(self.cells[x, y])
+
+    def set(self, x, y, player):
+        """해당 칸에 돌을 놓거나 (player=0이면) 치우기"""
+        old = self.cells[x, y]
+        if old == 0 and player != 0:
+            self.stone_count += 1
+        elif old != 0 and player == 0:
+            self.stone_count -= 1
+        self.cells[x, y] = player
+
+    def is_full(self):
+        """빈 칸이 없는지 확인"""
+        return self.stone_count >= self.size * self.size
+
+    def empty_cells(self):
+        """빈 칸 좌표 목록"""
+        return [(int(x), int(y)) for x, y in np.argwhere(self.cells == 0)]
+
+    def stones(self):
+        """놓인 돌 (x, y, player) 목록"""
+        return [(int(x), int(y), int(self.cells[x, y])) for x, y in np.argwhere(self.cells != 0)]
+
+    def check_win(self, x, y):
+        """(x, y)의 돌이 5목 이상을 만들었는지 확인"""
+        player = self.get(x, y)
+        if player == 0:
+            return False
+        for dx, dy in DIRECTIONS:
+            count = 1
+            # 양방향으로 확인
+            for direction in [1, -1]:
+                nx, ny = x, y
+                for _ in range(WIN_LENGTH - 1):
+                    nx += dx * direction
+                    ny += dy * direction
+                    if self.in_bounds(nx, ny) and self.cells[nx, ny] == player:
+                        count += 1
+                    else:
+                        break
+            if count >= WIN_LENGTH:
+                return True
+        return False
+
+    def copy(self):
+        """보드 복사본"""
+        board = Board(self.size)
+        board.cells = self.cells.copy()
+        board.stone_count = self.stone_count
+        return board
+
+    def to_array(self):
+        """(size, size) NumPy 배열로 변환"""
+        return self.cells.copy()
+
+
+class CandidateSet:
+    """기존 돌에서 radius 안에 있는 빈 칸 집합 (수/무르기마다 주변만 갱신)"""
+    def __init__(self, size=BOARD_SIZE, radius=CANDIDATE_RADIUS):
+        self.size = size
+        self.radius = radius
+        self.near_count = [0] * (size * size)  # 주변 radius 안의 돌 수
+        self.occupied = [False] * (size * size)
+        self.cells = set()  # 후보 칸 번호 (x * size + y)
+        self.offsets = [(dx, dy) for dx in range(-radius, radius + 1)
+                        for dy in range(-radius, radius + 1) if dx or dy]
+
+    def _neighbors(self, x, y):
+        """(x, y) 주변 radius 안의 칸 번호"""
+        size = self.size
+        for dx, dy in self.offsets:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < size and 0 <= ny < size:
+                yield nx * size + ny
+
+    def place(self, x, y):
+        """(x, y)에 돌이 놓임"""
+        c = x * self.size + y
+        self.occupied[c] = True
+        self.cells.discard(c)
+        for nc in self._neighbors(x, y):
+            self.near_count[nc] += 1
+            if not self.occupied[nc]:
+                self.cells.add(nc)
+
+    def remove(self, x, y):
+        """(x, y)의 돌이 치워짐"""
+        c = x * self.size + y
+        self.occupied[c] = False
+        if self.near_count[c]:
+            self.cells.add(c)
+        for nc in self._neighbors(x, y):
+            self.near_count[nc] -= 1
+            if self.near_count[nc] == 0:
+                self.cells.discard(nc)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, move):
+        return move[0] * self.size + move[1] in self.cells
+
+    def moves(self):
+        """후보 칸 (x, y) 목록"""
+        return [divmod(c, self.size) for c in self.cells]
+
+
+class GomokuEngine:
+    """화면 없이 동작하는 오목 규칙/AI 엔진"""
+    def __init__(self, board_size=BOARD_SIZE, board_factory=None, tt_size_mb=TT_SIZE_MB,
+                 candidate_radius=CANDIDATE_RADIUS, search_workers=1, use_book=True):
+        from gomoku_eval import PatternEvaluator
+        from gomoku_sparse import SparseBoard, SparseCandidateSet, SparseEvaluator
+
+        if board_factory is None:
+            board_factory = SparseBoard if board_size > DENSE_BOARD_LIMIT else Board
+        if getattr(board_factory, "sparse", False):
+            # 돌 주변만 저장하는 평가기/후보 집합 (비용이 보드 넓이가 아니라 돌 수에 비례)
+            self.evaluator_factory = SparseEvaluator
+            self.candidates_factory = SparseCandidateSet
+        else:
+            self.evaluator_factory = PatternEvaluator
+            self.candidates_factory = CandidateSet
+        self.board_size = board_size
+        self.board_factory = board_factory
+        self.candidate_radius = candidate_radius
+        self.stone_keys, self.side_key = zobrist_keys(board_size)
+        self.tt_size_mb = tt_size_mb
+        self.transposition_table = None  # 첫 탐색 때 생성, 게임이 바뀌어도 유지
+        self.search_workers = search_workers  # 2 이상이면 프로세스 풀 병렬 탐색
+        self.parallel_search = None
+        self.use_book = use_book  # "상"이 초반에 정석 파일(gomoku_book.bin)을 쓸지 여부
+        self.opening_book = None
+        self.last_search = None  # 마지막 "상" 탐색 결과 (SearchResult)
+        self.reset()
+
+    def reset(self):
+        """게임 상태 초기화"""
+        self.board = self.board_factory(self.board_size)
+        self.current_player = 1  # 1: 흑, 2: 백
+        self.game_over = False
+        self.winner = None
+        self.last_move = None
+        self.history = []  # (x, y, player)
+        self.hash = 0  # Zobrist 해시 (돌 배치 + 차례)
+        self.evaluator = self.evaluator_factory(self.board_size)  # 수마다 갱신되는 패턴 평가
+        self.candidates = self.candidates_factory(self.board_size, self.candidate_radius)
+
+    def copy(self):
+        """같은 수순을 다시 둔 복사본 (치환표와 병렬 탐색 프로세스 풀은 공유)"""
+        engine = GomokuEngine(self.board_size, self.board_factory, self.tt_size_mb,
+                              self.candidate_radius, self.search_workers, self.use_book)
+        engine.transposition_table = self.get_transposition_table()
+        engine.opening_book = self.opening_book
+        if self.search_workers > 1:
+            engine.parallel_search = self.get_parallel_search()
+        for x, y, _ in self.history:
+            engine.make_move(x, y)
+        return engine
+
+    def get_transposition_table(self):
+        """치환표 (처음 쓸 때 생성)"""
+        if self.transposition_table is None:
+            from gomoku_search import TranspositionTable, needs_wide_moves
+
+            self.transposition_table = TranspositionTable(self.tt_size_mb,
+                                                          needs_wide_moves(self.board_size))
+        return self.transposition_table
+
+    def get_parallel_search(self):
+        """병렬 탐색 프로세스 풀 (처음 쓸 때 생성, 프로세스는 첫 탐색 때 시작)"""
+        if self.parallel_search is None:
+            from gomoku_parallel import ParallelSearch
+
+            self.parallel_search = ParallelSearch(self.search_workers, self.tt_size_mb,
+                                                  self.board_size)
+        return self.parallel_search
+
+    def close(self):
+        """병렬 탐색 프로세스 풀 종료 (엔진을 더 쓰지 않을 때, 복사본과 공유하므로 원본에서 부름)"""
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+
+    def get_opening_book(self):
+        """정석 (처음 쓸 때 메모리 맵으로 열고, 파일이 없으면 None)"""
+        if self.opening_book is None and self.use_book:
+            from gomoku_book import open_book
+
+            self.opening_book = open_book()
+        return self.opening_book
+
+    def book_move(self):
+        """현재 국면의 정석 수, 없으면 None"""
+        import time
+
+        start = time.perf_counter()
+        book = self.get_opening_book()
+        found = book.lookup(self) if book is not None else None
+        if found is None:
+            return None
+        from gomoku_search import SearchResult
+
+        move, score = found
+        self.last_search = SearchResult(move, score, 0, 0, time.perf_counter() - start)
+        return move
+
+    def is_valid_move(self, x, y):
+        """유효한 수인지 확인"""
+        return (not self.game_over and self.board.in_bounds(x, y) and
+                self.board.get(x, y) == 0)
+
+    def make_move(self, x, y):
+        """수 두기 (승패 판정 후 차례 넘김)"""
+        if not self.is_valid_move(x, y):
+            return False
+        player = self.current_player
+        self.board.set(x, y, player)
+        self.history.append((x, y, player))
+        self.last_move = (x, y)
+        self.hash ^= self.stone_keys[player][x * self.board_size + y]
+        self.evaluator.place(x, y, player)
+        self.candidates.place(x, y)
+
+        if self.check_win(x, y):
+            self.game_over = True
+            self.winner = player
+        elif self.check_draw():
+            self.game_over = True
+            self.winner = None
+        else:
+            self.current_player = 3 - player  # 1->2, 2->1
+            self.hash ^= self.side_key
+        return True
+
+    def undo(self):
+        """마지막 수 무르기"""
+        if not self.history:
+            return None
+        x, y, player = self.history.pop()
+        self.board.set(x, y, 0)
+        if not self.game_over:
+            self.hash ^= self.side_key  # 끝난 게임은 차례가 넘어가지 않았음
+        self.hash ^= self.stone_keys[player][x * self.board_size + y]
+        self.evaluator.remove(x, y, player)
+        self.candidates.remove(x, y)
+        self.current_player = player
+        self.game_over = False
+        self.winner = None
+        self.last_move = self.history[-1][:2] if self.history else None
+        return x, y
+
+    def check_win(self, x, y):
+        """승리 조건 확인"""
+        return self.board.check_win(x, y)
+
+    def check_draw(self):
+        """무승부 확인"""
+        return self.board.is_full()
+
+    def empty_positions(self):
+        """빈 칸 목록"""
+        return self.board.empty_cells()
+
+    def candidate_moves(self):
+        """기존 돌 근처의 빈 칸 목록 (빈 보드면 중앙)"""
+        if not self.candidates:
+            center = self.board_size // 2
+            if self.board.get(center, center) == 0:
+                return [(center, center)]
+            return self.empty_positions()
+        return self.candidates.moves()
+
+    def choose_move(self, difficulty="중", player=None, rng=random, time_limit=SEARCH_TIME_LIMIT,
+                    stop_event=None, progress=None):
+        """난이도에 따른 AI 수 선택 (두지는 않음)
+
+        "상"은 정석에 있는 국면이면 바로 두고, 아니면 time_limit(초) 동안 알파베타 탐색을 한다.
+        player는 현재 차례여야 한다.
+        stop_event/progress는 탐색 중단 요청과 진행 상황 공유용이다.
+        """
+        if self.game_over or self.board.is_full():
+            return None
+        if player is None:
+            player = self.current_player
+
+        if difficulty == "하":
+            # 하: 완전 랜덤
+            return rng.choice(self.empty_positions())
+        if difficulty == "중":
+            return self.medium_move(rng)
+        return (self.book_move() or self.search_move(time_limit, stop_event, progress) or
+                self.hard_move(self.candidate_moves(), player, rng))
+
+    def medium_move(self, rng=random):
+        """중: 중앙과 기존 돌 근처를 선호
+
+        점수가 0보다 큰 칸은 중앙 7x7 안이거나 후보 집합 안에 있으므로 그 칸들만 본다.
+        그런 칸이 5개보다 적을 때만 모든 빈 칸을 본다.
+        """
+        center = self.board_size // 2
+        positions = set(self.candidates.moves())
+        for x in range(max(0, center - 3), min(self.board_size, center + 4)):
+            for y in range(max(0, center - 3), min(self.board_size, center + 4)):
+                if self.board.get(x, y) == 0:
+                    positions.add((x, y))
+
+        priority_positions = self.medium_priorities(positions)
+        if sum(1 for priority, _, _ in priority_positions if priority > 0) < 5:
+            priority_positions = self.medium_priorities(self.empty_positions())
+
+        priority_positions.sort(reverse=True)
+        _, x, y = rng.choice(priority_positions[:5])
+        return x, y
+
+    def medium_priorities(self, positions):
+        """중 난이도 칸별 점수 (점수, x, y) 목록"""
+        board = self.board
+        center = self.board_size // 2
+        priority_positions = []
+        for x, y in positions:
+            priority = 0
+            # 중앙 근처
+            if abs(x - center) <= 3 and abs(y - center) <= 3:
+                priority += 10
+            # 기존 돌 근처
+            for dx in [-1, 0, 1]:
+                for dy in [-1, 0, 1]:
+                    nx, ny = x + dx, y + dy
+                    if board.in_bounds(nx, ny) and board.get(nx, ny) != 0:
+                        priority += 1
+            priority_positions.append((priority, x, y))
+        return priority_positions
+
+    def search_move(self, time_limit=SEARCH_TIME_LIMIT, stop_event=None, progress=None):
+        """강제승 탐색 후 반복 심화 알파베타 탐색으로 현재 차례의 수 선택
+
+        시간의 일부(THREAT_TIME_SHARE)로 먼저 VCF/VCT를 찾고, 있으면 바로 둔다.
+        상대에게 VCF가 있으면 그것을 막는 수 중에서만 탐색한다.
+        """
+        import time
+        from gomoku_search import SearchResult, WIN_SCORE
+        from gomoku_vcf import ThreatSolver
+
+        start = time.perf_counter()
+        solver = ThreatSolver(self, time_limit=time_limit * THREAT_TIME_SHARE / 2,
+                              stop_event=stop_event)
+        move = solver.solve_vcf() or solver.solve_vct()
+        if move is not None:
+            self.last_search = SearchResult(move, WIN_SCORE, 0, solver.nodes,
+                                            time.perf_counter() - start)
+            return move
+        root_moves = solver.defences() or None
+        if root_moves is not None and len(root_moves) == 1:
+            self.last_search = SearchResult(root_moves[0], 0, 0, solver.nodes,
+                                            time.perf_counter() - start)
+            return root_moves[0]
+        time_limit -= time.perf_counter() - start
+
+        if self.search_workers > 1:
+            self.last_search = self.get_parallel_search().search(
+                self, time_limit, stop_event=stop_event, progress=progress, root_moves=root_moves)
+            return self.last_search.move
+
+        from gomoku_search import AlphaBetaSearch
+
+        search = AlphaBetaSearch(self, transposition_table=self.get_transposition_table(),
+                                 stop_event=stop_event, progress=progress)
+        self.last_search = search.search(time_limit, root_moves=root_moves)
+        return self.last_search.move
+
+    def hard_move(self, positions, player, rng=random):
+        """탐색 없는 상: positions 중 공격과 방어 점수가 가장 높은 칸 (점수표 한 번에 계산)"""
+        from gomoku_vector import position_score_map
+
+        if not positions:
+            return rng.choice(self.empty_positions())
+        if getattr(self.board, "sparse", False):
+            # 희소 보드는 배열로 만들지 않고 수마다 갱신되는 패턴 점수로 고름
+            return max(positions, key=lambda move: self.evaluator.move_score(move[0], move[1], player))
+        scores = position_score_map(self.board.to_array(), player)
+        return max(positions, key=lambda move: scores[move])
+
+    def evaluate_position(self, x, y, player):
+        """위치 평가 (player의 돌이 (x, y)에 놓여 있다고 가정)"""
+        opponent = 3 - player if player is not None else 1
+        score = 0
+
+        # 공격 점수
+        score += self.evaluate_direction(x, y, player) * 2
+
+        # 방어 점수
+        self.board.set(x, y, opponent)
+        score += self.evaluate_direction(x, y, opponent)
+        self.board.set(x, y, player)
+
+        return score
+
+    def evaluate_direction(self, x, y, player):
+        """(x, y)를 지나는 네 방향의 연속 돌 점수"""
+        board = self.board
+        total_score = 0
+
+        for dx, dy in DIRECTIONS:
+            count = 1
+            blocked = 0
+
+            # 양방향 확인
+            for direction in [1, -1]:
+                nx, ny = x, y
+                for _ in range(WIN_LENGTH - 1):
+                    nx += dx * direction
+                    ny += dy * direction
+                    if board.in_bounds(nx, ny):
+                        stone = board.get(nx, ny)
+                        if stone == player:
+                            count += 1
+                        elif stone != 0:
+                            blocked += 1
+                            break
+                        else:
+                            break
+                    else:
+                        blocked += 1
+                        break
+
+            # 점수 계산
+            if count >= 5:
+                total_score += 10000
+            elif count == 4 and blocked == 0:
+                total_score += 1000
+            elif count == 3 and blocked == 0:
+                total_score += 100
+            elif count == 2 and blocked == 0:
+                total_score += 10
+
+        return total_score
@@ -0,0 +1,176 @@
+import numpy as np
+
+from gomoku_engine import BOARD_SIZE, DIRECTIONS, WIN_LENGTH
+
+# 한 칸 주변 창: 방향마다 양쪽으로 4칸씩, 칸마다 2비트 (0: 빈 칸, 1: 흑, 2: 백, 3: 벽)
+REACH = WIN_LENGTH - 1
+SLOTS = 2 * REACH
+WALL = 3
+
+# 패턴 점수 (가운데 칸에 돌을 놓았을 때 그 방향의 연속 돌과 막힘)
+FIVE = 10000
+OPEN_FOUR = 1000
+CLOSED_FOUR = 150
+OPEN_THREE = 100
+CLOSED_THREE = 15
+OPEN_TWO = 10
+CLOSED_TWO = 2
+
+# (연속 길이, 막힌 끝 수) -> 점수
+PATTERN_SCORES = {
+    (4, 0): OPEN_FOUR, (4, 1): CLOSED_FOUR,
+    (3, 0): OPEN_THREE, (3, 1): CLOSED_THREE,
+    (2, 0): OPEN_TWO, (2, 1): CLOSED_TWO,
+}
+
+_TABLE_CACHE = {}
+_NEIGHBOR_CACHE = {}
+
+
+def slot_of(offset):
+    """가운데 칸에서 offset(-4..-1, 1..4)만큼 떨어진 칸의 창 슬롯 (0..7)"""
+    return offset + REACH if offset < 0 else offset + REACH - 1
+
+
+def build_pattern_table():
+    """창 코드 -> 점수 표 ([None, 흑, 백], 각각 4^8개)
+
+    가운데 칸에 player의 돌을 놓았을 때 양쪽으로 이어지는 돌 수와 막힌 끝(상대 돌,
+    벽) 수로 점수를 매긴다. 한쪽으로 4칸이 모두 이어지면 막힘으로 보지 않는다.
+    """
+    if "table" in _TABLE_CACHE:
+        return _TABLE_CACHE["table"]
+    codes = np.arange(4 ** SLOTS)
+    cells = (codes[:, None] >> (2 * np.arange(SLOTS))) & 3
+    # 가운데에서 바깥쪽 순서
+    right = cells[:, [slot_of(k) for k in range(1, REACH + 1)]]
+    left = cells[:, [slot_of(-k) for k in range(1, REACH + 1)]]
+
+    tables = [None]
+    for player in (1, 2):
+        count = np.ones(len(codes), dtype=int)
+        blocked = np.zeros(len(codes), dtype=int)
+        for side in (left, right):
+            run = np.cumprod(side == player, axis=1).sum(axis=1)
+            count += run
+            # 연속이 끊긴 바로 다음 칸이 상대 돌이나 벽이면 막힘
+            next_cell = side[np.arange(len(codes)), np.minimum(run, REACH - 1)]
+            blocked += (run < REACH) & (next_cell != 0)
+        scores = np.zeros(len(codes), dtype=int)
+        for (length, ends), score in PATTERN_SCORES.items():
+            scores[(count == length) & (blocked == ends)] = score
+        scores[count >= WIN_LENGTH] = FIVE
+        tables.append(scores.tolist())
+    _TABLE_CACHE["table"] = tables
+    return tables
+
+
+def build_neighbors(size):
+    """칸마다 방향별로 (이웃 칸, 이웃 창에서 이 칸의 비트 위치) 목록"""
+    if size not in _NEIGHBOR_CACHE:
+        neighbors = []
+        for dx, dy in DIRECTIONS:
+            per_cell = []
+            for x in range(size):
+                for y in range(size):
+                    items = []
+                    for k in range(-REACH, REACH + 1):
+                        nx, ny = x + dx * k, y + dy * k
+                        if k != 0 and 0 <= nx < size and 0 <= ny < size:
+                            # 이웃에서 보면 이 칸은 -k 위치
+                            items.append((nx * size + ny, 2 * slot_of(-k)))
+                    per_cell.append(items)
+            neighbors.append(per_cell)
+        _NEIGHBOR_CACHE[size] = neighbors
+    return _NEIGHBOR_CACHE[size]
+
+
+def initial_codes(size):
+    """빈 보드의 방향별 창 코드 (보드 밖은 벽)"""
+    codes = []
+    for dx, dy in DIRECTIONS:
+        per_cell = []
+        for x in range(size):
+            for y in range(size):
+                code = 0
+                for k in range(-REACH, REACH + 1):
+                    nx, ny = x + dx * k, y + dy * k
+                    if k != 0 and not (0 <= nx < size and 0 <= ny < size):
+                        code |= WALL << (2 * slot_of(k))
+                per_cell.append(code)
+        codes.append(per_cell)
+    return codes
+
+
+class PatternEvaluator:
+    """방향별 창 코드와 칸별 위협 점수를 수마다 갱신하는 평가기
+
+    수를 두거나 무를 때 그 칸을 지나는 네 줄의 양쪽 4칸(최대 32칸)만 갱신하므로
+    비용이 보드 크기나 돌 수와 무관하다.
+    """
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.table = build_pattern_table()
+        self.neighbors = build_neighbors(size)
+        self.codes = initial_codes(size)
+        cells = size * size
+        self.occupied = [False] * cells
+        # 칸별 위협 점수: 그 칸에 player가 두면 얻는 네 방향 패턴 점수 합
+        self.scores = [None, [0] * cells, [0] * cells]
+        for player in (1, 2):
+            table = self.table[player]
+            for direction_codes in self.codes:
+                for c, code in enumerate(direction_codes):
+                    self.scores[player][c] += table[code]
+        # 빈 칸 위협 점수 합계 (정적 평가용)
+        self.totals = [0, sum(self.scores[1]), sum(self.scores[2])]
+
+    def _update(self, c, player, add):
+        """칸 c에 돌을 놓거나(add) 치운 뒤 주변 창 코드와 점수 갱신"""
+        table1, table2 = self.table[1], self.table[2]
+        scores1, scores2 = self.scores[1], self.scores[2]
+        occupied = self.occupied
+        delta1 = delta2 = 0
+        for codes, per_cell in zip(self.codes, self.neighbors):
+            for nc, shift in per_cell[c]:
+                old = codes[nc]
+                new = old | (player << shift) if add else old & ~(3 << shift)
+                codes[nc] = new
+                d1 = table1[new] - table1[old]
+                d2 = table2[new] - table2[old]
+                scores1[nc] += d1
+                scores2[nc] += d2
+                if not occupied[nc]:
+                    delta1 += d1
+                    delta2 += d2
+        self.totals[1] += delta1
+        self.totals[2] += delta2
+
+    def place(self, x, y, player):
+        """(x, y)에 player의 돌을 놓음"""
+        c = x * self.size + y
+        self.occupied[c] = True
+        self.totals[1] -= self.scores[1][c]
+        self.totals[2] -= self.scores[2][c]
+        self._update(c, player, True)
+
+    def remove(self, x, y, player):
+        """(x, y)의 돌을 치움"""
+        c = x * self.size + y
+        self._update(c, player, False)
+        self.occupied[c] = False
+        self.totals[1] += self.scores[1][c]
+        self.totals[2] += self.scores[2][c]
+
+    def threat(self, x, y, player):
+        """(x, y)에 player가 두면 만들어지는 패턴 점수"""
+        return self.scores[player][x * self.size + y]
+
+    def move_score(self, x, y, player):
+        """수 평가: 공격 점수 * 2 + 방어 점수 (evaluate_position과 같은 가중치)"""
+        c = x * self.size + y
+        return self.scores[player][c] * 2 + self.scores[3 - player][c]
+
+    def evaluate(self, player):
+        """정적 평가 (player 관점): 빈 칸 위협 점수 합계의 차이"""
+        return self.totals[player] - self.totals[3 - player]
@@ -0,0 +1,168 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_EXCEPTION
+
+from gomoku_engine import BOARD_SIZE, GomokuEngine, TT_SIZE_MB
+from gomoku_search import (AlphaBetaSearch, SearchResult, SearchTimeout, TranspositionTable, WIN_SCORE,
+                           needs_wide_moves)
+
+# 이보다 얕은 깊이는 나눠 보내는 비용이 탐색보다 커서 부른 프로세스에서 직렬로 탐색
+PARALLEL_MIN_DEPTH = 4
+# 작업 프로세스 시작 방식. 풀은 AIWorker 스레드에서 만들어지므로 스레드가 있는 프로세스를
+# fork하지 않는다 (forkserver가 없는 Windows는 spawn).
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# 작업 프로세스마다 유지하는 상태 (깊이가 바뀌어도 같은 국면이면 재사용)
+_worker_engine = None
+_worker_table = None
+_worker_stop = None  # 모든 작업 프로세스가 공유하는 중단 이벤트
+
+
+def _init_worker(tt_size_mb, wide_moves, stop_event):
+    """작업 프로세스 초기화: 프로세스 전용 치환표 생성"""
+    global _worker_table, _worker_stop
+    _worker_table = TranspositionTable(tt_size_mb, wide_moves)
+    _worker_stop = stop_event
+
+
+def _worker_position(board_size, moves):
+    """moves 수순을 둔 엔진 (직전 작업과 같은 국면이면 그대로 사용)"""
+    global _worker_engine
+    engine = _worker_engine
+    if (engine is None or engine.board_size != board_size or
+            [(x, y) for x, y, _ in engine.history] != moves):
+        engine = GomokuEngine(board_size)
+        engine.transposition_table = _worker_table
+        for x, y in moves:
+            engine.make_move(x, y)
+        _worker_engine = engine
+    return engine
+
+
+def _search_chunk(board_size, moves, root_moves, depth, time_left, alpha):
+    """루트 후보 일부를 depth까지 탐색: (점수, 수, 노드 수, 완료 여부)"""
+    engine = _worker_position(board_size, moves)
+    search = AlphaBetaSearch(engine, transposition_table=_worker_table, stop_event=_worker_stop)
+    search.deadline = time.perf_counter() + time_left
+    root_length = len(engine.history)
+    try:
+        score, move = search.search_root(root_moves, depth, alpha)
+        return score, move, search.nodes, True
+    except SearchTimeout:
+        while len(engine.history) > root_length:
+            engine.undo()
+        return None, None, search.nodes, False
+
+
+class ParallelSearch:
+    """루트 후보 수를 프로세스 풀에 나눠 탐색하는 반복 심화 탐색
+
+    PARALLEL_MIN_DEPTH보다 얕은 깊이는 부른 프로세스에서 직렬로 탐색한다. 그보다 깊으면
+    이전 깊이의 최선 수를 먼저 탐색해 그 점수를 alpha로 삼고, 나머지 후보를 작업 수만큼
+    나눠 각 프로세스가 그보다 좋은 수만 찾게 한다. 작업 프로세스는 각자 치환표를 유지한다.
+    """
+    def __init__(self, workers=None, tt_size_mb=TT_SIZE_MB, board_size=BOARD_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context(START_METHOD)
+        self.stop_event = context.Event()  # 중단 요청을 작업 프로세스에 전달
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                        initargs=(tt_size_mb, needs_wide_moves(board_size),
+                                                  self.stop_event))
+
+    def close(self):
+        """프로세스 풀 종료 (돌고 있는 작업도 중단)"""
+        self.stop_event.set()
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def stop(self, futures):
+        """돌고 있는 작업을 다음 노드에서 멈추게 하고, 시작하지 않은 작업은 취소한 뒤 끝날 때까지 기다림"""
+        self.stop_event.set()
+        for future in futures:
+            future.cancel()
+        wait(futures)
+
+    def split(self, moves):
+        """정렬된 후보를 번갈아 나눠 각 묶음에 좋은 수가 고르게 들어가게 함"""
+        chunks = [moves[i::self.workers] for i in range(self.workers)]
+        return [chunk for chunk in chunks if chunk]
+
+    def run(self, engine, history, chunks, depth, deadline, alpha, stop_event):
+        """chunks를 작업 프로세스에 보내 결과 목록 반환 (중단 요청이 오면 None)"""
+        futures = [self.pool.submit(_search_chunk, engine.board_size, history, chunk, depth,
+                                    deadline - time.perf_counter(), alpha)
+                   for chunk in chunks]
+        # 중단 요청을 확인하며 기다림
+        pending = futures
+        while pending:
+            if stop_event is not None and stop_event.is_set():
+                # 중단: 작업 프로세스가 자기 시간 제한까지 코어를 잡고 있지 않게 함
+                self.stop(futures)
+                return None
+            _, pending = wait(pending, timeout=0.01, return_when=FIRST_EXCEPTION)
+        return [future.result() for future in futures]
+
+    def search(self, engine, time_limit, max_depth=8, stop_event=None, progress=None,
+               root_moves=None):
+        """반복 심화 병렬 탐색. 시간이 다 되면 마지막으로 끝난 깊이의 최선 수를 반환.
+
+        root_moves를 주면 루트에서는 그 수들만 본다.
+        """
+        start = time.perf_counter()
+        deadline = start + time_limit
+        moves = AlphaBetaSearch(engine).ordered_moves(engine.current_player)
+        if root_moves is not None:
+            moves = [move for move in moves if move in root_moves]
+            moves += [move for move in root_moves if move not in moves]
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        history = [(x, y) for x, y, _ in engine.history]
+        root_length = len(engine.history)
+        serial = AlphaBetaSearch(engine, transposition_table=engine.get_transposition_table(),
+                                 stop_event=stop_event)
+        serial.deadline = deadline
+        best_move, best_score, completed, nodes = moves[0], 0, 0, 0
+        self.stop_event.clear()
+
+        for depth in range(1, max_depth + 1):
+            if depth < PARALLEL_MIN_DEPTH or len(moves) == 1:
+                serial.nodes = 0
+                try:
+                    score, move = serial.search_root(moves, depth)
+                except SearchTimeout:
+                    while len(engine.history) > root_length:
+                        engine.undo()
+                    break
+                finally:
+                    nodes += serial.nodes
+            else:
+                # 최선 수 후보 하나로 alpha를 얻고, 나머지는 그보다 좋은 수만 찾음
+                results = self.run(engine, history, [moves[:1]], depth, deadline,
+                                   -WIN_SCORE * 2, stop_event)
+                if results is not None and results[0][3]:
+                    score, move = results[0][:2]
+                    rest = self.run(engine, history, self.split(moves[1:]), depth, deadline,
+                                    score, stop_event)
+                    results = None if rest is None else results + rest
+                if results is None:
+                    break  # 중단 요청
+                nodes += sum(result[2] for result in results)
+                if not all(result[3] for result in results):
+                    break  # 시간 초과, 이 깊이는 버림
+                for result in results[1:]:
+                    if result[0] > score:
+                        score, move = result[0], result[1]
+            if progress is not None:
+                progress.nodes = nodes
+
+            best_move, best_score, completed = move, score, depth
+            if progress is not None:
+                progress.depth = depth
+                progress.best_move = move
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE - max_depth:
+                break  # 승패가 확정됨
+
+        return SearchResult(best_move, best_score, completed, nodes,
+                            time.perf_counter() - start)
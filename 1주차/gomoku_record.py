@@ -0,0 +1,417 @@
+"""대국 기록: 수마다 덧붙여 쓰는 바이너리 기록 파일과 텍스트 기보
+
+사용법:
+    python gomoku_record.py info games.gmr
+    python gomoku_record.py validate games.gmr [--engine]
+    python gomoku_record.py export games.gmr games.txt
+    python gomoku_record.py import games.txt games.gmr
+
+파일은 헤더 뒤에 대국이 이어 붙는다. 대국마다 (길이, 보드 크기, 결과) 헤더와
+수(칸 번호 x * size + y)가 온다. 수 하나는 15x15에서 1바이트, 256x256까지 2바이트, 그보다
+크면 4바이트다. 진행 중인 대국은 길이를 OPEN_LENGTH로 두고 수를 둘 때마다 덧붙이며,
+끝나면 길이와 결과를 채운다. 창이 닫혀 열린 채 남은 대국은 다음에 기록할 때 닫는다.
+
+텍스트 기보는 한 줄에 한 대국: "15 B h8 i9 h9 ..." (보드 크기, 결과, 수).
+결과는 B(흑 승), W(백 승), D(무승부), *(끝나지 않음). 수는 열 글자(x: a, b, ..., z, aa, ...)와
+행 번호(y + 1, 위에서부터)다. #으로 시작하는 줄은 주석이다.
+"""
+import argparse
+import os
+import struct
+import time
+
+import numpy as np
+
+from gomoku_engine import GomokuEngine
+from gomoku_sparse import SparseBoard
+
+MAGIC = b"GMKR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")   # 매직, 버전
+GAME_HEADER = struct.Struct("<IHB")   # 수 부분 바이트 수, 보드 크기, 결과
+OPEN_LENGTH = 0xFFFFFFFF              # 진행 중인 대국 (파일 끝까지가 수)
+
+# 대국 결과
+UNFINISHED, BLACK_WIN, WHITE_WIN, DRAW = 0, 1, 2, 3
+RESULT_TEXT = {UNFINISHED: "*", BLACK_WIN: "B", WHITE_WIN: "W", DRAW: "D"}
+RESULT_NAMES = {UNFINISHED: "끝나지 않음", BLACK_WIN: "흑 승", WHITE_WIN: "백 승", DRAW: "무승부"}
+
+
+def move_dtype(board_size):
+    """보드 크기별 수 하나의 저장 형식"""
+    cells = board_size * board_size
+    if cells <= 1 << 8:
+        return np.dtype("<u1")
+    if cells <= 1 << 16:
+        return np.dtype("<u2")
+    return np.dtype("<u4")
+
+
+def engine_result(engine):
+    """엔진의 현재 결과 (UNFINISHED, BLACK_WIN, WHITE_WIN, DRAW)"""
+    if not engine.game_over:
+        return UNFINISHED
+    return engine.winner or DRAW
+
+
+class GameRecord:
+    """기록된 대국 하나 (보드 크기, 결과, 칸 번호 배열)"""
+    def __init__(self, board_size, result, cells):
+        self.board_size = board_size
+        self.result = result
+        self.cells = cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def moves(self):
+        """(x, y) 수 목록"""
+        return [divmod(int(c), self.board_size) for c in self.cells]
+
+    @classmethod
+    def from_moves(cls, board_size, moves, result=UNFINISHED):
+        """(x, y) 수 목록에서 대국 만들기"""
+        cells = np.array([x * board_size + y for x, y in moves], dtype=move_dtype(board_size))
+        return cls(board_size, result, cells)
+
+    def to_bytes(self):
+        """파일에 쓰는 형식 (대국 헤더 + 수)"""
+        data = self.cells.astype(move_dtype(self.board_size), copy=False).tobytes()
+        return GAME_HEADER.pack(len(data), self.board_size, self.result) + data
+
+
+def _check_file_header(f, path):
+    """파일 헤더 확인 (기록 파일이 아니면 ValueError)"""
+    magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size).ljust(FILE_HEADER.size, b"\0"))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"대국 기록 파일 형식이 아님: {path}")
+
+
+def read_games(path):
+    """기록 파일의 대국을 차례로 읽기 (파일 전체를 메모리에 올리지 않음)"""
+    with open(path, "rb") as f:
+        _check_file_header(f, path)
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise ValueError(f"잘린 대국 헤더: {path}")
+            length, board_size, result = GAME_HEADER.unpack(header)
+            dtype = move_dtype(board_size)
+            if length == OPEN_LENGTH:
+                data = f.read()  # 진행 중이던 대국: 파일 끝까지
+                data = data[:len(data) - len(data) % dtype.itemsize]
+            else:
+                data = f.read(length)
+                if len(data) < length or length % dtype.itemsize:
+                    raise ValueError(f"잘린 대국: {path}")
+            yield GameRecord(board_size, result, np.frombuffer(data, dtype=dtype))
+
+
+class GameWriter:
+    """대국 기록 파일에 수를 두는 즉시 덧붙여 쓰는 기록기 (창이 닫혀도 둔 수까지 남음)"""
+    def __init__(self, path):
+        self.path = path
+        self.game_start = None  # 진행 중인 대국 헤더의 파일 위치
+        self.board_size = None
+        self.dtype = None
+        self.moves = 0
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            self.file = open(path, "w+b")
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        else:
+            self.file = open(path, "r+b")
+            _check_file_header(self.file, path)
+            self._close_open_game()
+        self.file.seek(0, os.SEEK_END)
+        self.file.flush()
+
+    def _close_open_game(self):
+        """지난번에 열린 채 남은 대국의 길이를 채움 (결과는 UNFINISHED)"""
+        f = self.file
+        end = f.seek(0, os.SEEK_END)
+        position = f.seek(FILE_HEADER.size)
+        while position + GAME_HEADER.size <= end:
+            length, board_size, _ = GAME_HEADER.unpack(f.read(GAME_HEADER.size))
+            if length == OPEN_LENGTH:
+                itemsize = move_dtype(board_size).itemsize
+                length = (end - position - GAME_HEADER.size) // itemsize * itemsize
+                f.truncate(position + GAME_HEADER.size + length)  # 반쯤 쓴 수는 버림
+                f.seek(position)
+                f.write(GAME_HEADER.pack(length, board_size, UNFINISHED))
+                return
+            position = f.seek(length, os.SEEK_CUR)
+        f.truncate(min(position, end))  # 반쯤 쓴 대국 헤더는 버림
+
+    @property
+    def in_game(self):
+        """진행 중인 대국이 있는지"""
+        return self.game_start is not None
+
+    def begin(self, board_size):
+        """새 대국 시작 (진행 중인 대국은 끝나지 않은 것으로 닫음)"""
+        if self.in_game:
+            self.end(UNFINISHED)
+        self.game_start = self.file.tell()
+        self.board_size = board_size
+        self.dtype = move_dtype(board_size)
+        self.moves = 0
+        self.file.write(GAME_HEADER.pack(OPEN_LENGTH, board_size, UNFINISHED))
+        self.file.flush()
+
+    def move(self, x, y):
+        """진행 중인 대국에 수 하나 덧붙임"""
+        self.file.write(np.array([x * self.board_size + y], dtype=self.dtype).tobytes())
+        self.file.flush()
+        self.moves += 1
+
+    def end(self, result):
+        """진행 중인 대국의 길이와 결과를 채워 닫음"""
+        if not self.in_game:
+            return
+        f = self.file
+        f.seek(self.game_start)
+        f.write(GAME_HEADER.pack(self.moves * self.dtype.itemsize, self.board_size, result))
+        f.seek(0, os.SEEK_END)
+        f.flush()
+        self.game_start = None
+
+    def write_game(self, game):
+        """끝난 대국 하나를 한 번에 덧붙임"""
+        if self.in_game:
+            self.end(UNFINISHED)
+        self.file.write(game.to_bytes())
+        self.file.flush()
+
+    def close(self):
+        """진행 중인 대국을 닫고 파일 닫기"""
+        self.end(UNFINISHED)
+        self.file.close()
+
+
+def write_games(path, games):
+    """대국 목록을 기록 파일에 덧붙임, 쓴 대국 수 반환"""
+    writer = GameWriter(path)
+    count = 0
+    for game in games:
+        writer.write_game(game)
+        count += 1
+    writer.close()
+    return count
+
+
+def validate_game(game, board=None):
+    """규칙대로 둔 대국인지 확인: 문제가 있으면 설명, 없으면 None
+
+    board(SparseBoard)를 주면 다시 쓰고, 끝나면 빈 보드로 되돌려 둔다.
+    """
+    size = game.board_size
+    if board is None or board.size != size:
+        board = SparseBoard(size)
+    placed = []
+    error = None
+    winner = None
+    player = 1
+    for i, c in enumerate(game.cells.tolist()):
+        x, y = divmod(c, size)
+        if winner or board.is_full():
+            error = f"{i + 1}번째 수 {move_to_text(x, y)}: 이미 끝난 대국"
+            break
+        if not board.in_bounds(x, y) or board.get(x, y):
+            error = f"{i + 1}번째 수 {move_to_text(x, y)}: 둘 수 없는 자리"
+            break
+        board.set(x, y, player)
+        placed.append((x, y))
+        if board.check_win(x, y):
+            winner = player
+        player = 3 - player
+    if error is None:
+        actual = winner or (DRAW if board.is_full() else UNFINISHED)
+        if actual != game.result:
+            error = f"기록된 결과 {RESULT_NAMES[game.result]}, 실제 {RESULT_NAMES[actual]}"
+    for x, y in placed:
+        board.set(x, y, 0)
+    return error
+
+
+def replay(game, engine=None):
+    """대국을 엔진에 다시 두며 (엔진, 다음 수)를 차례로 (끝나면 엔진을 처음 국면으로 되돌림)
+
+    보드 크기가 같으면 엔진 하나를 계속 쓸 수 있다 (reset 대신 undo로 되돌림).
+    """
+    if engine is None or engine.board_size != game.board_size:
+        engine = GomokuEngine(game.board_size, use_book=False)
+    start = len(engine.history)
+    try:
+        for x, y in game.moves():
+            yield engine, (x, y)
+            if not engine.make_move(x, y):
+                raise ValueError(f"{len(engine.history) - start + 1}번째 수 "
+                                 f"{move_to_text(x, y)}: 둘 수 없는 자리")
+    finally:
+        while len(engine.history) > start:
+            engine.undo()
+
+
+# ----- 텍스트 기보 -----
+def column_text(x):
+    """열 번호 -> 글자 (0: a, 25: z, 26: aa, ...)"""
+    text = ""
+    x += 1
+    while x:
+        x, r = divmod(x - 1, 26)
+        text = chr(ord("a") + r) + text
+    return text
+
+
+def move_to_text(x, y):
+    """(x, y) -> "h8" 형식"""
+    return f"{column_text(x)}{y + 1}"
+
+
+def text_to_move(text, board_size=None):
+    """"h8" 형식 -> (x, y) (board_size를 주면 보드 밖의 수는 ValueError)"""
+    letters = text.rstrip("0123456789")
+    digits = text[len(letters):]
+    if not letters or not digits or not letters.isalpha():
+        raise ValueError(f"수 형식이 아님: {text}")
+    x = 0
+    for ch in letters.lower():
+        x = x * 26 + ord(ch) - ord("a") + 1
+    x, y = x - 1, int(digits) - 1
+    if board_size is not None and not (0 <= x < board_size and 0 <= y < board_size):
+        raise ValueError(f"보드 밖의 수: {text} ({board_size}x{board_size})")
+    return x, y
+
+
+def game_to_text(game):
+    """대국 -> 텍스트 기보 한 줄"""
+    moves = " ".join(move_to_text(x, y) for x, y in game.moves())
+    return f"{game.board_size} {RESULT_TEXT[game.result]} {moves}".rstrip()
+
+
+def game_from_text(line, line_number=None):
+    """텍스트 기보 한 줄 -> 대국 (보드 밖의 수, 겹친 수, 결과가 맞지 않는 대국은 ValueError)"""
+    where = f"{line_number}번째 줄: " if line_number is not None else ""
+    parts = line.split()
+    if (len(parts) < 2 or not parts[0].isdigit() or not 0 < int(parts[0]) <= 0xFFFF or
+            parts[1] not in RESULT_TEXT.values()):
+        raise ValueError(f"{where}기보 형식이 아님: {line.strip()}")
+    size = int(parts[0])
+    result = {text: result for result, text in RESULT_TEXT.items()}[parts[1]]
+    try:
+        moves = [text_to_move(move, size) for move in parts[2:]]
+    except ValueError as e:
+        raise ValueError(f"{where}{e}") from None
+    game = GameRecord.from_moves(size, moves, result)
+    error = validate_game(game)
+    if error:
+        raise ValueError(f"{where}{error}")
+    return game
+
+
+def export_text(path, text_path):
+    """기록 파일 -> 텍스트 기보, 대국 수 반환"""
+    count = 0
+    with open(text_path, "w", encoding="utf-8") as f:
+        for game in read_games(path):
+            f.write(game_to_text(game) + "\n")
+            count += 1
+    return count
+
+
+def read_text(text_path, skip_errors=False):
+    """텍스트 기보 파일의 대국을 차례로 (skip_errors면 잘못된 줄은 알리고 건너뜀)"""
+    with open(text_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip() or line.startswith("#"):
+                continue
+            try:
+                game = game_from_text(line, line_number)
+            except ValueError as e:
+                if not skip_errors:
+                    raise
+                print(f"{text_path}: {e} (건너뜀)")
+                continue
+            yield game
+
+
+# ----- 명령 -----
+def record_info(path):
+    """대국 수, 수 수, 파일 크기, 결과별 대국 수"""
+    games = moves = 0
+    results = dict.fromkeys(RESULT_TEXT, 0)
+    sizes = {}
+    for game in read_games(path):
+        games += 1
+        moves += len(game)
+        results[game.result] += 1
+        sizes[game.board_size] = sizes.get(game.board_size, 0) + 1
+    size = os.path.getsize(path)
+    print(f"{path}: 대국 {games}개, 수 {moves}개, {size}바이트 "
+          f"(수당 {size / max(moves, 1):.2f}바이트)")
+    print("보드: " + ", ".join(f"{s}x{s} {n}판" for s, n in sorted(sizes.items())))
+    print("결과: " + ", ".join(f"{RESULT_NAMES[r]} {n}" for r, n in results.items()))
+
+
+def validate_records(path, use_engine=False, max_errors=10):
+    """모든 대국 검증 (use_engine이면 엔진으로도 다시 둠), 오류 수 반환"""
+    start = time.perf_counter()
+    games = moves = errors = 0
+    boards = {}
+    engines = {}
+    for game in read_games(path):
+        games += 1
+        moves += len(game)
+        board = boards.setdefault(game.board_size, SparseBoard(game.board_size))
+        error = validate_game(game, board)
+        if error is None and use_engine:
+            engine = engines.get(game.board_size)
+            for engine, _ in replay(game, engine):
+                pass
+            engines[game.board_size] = engine
+        if error is not None:
+            errors += 1
+            if errors <= max_errors:
+                print(f"대국 {games}: {error}")
+    elapsed = time.perf_counter() - start
+    print(f"검증: 대국 {games}개, 수 {moves}개, 오류 {errors}개, {elapsed:.2f}초 "
+          f"({games / max(elapsed, 1e-9):.0f}판/초, {moves / max(elapsed, 1e-9):.0f}수/초)")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오목 대국 기록")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = subparsers.add_parser("info", help="기록 파일 정보")
+    info_parser.add_argument("path")
+
+    validate_parser = subparsers.add_parser("validate", help="규칙과 결과 검증")
+    validate_parser.add_argument("path")
+    validate_parser.add_argument("--engine", action="store_true",
+                                 help="엔진(평가기, 후보 수 포함)으로도 다시 둠")
+
+    export_parser = subparsers.add_parser("export", help="기록 파일 -> 텍스트 기보")
+    export_parser.add_argument("path")
+    export_parser.add_argument("text_path")
+
+    import_parser = subparsers.add_parser("import", help="텍스트 기보 -> 기록 파일 (덧붙임)")
+    import_parser.add_argument("text_path")
+    import_parser.add_argument("path")
+
+    args = parser.parse_args()
+    if args.command == "info":
+        record_info(args.path)
+    elif args.command == "validate":
+        if validate_records(args.path, args.engine):
+            raise SystemExit(1)
+    elif args.command == "export":
+        print(f"대국 {export_text(args.path, args.text_path)}개 저장: {args.text_path}")
+    elif args.command == "import":
+        print(f"대국 {write_games(args.path, read_text(args.text_path, skip_errors=True))}개 추가: {args.path}")
+
+
+if __name__ == "__main__":
+    main()
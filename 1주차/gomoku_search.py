@@ -0,0 +1,330 @@
+import time
+
+import numpy as np
+
+WIN_SCORE = 1000000
+
+# 치환표 항목 종류
+EXACT, LOWER, UPPER = 1, 2, 3
+
+
+class SearchTimeout(Exception):
+    """탐색 시간 초과"""
+
+
+class SearchProgress:
+    """진행 중인 탐색 상태 (다른 스레드에서 읽기용)"""
+    def __init__(self):
+        self.depth = 0       # 끝까지 마친 깊이
+        self.nodes = 0
+        self.best_move = None
+
+
+class TranspositionTable:
+    """고정 크기 치환표 (2단 버킷: 깊이 우선 칸 + 항상 교체 칸)
+
+    항목은 NumPy 배열에 나눠 담으므로 메모리는 size_mb를 넘지 않는다.
+    깊이 우선 칸은 더 깊은 결과이거나 이전 탐색(세대)의 항목일 때만 교체한다.
+    """
+    ENTRY_BYTES = 16  # 키 8 + 점수 4 + 수 2 + 깊이 1 + 종류/세대 1
+
+    def __init__(self, size_mb=16, wide_moves=False):
+        # 수 번호가 int16을 넘는 큰 보드는 수를 int32로 저장 (항목당 2바이트 더)
+        entry_bytes = self.ENTRY_BYTES + (2 if wide_moves else 0)
+        entries = max(2, int(size_mb * 1024 * 1024) // entry_bytes)
+        self.buckets = 1 << (entries // 2).bit_length() - 1  # 2의 거듭제곱
+        slots = self.buckets * 2
+        self.keys = np.zeros(slots, dtype=np.uint64)
+        self.scores = np.zeros(slots, dtype=np.int32)
+        self.moves = np.full(slots, -1, dtype=np.int32 if wide_moves else np.int16)
+        self.depths = np.zeros(slots, dtype=np.int8)
+        self.flags = np.zeros(slots, dtype=np.uint8)   # 하위 2비트: 종류, 상위 6비트: 세대
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """적중률 카운터 초기화"""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    @property
+    def hit_rate(self):
+        """조회 대비 적중 비율"""
+        return self.hits / self.probes if self.probes else 0.0
+
+    @property
+    def memory_bytes(self):
+        """배열이 차지하는 바이트 수"""
+        return sum(a.nbytes for a in (self.keys, self.scores, self.moves, self.depths, self.flags))
+
+    def new_search(self):
+        """새 탐색 시작 (세대 증가, 오래된 항목은 교체 대상이 됨)"""
+        self.generation = (self.generation + 1) & 0x3F
+
+    def clear(self):
+        """모든 항목 삭제"""
+        self.keys[:] = 0
+        self.flags[:] = 0
+
+    def probe(self, key):
+        """(깊이, 점수, 종류, 수 번호) 또는 None"""
+        self.probes += 1
+        slot = (key & (self.buckets - 1)) * 2
+        for i in (slot, slot + 1):
+            if self.flags[i] & 3 and int(self.keys[i]) == key:
+                self.hits += 1
+                return int(self.depths[i]), int(self.scores[i]), int(self.flags[i]) & 3, int(self.moves[i])
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        """항목 저장 (move는 x * size + y, 없으면 -1)"""
+        self.stores += 1
+        slot = (key & (self.buckets - 1)) * 2
+        flags = self.flags
+        if (not flags[slot] & 3 or int(self.keys[slot]) == key or depth >= self.depths[slot] or
+                flags[slot] >> 2 != self.generation):
+            i = slot  # 깊이 우선 칸
+        else:
+            i = slot + 1  # 항상 교체 칸
+        if flags[i] & 3 and int(self.keys[i]) != key:
+            self.replacements += 1
+        self.keys[i] = key
+        self.depths[i] = min(depth, 127)
+        self.scores[i] = score
+        self.flags[i] = (self.generation << 2) | flag
+        self.moves[i] = move
+
+
+def needs_wide_moves(board_size):
+    """수 번호(x * size + y)가 int16에 들어가지 않는 보드 크기인지"""
+    return board_size * board_size - 1 > np.iinfo(np.int16).max
+
+
+class SearchResult:
+    """탐색 결과 (최선의 수와 통계)"""
+    def __init__(self, move, score, depth, nodes, elapsed, tt_hit_rate=0.0):
+        self.move = move
+        self.score = score
+        self.depth = depth          # 끝까지 마친 깊이
+        self.nodes = nodes
+        self.elapsed = elapsed      # 초
+        self.tt_hit_rate = tt_hit_rate
+
+    @property
+    def nps(self):
+        """초당 노드 수"""
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, {self.elapsed * 1000:.0f}ms, {self.nps:.0f} nps, "
+                f"tt={self.tt_hit_rate:.0%})")
+
+
+def score_to_tt(score, ply):
+    """승패 점수를 현재 노드 기준으로 바꿔 저장"""
+    if score >= WIN_SCORE - 1000:
+        return score + ply
+    if score <= -WIN_SCORE + 1000:
+        return score - ply
+    return score
+
+
+def score_from_tt(score, ply):
+    """저장된 승패 점수를 루트 기준으로 되돌림"""
+    if score >= WIN_SCORE - 1000:
+        return score - ply
+    if score <= -WIN_SCORE + 1000:
+        return score + ply
+    return score
+
+
+class AlphaBetaSearch:
+    """반복 심화 네가맥스/알파베타 탐색 (시간 제한, 언제든 중단 가능)"""
+    def __init__(self, engine, max_depth=8, max_candidates=12, transposition_table=None,
+                 stop_event=None, progress=None):
+        self.engine = engine
+        self.tt = transposition_table
+        self.stop_event = stop_event  # threading.Event, 설정되면 시간 초과처럼 중단
+        self.progress = progress      # SearchProgress
+        self.max_depth = max_depth
+        self.max_candidates = max_candidates  # 노드마다 정렬 후 상위 몇 개만 탐색
+        self.nodes = 0
+        self.deadline = None
+
+    def ordered_moves(self, player, first=None):
+        """공격/방어 점수 순으로 정렬한 후보 수 (first가 있으면 맨 앞)"""
+        board = self.engine.board
+        move_score = self.engine.evaluator.move_score
+        scored = [(move_score(x, y, player), x, y) for x, y in self.engine.candidate_moves()]
+        scored.sort(key=lambda item: -item[0])
+        moves = [(x, y) for _, x, y in scored[:self.max_candidates]]
+        if first is not None and board.in_bounds(*first) and board.get(*first) == 0:
+            if first in moves:
+                moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def check_time(self):
+        """시간 초과/중단 요청 확인"""
+        if self.progress is not None:
+            self.progress.nodes = self.nodes
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SearchTimeout()
+
+    def negamax(self, depth, alpha, beta, ply):
+        """네가맥스 알파베타 (현재 차례 관점 점수)"""
+        self.nodes += 1
+        self.check_time()
+        engine = self.engine
+        player = engine.current_player
+        if depth == 0:
+            return engine.evaluator.evaluate(player)
+
+        # 치환표 조회
+        tt = self.tt
+        size = engine.board_size
+        alpha_orig = alpha
+        tt_move = None
+        if tt is not None:
+            entry = tt.probe(engine.hash)
+            if entry:
+                entry_depth, score, flag, move = entry
+                if move >= 0:
+                    tt_move = divmod(move, size)
+                if entry_depth >= depth:
+                    score = score_from_tt(score, ply)
+                    if flag == EXACT:
+                        return score
+                    if flag == LOWER:
+                        alpha = max(alpha, score)
+                    else:
+                        beta = min(beta, score)
+                    if alpha >= beta:
+                        return score
+
+        moves = self.ordered_moves(player, tt_move)
+        if not moves:
+            return 0
+        best = -WIN_SCORE * 2
+        best_move = moves[0]
+        for x, y in moves:
+            engine.make_move(x, y)
+            if engine.winner:
+                score = WIN_SCORE - ply
+            elif engine.game_over:
+                score = 0
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            engine.undo()
+            if score > best:
+                best = score
+                best_move = (x, y)
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            tt.store(engine.hash, depth, score_to_tt(best, ply), flag,
+                     best_move[0] * size + best_move[1])
+        return best
+
+    def search_root(self, moves, depth, alpha=-WIN_SCORE * 2):
+        """루트 탐색, (점수, 수) 반환. moves[0]을 먼저 본다.
+
+        alpha를 주면 그보다 좋은 수만 찾는다 (없으면 (alpha, moves[0])).
+        """
+        engine = self.engine
+        best_move = moves[0]
+        for x, y in moves:
+            engine.make_move(x, y)
+            if engine.winner:
+                score = WIN_SCORE
+            elif engine.game_over:
+                score = 0
+            else:
+                score = -self.negamax(depth - 1, -WIN_SCORE * 2, -alpha, 1)
+            engine.undo()
+            if score > alpha:
+                alpha = score
+                best_move = (x, y)
+        return alpha, best_move
+
+    def search(self, time_limit, max_depth=None, root_moves=None):
+        """반복 심화 탐색. 시간이 다 되면 마지막으로 끝난 깊이의 최선 수를 반환.
+
+        root_moves를 주면 루트에서는 그 수들만 본다.
+        """
+        engine = self.engine
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.nodes = 0
+        max_depth = max_depth or self.max_depth
+        root_length = len(engine.history)
+        if self.tt is not None:
+            self.tt.new_search()
+            self.tt.reset_stats()
+
+        moves = self.ordered_moves(engine.current_player)
+        if root_moves is not None:
+            moves = [move for move in moves if move in root_moves]
+            moves += [move for move in root_moves if move not in moves]
+        if not moves:
+            return SearchResult(None, 0, 0, 0, 0.0)
+        best_move, best_score, completed = moves[0], 0, 0
+
+        try:
+            for depth in range(1, max_depth + 1):
+                score, move = self.search_root(moves, depth)
+                best_move, best_score, completed = move, score, depth
+                if self.progress is not None:
+                    self.progress.depth = depth
+                    self.progress.best_move = move
+                # 이전 깊이의 최선 수를 먼저 탐색
+                moves.remove(move)
+                moves.insert(0, move)
+                if abs(score) >= WIN_SCORE - max_depth:
+                    break  # 승패가 확정됨
+        except SearchTimeout:
+            # 탐색 중이던 수 되돌리기
+            while len(engine.history) > root_length:
+                engine.undo()
+
+        return SearchResult(best_move, best_score, completed, self.nodes,
+                            time.perf_counter() - start,
+                            self.tt.hit_rate if self.tt is not None else 0.0)
+
+
+def principal_variation(engine, first_move, transposition_table, max_length=8):
+    """first_move부터 치환표의 최선 수를 따라간 예상 수순 [(x, y)] (엔진은 원래 국면으로 되돌림)"""
+    if first_move is None:
+        return []
+    size = engine.board_size
+    root_length = len(engine.history)
+    line = []
+    seen = set()
+    move = first_move
+    try:
+        while move is not None and len(line) < max_length and engine.is_valid_move(*move):
+            engine.make_move(*move)
+            line.append(move)
+            if engine.game_over or engine.hash in seen:
+                break
+            seen.add(engine.hash)
+            entry = transposition_table.probe(engine.hash) if transposition_table else None
+            move = divmod(entry[3], size) if entry and entry[3] >= 0 else None
+    finally:
+        while len(engine.history) > root_length:
+            engine.undo()
+    return line
@@ -0,0 +1,765 @@
+"""여러 대국을 동시에 여는 온라인 2인 대국 서버 (asyncio, TCP와 웹소켓)
+
+사용법:
+    python gomoku_server.py serve [--host 0.0.0.0] [--port 8765] [--record server.gmr]
+    python gomoku_server.py loadtest [--games 1000] [--duration 10] [--think 0] [--websocket]
+                                     [--ai 중]
+    python gomoku_3d_light.py --connect localhost:8765 [--game 방이름]
+
+프로토콜은 한 줄에 메시지 하나 (TCP는 줄바꿈으로, 웹소켓은 텍스트 프레임 하나로 구분):
+    클라이언트 -> 서버
+        JOIN <대국 이름|*> [보드 크기] [AI 난이도]
+                                          대국 참가 (*이면 같은 크기의 기다리는 대국과 짝지음,
+                                          AI 난이도(하/중/상)를 주면 서버 AI가 백을 둠)
+        MOVE <x> <y>                      수 두기
+        LEAVE                             대국에서 나가기
+        PING                              PONG으로 답함
+        STATS                             서버 상태로 답함
+    서버 -> 클라이언트
+        JOINED <대국 이름> <돌(1: 흑, 2: 백)> <보드 크기>
+        START                             두 사람이 모여 대국 시작 (흑부터)
+        MOVE <x> <y> <돌>                 둔 수 (둔 사람에게도 보냄)
+        OVER <이긴 돌|0>                  대국 끝 (0은 무승부)
+        LEFT <돌>                         상대가 나가서 대국 끝
+        STATS <대국> <연결> <둔 수> <끝난 대국> <AI 묶음 수> <AI가 둔 수>
+        ERROR <설명>                      ai-failed면 서버 AI가 수를 못 둔 것 (LEFT 2가 따라옴)
+
+서버의 대국 하나는 비트보드(정수 2개)와 두 연결, 수순(칸 번호 배열)만 가진다.
+수는 순서, 빈 칸 확인, 라인 마스크 승리 판정, 두 연결에 같은 줄 쓰기로 끝난다.
+AI 차례인 대국들은 모아서 난이도별로 gomoku_vector.choose_moves 한 번에 수를 고른다
+(AI 대국만 (n, n) int8 배열을 더 가짐). 상은 탐색 없는 상(후보 칸 중 공격/방어 최고점)이다.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import os
+import queue
+import random
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import time
+from array import array
+
+import numpy as np
+
+from gomoku_bitboard import BitBoard
+from gomoku_engine import BOARD_SIZE, DENSE_BOARD_LIMIT, DIFFICULTIES, WIN_LENGTH
+from gomoku_vector import choose_moves
+
+DEFAULT_PORT = 8765
+MAX_WRITE_BUFFER = 1 << 20  # 이보다 많이 쌓이면 (읽지 않는 클라이언트) 연결을 끊음
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_MAX_PAYLOAD = 1 << 16  # 이보다 큰 웹소켓 프레임은 읽지 않고 1009로 닫음
+WS_CLOSE_TOO_BIG = 1009
+
+
+class MessageTooLarge(Exception):
+    """웹소켓 프레임 길이가 WS_MAX_PAYLOAD를 넘음"""
+
+
+# ----- 웹소켓 (텍스트 프레임만, 조각난 프레임은 받지 않음) -----
+def ws_accept_key(key):
+    """Sec-WebSocket-Key -> Sec-WebSocket-Accept"""
+    return base64.b64encode(hashlib.sha1(key + WS_GUID).digest())
+
+
+def ws_frame(data, opcode=0x1, mask=False):
+    """데이터 -> 웹소켓 프레임 (클라이언트가 보내는 프레임은 mask=True)"""
+    n = len(data)
+    mask_bit = 0x80 if mask else 0
+    if n < 126:
+        header = struct.pack("!BB", 0x80 | opcode, mask_bit | n)
+    elif n < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, n)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, n)
+    if not mask:
+        return header + data
+    key = os.urandom(4)
+    return header + key + _ws_mask(data, key)
+
+
+def _ws_mask(data, key):
+    """웹소켓 마스크 XOR (정수 하나로 한 번에)"""
+    n = len(data)
+    if not n:
+        return data
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(data, "big") ^ int.from_bytes(repeated, "big")).to_bytes(n, "big")
+
+
+async def ws_read_frame(reader):
+    """웹소켓 프레임 하나 읽기 -> (opcode, 데이터), 너무 크면 데이터를 읽기 전에 MessageTooLarge"""
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if n > WS_MAX_PAYLOAD:
+        raise MessageTooLarge(n)
+    key = await reader.readexactly(4) if b1 & 0x80 else None
+    data = await reader.readexactly(n)
+    if key:
+        data = _ws_mask(data, key)
+    return b0 & 0x0F, data
+
+
+async def read_http_headers(reader):
+    """빈 줄까지 HTTP 헤더를 읽어 {소문자 이름: 값}"""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.partition(b":")
+        headers[name.strip().lower()] = value.strip()
+
+
+# ----- 서버 -----
+class Connection:
+    """클라이언트 연결 하나 (줄 단위 TCP)"""
+    __slots__ = ("writer", "game", "player")
+    websocket = False
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.game = None
+        self.player = 0
+
+    def send(self, line):
+        """메시지 한 줄 보내기 (기다리지 않음, 너무 쌓이면 연결을 끊음)"""
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        transport.write(line + b"\n")
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            transport.close()
+
+    async def lines(self, reader):
+        """받은 메시지를 한 줄씩"""
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield line
+
+
+class WebSocketConnection(Connection):
+    """웹소켓 클라이언트 연결 (메시지 하나가 텍스트 프레임 하나)"""
+    __slots__ = ()
+    websocket = True
+
+    def send(self, line):
+        transport = self.writer.transport
+        if transport.is_closing():
+            return
+        transport.write(ws_frame(line))
+        if transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            transport.close()
+
+    async def lines(self, reader):
+        while True:
+            try:
+                opcode, data = await ws_read_frame(reader)
+            except MessageTooLarge:
+                # 길이만 보고 거절 (그만큼 메모리를 잡지 않음)
+                self.writer.transport.write(ws_frame(struct.pack("!H", WS_CLOSE_TOO_BIG), 0x8))
+                return
+            if opcode == 0x8:  # 닫기
+                return
+            if opcode == 0x9:  # 핑 -> 퐁
+                self.writer.transport.write(ws_frame(data, 0xA))
+            elif opcode in (0x1, 0x2):
+                yield data
+
+
+class ServerAI:
+    """대국의 서버 AI 참가자 (연결 자리에 앉고, 보내는 메시지는 버림)"""
+    __slots__ = ("difficulty", "game", "player")
+
+    def __init__(self, difficulty):
+        self.difficulty = difficulty
+        self.game = None
+        self.player = 0
+
+    def send(self, line):
+        pass
+
+
+class ServerGame:
+    """서버의 대국 하나 (비트보드, 두 연결, 수순만 저장)"""
+    __slots__ = ("id", "board", "players", "moves", "over", "ai", "cells")
+
+    def __init__(self, game_id, size, ai=None):
+        self.id = game_id
+        self.board = BitBoard(size)
+        self.players = [None, None, None]  # 인덱스 1: 흑, 2: 백
+        self.moves = array("H")            # 칸 번호 x * size + y
+        self.over = False
+        self.ai = None     # 서버 AI (백)
+        self.cells = None  # AI 대국만: choose_moves에 넘길 (n, n) 배열
+        if ai is not None:
+            self.ai = self.players[2] = ServerAI(ai)
+            self.ai.game, self.ai.player = self, 2
+            self.cells = np.zeros((size, size), dtype=np.int8)
+
+    def broadcast(self, line):
+        """두 참가자에게 같은 메시지"""
+        for conn in self.players:
+            if conn is not None:
+                conn.send(line)
+
+
+class GameServer:
+    """여러 대국을 여는 asyncio 서버"""
+    def __init__(self, record_path=None):
+        self.games = {}     # 대국 이름 -> ServerGame
+        self.waiting = {}   # 보드 크기 -> 짝을 기다리는 자동 대국
+        self.next_id = 0
+        self.connections = 0
+        self.moves = 0
+        self.finished = 0
+        self.ai_pending = {}  # AI 차례인 대국 (순서 있는 집합)
+        self.ai_ready = asyncio.Event()
+        self.ai_batches = 0
+        self.ai_boards = 0
+        self.tasks = []       # 백그라운드 작업 (참조를 잡아 두지 않으면 GC될 수 있음)
+        self.writer = None
+        if record_path:
+            from gomoku_record import GameWriter
+            self.writer = GameWriter(record_path)
+
+    async def handle(self, reader, writer):
+        """연결 하나 (첫 줄이 "GET "이면 웹소켓, 아니면 줄 단위 TCP)"""
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.connections += 1
+        conn = None
+        try:
+            first = await reader.readline()
+            if first.startswith(b"GET "):
+                headers = await read_http_headers(reader)
+                key = headers.get(b"sec-websocket-key")
+                if key is None:
+                    writer.write(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+                    return
+                writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                             b"Connection: Upgrade\r\nSec-WebSocket-Accept: " +
+                             ws_accept_key(key) + b"\r\n\r\n")
+                conn = WebSocketConnection(writer)
+            else:
+                conn = Connection(writer)
+                self.dispatch(conn, first)
+            async for line in conn.lines(reader):
+                self.dispatch(conn, line)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            # ValueError: readline이 스트림 한도(64KiB)보다 긴 줄을 받음 -> 연결을 끊음
+            pass
+        finally:
+            self.connections -= 1
+            if conn is not None:
+                self.leave(conn)
+            writer.close()
+
+    def dispatch(self, conn, line):
+        """메시지 한 줄 처리"""
+        parts = line.split()
+        if not parts:
+            return
+        command = parts[0].upper()
+        try:
+            if command == b"MOVE":
+                self.move(conn, int(parts[1]), int(parts[2]))
+            elif command == b"JOIN":
+                game_id = parts[1].decode() if len(parts) > 1 and parts[1] != b"*" else None
+                size = int(parts[2]) if len(parts) > 2 else BOARD_SIZE
+                ai = parts[3].decode() if len(parts) > 3 else None
+                if ai is not None and ai not in DIFFICULTIES:
+                    conn.send(b"ERROR bad-difficulty")
+                    return
+                self.join(conn, game_id, size, ai)
+            elif command == b"LEAVE":
+                self.leave(conn)
+            elif command == b"PING":
+                conn.send(b"PONG")
+            elif command == b"STATS":
+                conn.send(b"STATS %d %d %d %d %d %d" % (
+                    len(self.games), self.connections, self.moves, self.finished,
+                    self.ai_batches, self.ai_boards))
+            else:
+                conn.send(b"ERROR unknown-command")
+        except (IndexError, ValueError):
+            conn.send(b"ERROR bad-message")
+
+    def join(self, conn, game_id, size, ai=None):
+        """대국 참가 (game_id가 None이면 기다리는 대국과 짝짓거나 새로 염, ai가 있으면 AI와 새 대국)"""
+        if conn.game is not None:
+            self.leave(conn)
+        if not WIN_LENGTH <= size <= DENSE_BOARD_LIMIT:
+            conn.send(b"ERROR bad-size")
+            return
+        if ai is not None:
+            if game_id in self.games:
+                conn.send(b"ERROR game-exists")
+                return
+            self.next_id += 1
+            game_id = game_id or str(self.next_id)
+            game = self.games[game_id] = ServerGame(game_id, size, ai)
+        elif game_id is None:
+            game = self.waiting.pop(size, None)
+            if game is None:
+                self.next_id += 1
+                game = self.games[str(self.next_id)] = ServerGame(str(self.next_id), size)
+                self.waiting[size] = game
+        else:
+            game = self.games.get(game_id)
+            if game is None:
+                game = self.games[game_id] = ServerGame(game_id, size)
+            elif game.board.size != size:
+                conn.send(b"ERROR size-mismatch")
+                return
+            elif game.players[1] is not None and game.players[2] is not None:
+                conn.send(b"ERROR game-full")
+                return
+        player = 1 if game.players[1] is None else 2
+        game.players[player] = conn
+        conn.game, conn.player = game, player
+        conn.send(f"JOINED {game.id} {player} {size}".encode())
+        if game.players[3 - player] is not None:
+            if self.waiting.get(size) is game:
+                del self.waiting[size]
+            game.broadcast(b"START")
+
+    def move(self, conn, x, y):
+        """수 두기: 순서, 빈 칸 확인 -> 두 참가자에게 알림 -> 승리/무승부 판정"""
+        game = conn.game
+        if game is None or game.over or None in game.players[1:]:
+            conn.send(b"ERROR not-playing")
+            return
+        player = len(game.moves) % 2 + 1
+        if conn.player != player:
+            conn.send(b"ERROR not-your-turn")
+            return
+        board = game.board
+        if not board.in_bounds(x, y) or board.get(x, y):
+            conn.send(b"ERROR invalid-move")
+            return
+        self.play(game, x, y, player)
+
+    def play(self, game, x, y, player):
+        """확인한 수를 두고 알림 -> 승리/무승부 판정 -> AI 차례면 다음 AI 묶음에 넣음"""
+        board = game.board
+        board.set(x, y, player)
+        game.moves.append(x * board.size + y)
+        self.moves += 1
+        game.broadcast(b"MOVE %d %d %d" % (x, y, player))
+        if board.check_win(x, y):
+            self.finish(game, player)
+        elif board.is_full():
+            self.finish(game, 0)
+        elif game.ai is not None:
+            game.cells[x, y] = player
+            if player != game.ai.player:
+                self.ai_pending[game] = None
+                self.ai_ready.set()
+
+    async def ai_loop(self):
+        """AI 차례인 대국을 모아 (난이도, 크기)별로 choose_moves 한 번에 두기"""
+        rng = np.random.default_rng()
+        while True:
+            await self.ai_ready.wait()
+            await asyncio.sleep(0)  # 같은 차례에 처리되는 다른 연결의 수도 모음
+            self.ai_ready.clear()
+            pending, self.ai_pending = self.ai_pending, {}
+            groups = {}
+            for game in pending:
+                if not game.over:
+                    groups.setdefault((game.ai.difficulty, game.board.size), []).append(game)
+            for (difficulty, _), games in groups.items():
+                try:
+                    moves = choose_moves(np.stack([game.cells for game in games]), difficulty, 2, rng)
+                    for game, (x, y) in zip(games, moves.tolist()):
+                        if not game.over:
+                            self.play(game, x, y, 2)
+                except Exception as e:
+                    # 묶음 하나가 실패해도 루프는 살려 두고, 아직 AI 차례인 대국만 끝냄
+                    print(f"AI 묶음 실패 ({difficulty}, {len(games)}판): {e!r}", flush=True)
+                    for game in games:
+                        if not game.over and len(game.moves) % 2 == 1:
+                            self.ai_failed(game)
+                self.ai_batches += 1
+                self.ai_boards += len(games)
+
+    def ai_failed(self, game):
+        """AI가 수를 두지 못한 대국: 오류를 알리고 AI가 나간 것처럼 닫음"""
+        game.broadcast(b"ERROR ai-failed")
+        game.over = True
+        game.broadcast(b"LEFT %d" % game.ai.player)
+        self.close_game(game, None)
+
+    def finish(self, game, winner):
+        """대국 끝: 알리고, 기록하고, 대국 목록에서 뺌"""
+        game.over = True
+        game.broadcast(b"OVER %d" % winner)
+        self.close_game(game, winner)
+
+    def leave(self, conn):
+        """연결이 대국에서 나감 (대국 중이었으면 상대에게 알리고 대국을 닫음)"""
+        game = conn.game
+        if game is None:
+            return
+        conn.game = None
+        game.players[conn.player] = None
+        if not game.over:
+            game.over = True
+            game.broadcast(b"LEFT %d" % conn.player)
+            self.close_game(game, None)
+
+    def close_game(self, game, winner):
+        """대국을 목록에서 빼고 (기록 파일이 있으면) 기록"""
+        for conn in game.players:
+            if conn is not None:
+                conn.game = None
+        if self.games.get(game.id) is game:
+            del self.games[game.id]
+        size = game.board.size
+        if self.waiting.get(size) is game:
+            del self.waiting[size]
+        self.finished += 1
+        if self.writer is not None and len(game.moves):
+            from gomoku_record import DRAW, UNFINISHED, GameRecord
+            result = UNFINISHED if winner is None else winner or DRAW
+            try:
+                self.writer.write_game(GameRecord(size, result, np.asarray(game.moves)))
+            except OSError as e:
+                print(f"대국 기록 실패: {e}", flush=True)
+
+    async def report(self, interval):
+        """interval초마다 대국 수, 연결 수, 초당 수 출력"""
+        last_moves, last_time = self.moves, time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.perf_counter()
+            ai_text = ""
+            if self.ai_batches:
+                ai_text = f", AI 묶음 평균 {self.ai_boards / self.ai_batches:.1f}판"
+            print(f"[서버] 대국 {len(self.games)}개, 연결 {self.connections}개, "
+                  f"끝난 대국 {self.finished}개, "
+                  f"{(self.moves - last_moves) / (now - last_time):.0f}수/초{ai_text}", flush=True)
+            last_moves, last_time = self.moves, now
+
+
+def raise_open_file_limit():
+    """열 수 있는 파일(연결) 수를 최대로 (유닉스만)"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def serve(host, port, record_path=None, stats_interval=0):
+    """서버 실행 (끝나지 않음)"""
+    raise_open_file_limit()
+    server = GameServer(record_path)
+    listener = await asyncio.start_server(server.handle, host, port, backlog=4096)
+    print(f"오목 서버: {host}:{port} (TCP 줄 단위와 웹소켓)", flush=True)
+    server.tasks.append(asyncio.ensure_future(server.ai_loop()))
+    if stats_interval:
+        server.tasks.append(asyncio.ensure_future(server.report(stats_interval)))
+    async with listener:
+        await listener.serve_forever()
+
+
+# ----- 화면(pygame) 클라이언트 -----
+class NetClient:
+    """서버 연결 (받는 스레드가 메시지를 큐에 넣고, 화면 루프는 poll로 꺼냄)
+
+    notify를 주면 메시지가 올 때마다 받는 스레드에서 부른다 (화면 루프를 깨우는 용도).
+    연결이 끊기면 ["CLOSED"] 메시지를 넣는다.
+    """
+    def __init__(self, host, port=DEFAULT_PORT, notify=None):
+        self.sock = socket.create_connection((host, port), timeout=5)
+        self.sock.settimeout(None)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.messages = queue.Queue()
+        self.notify = notify
+        self.thread = threading.Thread(target=self.receive, name="gomoku-net", daemon=True)
+        self.thread.start()
+
+    def receive(self):
+        """받는 스레드: 한 줄씩 큐에 넣음"""
+        try:
+            for line in self.sock.makefile("rb"):
+                self.put(line.decode("utf-8", "replace").split())
+        except OSError:
+            pass
+        self.put(["CLOSED"])
+
+    def put(self, message):
+        if message:
+            self.messages.put(message)
+            if self.notify:
+                self.notify()
+
+    def send(self, text):
+        """메시지 한 줄 보내기 (연결이 끊겼으면 무시, CLOSED는 받는 스레드가 알림)"""
+        try:
+            self.sock.sendall(text.encode() + b"\n")
+        except OSError:
+            pass
+
+    def join(self, game_id=None, size=BOARD_SIZE, ai=None):
+        self.send(f"JOIN {game_id or '*'} {size} {ai or ''}".rstrip())
+
+    def move(self, x, y):
+        self.send(f"MOVE {x} {y}")
+
+    def poll(self):
+        """받은 메시지 목록 (각각 공백으로 나눈 문자열 목록)"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# ----- 부하 테스트 -----
+class LoadStats:
+    """부하 테스트 집계 (수 수, 수 지연 시간)"""
+    def __init__(self):
+        self.moves = 0
+        self.games = 0
+        self.errors = 0
+        self.latencies = []
+        self.server = []  # 끝난 뒤 서버 STATS
+
+
+async def open_load_connection(host, port, websocket):
+    """부하 테스트용 연결 -> (reader, 보내기 함수, 읽기 함수, writer)"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if websocket:
+        key = base64.b64encode(os.urandom(16))
+        writer.write(b"GET / HTTP/1.1\r\nHost: " + host.encode() + b"\r\nUpgrade: websocket\r\n"
+                     b"Connection: Upgrade\r\nSec-WebSocket-Version: 13\r\n"
+                     b"Sec-WebSocket-Key: " + key + b"\r\n\r\n")
+        status = await reader.readline()
+        headers = await read_http_headers(reader)
+        if b" 101 " not in status or headers.get(b"sec-websocket-accept") != ws_accept_key(key):
+            raise ConnectionError("웹소켓 연결 실패")
+
+        def send(line):
+            writer.write(ws_frame(line, mask=True))
+
+        async def read():
+            return (await ws_read_frame(reader))[1]
+    else:
+        def send(line):
+            writer.write(line + b"\n")
+
+        async def read():
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("연결 끊김")
+            return line
+    return send, read, writer
+
+
+async def load_player(host, port, pair, size, stats, deadline, think, websocket, rng, ai=None):
+    """대국 pair의 한쪽 참가자: 마감 시간까지 무작위 수로 대국을 이어서 둠 (ai가 있으면 서버 AI와)"""
+    send, read, writer = await open_load_connection(host, port, websocket)
+    cells = [(x, y) for x in range(size) for y in range(size)]
+    round_number = 0
+    try:
+        while time.perf_counter() < deadline:
+            if ai:
+                send(b"JOIN * %d %s" % (size, ai.encode()))
+            else:
+                send(b"JOIN %d.%d %d" % (pair, round_number, size))
+            round_number += 1
+            rng.shuffle(cells)
+            order = list(cells)
+            board = BitBoard(size)
+            me = 0
+            sent = None
+            while True:
+                parts = (await read()).split()
+                kind = parts[0]
+                if kind == b"MOVE":
+                    x, y, player = int(parts[1]), int(parts[2]), int(parts[3])
+                    board.set(x, y, player)
+                    if player == me:
+                        stats.latencies.append(time.perf_counter() - sent)
+                        stats.moves += 1
+                        continue
+                    if board.check_win(x, y) or board.is_full():
+                        continue  # OVER가 따라옴
+                elif kind == b"JOINED":
+                    me = int(parts[2])
+                    continue
+                elif kind == b"START":
+                    if me != 1:
+                        continue
+                elif kind == b"ERROR":
+                    stats.errors += 1
+                    continue
+                else:  # OVER, LEFT
+                    stats.games += kind == b"OVER" and me == 1
+                    break
+                # 내 차례: 무작위 빈 칸
+                if time.perf_counter() >= deadline:
+                    return
+                if think:
+                    await asyncio.sleep(rng.uniform(0, 2 * think))
+                while board.get(*order[-1]):
+                    order.pop()
+                sent = time.perf_counter()
+                send(b"MOVE %d %d" % order.pop())
+    finally:
+        writer.close()
+
+
+def percentile(values, p):
+    """정렬한 값에서 p 백분위수"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def free_port():
+    """비어 있는 포트 번호"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(host, port, timeout=10):
+    """서버가 연결을 받을 때까지 기다림"""
+    end = time.perf_counter() + timeout
+    while True:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            if time.perf_counter() > end:
+                raise
+            time.sleep(0.05)
+
+
+async def server_stats(host, port):
+    """서버 STATS 응답 (정수 목록)"""
+    send, read, writer = await open_load_connection(host, port, False)
+    send(b"STATS")
+    parts = (await read()).split()
+    writer.close()
+    return [int(part) for part in parts[1:]]
+
+
+async def run_load(host, port, games, duration, think, size, websocket, seed, ai=None):
+    """games개 대국(연결 2 * games개, ai가 있으면 games개)을 duration초 동안 두고 집계"""
+    stats = LoadStats()
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + duration
+    seats = 1 if ai else 2
+    players = [load_player(host, port, pair, size, stats, deadline, think, websocket,
+                           random.Random(rng.random()), ai)
+               for pair in range(games) for _ in range(seats)]
+    results = await asyncio.gather(*players, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failures = [r for r in results if isinstance(r, Exception)]
+    stats.server = await server_stats(host, port)
+    return stats, elapsed, failures
+
+
+def load_test(games=1000, duration=10.0, think=0.0, size=BOARD_SIZE, websocket=False,
+              address=None, seed=0, ai=None):
+    """부하 테스트: 서버(address가 없으면 새 프로세스로 띄움)에 대국 games개를 동시에 두고 결과 출력"""
+    raise_open_file_limit()
+    server = None
+    if address:
+        host, _, port = address.rpartition(":")
+        host, port = host or "127.0.0.1", int(port)
+    else:
+        host, port = "127.0.0.1", free_port()
+        server = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve",
+                                   "--host", host, "--port", str(port)],
+                                  stdout=subprocess.DEVNULL)
+        wait_for_port(host, port)
+    try:
+        stats, elapsed, failures = asyncio.run(
+            run_load(host, port, games, duration, think, size, websocket, seed, ai))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    latencies = sorted(stats.latencies)
+    opponent = f"서버 AI {ai}" if ai else "사람끼리"
+    print(f"부하 테스트: 대국 {games}개 동시 ({opponent}, 연결 {games * (1 if ai else 2)}개, "
+          f"{'웹소켓' if websocket else 'TCP'}, 생각 시간 평균 {think * 1000:.0f}ms), "
+          f"{elapsed:.1f}초")
+    print(f"수 {stats.moves}개 ({stats.moves / elapsed:.0f}수/초), 끝난 대국 {stats.games}개, "
+          f"오류 메시지 {stats.errors}개, 실패한 연결 {len(failures)}개")
+    print(f"수 지연 시간: p50 {percentile(latencies, 50) * 1000:.2f}ms, "
+          f"p99 {percentile(latencies, 99) * 1000:.2f}ms, "
+          f"최대 {(latencies[-1] if latencies else 0) * 1000:.2f}ms")
+    ai_batches, ai_boards = stats.server[4:6]
+    if ai_batches:
+        print(f"서버 AI: 묶음 {ai_batches}번, 묶음당 평균 {ai_boards / ai_batches:.1f}판")
+    if failures:
+        print(f"첫 실패: {failures[0]!r}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오목 온라인 대국 서버")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="서버 실행")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--record", help="끝난 대국을 덧붙일 대국 기록 파일 (.gmr)")
+    serve_parser.add_argument("--stats", type=float, default=0, help="상태 출력 간격 (초)")
+
+    load_parser = subparsers.add_parser("loadtest", help="가상 클라이언트로 부하 테스트")
+    load_parser.add_argument("--games", type=int, default=1000, help="동시 대국 수")
+    load_parser.add_argument("--duration", type=float, default=10.0, help="테스트 시간 (초)")
+    load_parser.add_argument("--think", type=float, default=0.0,
+                             help="수마다 평균 생각 시간 (초, 0이면 최대 부하)")
+    load_parser.add_argument("--size", type=int, default=BOARD_SIZE)
+    load_parser.add_argument("--websocket", action="store_true", help="웹소켓으로 접속")
+    load_parser.add_argument("--connect", help="이미 실행 중인 서버 (host:port)")
+    load_parser.add_argument("--seed", type=int, default=0)
+    load_parser.add_argument("--ai", choices=DIFFICULTIES,
+                             help="대국마다 클라이언트 하나가 서버 AI와 둠 (AI 수는 묶어서 계산)")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.record, args.stats))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "loadtest":
+        load_test(args.games, args.duration, args.think, args.size, args.websocket,
+                  args.connect, args.seed, args.ai)
+
+
+if __name__ == "__main__":
+    main()
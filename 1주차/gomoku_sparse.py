@@ -0,0 +1,179 @@
+"""큰 보드용 희소 표현: 놓인 돌과 그 주변에서 바뀐 칸만 딕셔너리에 저장
+
+19x19보다 훨씬 큰 보드나 사실상 끝이 없는 "자유" 보드(FREE_BOARD_SIZE)에서도
+메모리와 수당 비용이 보드 넓이가 아니라 놓인 돌 수에 비례한다.
+GomokuEngine(board_size)는 DENSE_BOARD_LIMIT보다 큰 보드에 자동으로 이것을 쓰고,
+GomokuEngine(19, board_factory=SparseBoard)처럼 작은 보드에도 직접 쓸 수 있다.
+
+칸 번호(x * size + y)는 그대로 쓰므로 탐색, 치환표, VCF 탐색은 바꾸지 않고 동작한다.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from gomoku_engine import (BOARD_SIZE, CANDIDATE_RADIUS, DENSE_BOARD_LIMIT, DIRECTIONS,
+                           WIN_LENGTH, CandidateSet)
+from gomoku_eval import REACH, WALL, PatternEvaluator, build_pattern_table, slot_of
+
+FREE_BOARD_SIZE = 1 << 15  # 자유 보드: 가운데에서 시작하면 끝에 닿을 일이 없는 크기
+WINDOW_MARGIN = WIN_LENGTH  # 큰 보드의 빈 칸 목록은 돌 둘레 이만큼까지만
+
+
+class SparseBoard:
+    """놓인 돌만 {(x, y): 돌} 딕셔너리에 저장하는 오목판 (Board와 같은 인터페이스)"""
+    sparse = True
+
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.cells = {}
+
+    @property
+    def stone_count(self):
+        return len(self.cells)
+
+    def in_bounds(self, x, y):
+        """좌표가 보드 안인지 확인"""
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def get(self, x, y):
+        """해당 칸의 돌 (0, 1, 2)"""
+        return self.cells.get((x, y), 0)
+
+    def set(self, x, y, player):
+        """해당 칸에 돌을 놓거나 (player=0이면) 치우기"""
+        if player:
+            self.cells[(x, y)] = player
+        else:
+            self.cells.pop((x, y), None)
+
+    def is_full(self):
+        """빈 칸이 없는지 확인"""
+        return len(self.cells) >= self.size * self.size
+
+    def bounds(self):
+        """돌이 놓인 영역 (최소 x, 최소 y, 최대 x, 최대 y), 빈 보드면 None"""
+        if not self.cells:
+            return None
+        xs = [x for x, _ in self.cells]
+        ys = [y for _, y in self.cells]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def empty_cells(self):
+        """빈 칸 좌표 목록 (큰 보드는 돌 둘레 WINDOW_MARGIN칸 안만, 빈 보드면 가운데)"""
+        if self.size <= DENSE_BOARD_LIMIT:
+            x0 = y0 = 0
+            x1 = y1 = self.size - 1
+        else:
+            bounds = self.bounds()
+            if bounds is None:
+                center = self.size // 2
+                return [(center, center)]
+            x0, y0 = max(0, bounds[0] - WINDOW_MARGIN), max(0, bounds[1] - WINDOW_MARGIN)
+            x1 = min(self.size - 1, bounds[2] + WINDOW_MARGIN)
+            y1 = min(self.size - 1, bounds[3] + WINDOW_MARGIN)
+        cells = self.cells
+        return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)
+                if (x, y) not in cells]
+
+    def stones(self):
+        """놓인 돌 (x, y, player) 목록"""
+        return sorted((x, y, player) for (x, y), player in self.cells.items())
+
+    def check_win(self, x, y):
+        """(x, y)의 돌이 5목 이상을 만들었는지 확인"""
+        cells = self.cells
+        player = cells.get((x, y), 0)
+        if player == 0:
+            return False
+        for dx, dy in DIRECTIONS:
+            count = 1
+            for direction in (1, -1):
+                nx, ny = x + dx * direction, y + dy * direction
+                while count < WIN_LENGTH and cells.get((nx, ny)) == player:
+                    count += 1
+                    nx += dx * direction
+                    ny += dy * direction
+            if count >= WIN_LENGTH:
+                return True
+        return False
+
+    def copy(self):
+        """보드 복사본"""
+        board = SparseBoard(self.size)
+        board.cells = dict(self.cells)
+        return board
+
+    def window(self, x0, y0, width, height):
+        """(x0, y0)부터 width x height 영역의 NumPy 배열 (보드 밖은 0)"""
+        array = np.zeros((width, height), dtype=int)
+        for (x, y), player in self.cells.items():
+            if x0 <= x < x0 + width and y0 <= y < y0 + height:
+                array[x - x0, y - y0] = player
+        return array
+
+    def to_array(self):
+        """(size, size) NumPy 배열로 변환 (DENSE_BOARD_LIMIT 이하 크기만)"""
+        if self.size > DENSE_BOARD_LIMIT:
+            raise ValueError(f"{self.size}x{self.size} 보드는 배열로 만들 수 없음 (window 사용)")
+        return self.window(0, 0, self.size, self.size)
+
+
+class SparseCandidateSet(CandidateSet):
+    """CandidateSet과 같지만 칸별 표 대신 돌 주변에서 건드린 칸만 딕셔너리에 저장"""
+    def __init__(self, size=BOARD_SIZE, radius=CANDIDATE_RADIUS):
+        super().__init__(0, radius)  # 칸별 목록은 만들지 않음
+        self.size = size
+        self.near_count = defaultdict(int)
+        self.occupied = defaultdict(bool)
+
+
+class WallCodes(dict):
+    """방향 하나의 칸별 창 코드 (돌 때문에 바뀐 칸만 저장, 나머지는 보드 밖 벽만 표시한 코드)"""
+    def __init__(self, size, direction):
+        super().__init__()
+        self.size = size
+        self.dx, self.dy = DIRECTIONS[direction]
+
+    def __missing__(self, c):
+        size = self.size
+        x, y = divmod(c, size)
+        if REACH <= x < size - REACH and REACH <= y < size - REACH:
+            return 0  # 창이 보드 안에 다 들어감
+        code = 0
+        for k in range(-REACH, REACH + 1):
+            nx, ny = x + self.dx * k, y + self.dy * k
+            if k != 0 and not (0 <= nx < size and 0 <= ny < size):
+                code |= WALL << (2 * slot_of(k))
+        return code
+
+
+class SparseNeighbors(dict):
+    """방향 하나의 칸별 (이웃 칸, 이웃 창에서 이 칸의 비트 위치) 목록 (돌을 둔 칸만 계산해 저장)"""
+    def __init__(self, size, direction):
+        super().__init__()
+        self.size = size
+        self.dx, self.dy = DIRECTIONS[direction]
+
+    def __missing__(self, c):
+        size, dx, dy = self.size, self.dx, self.dy
+        x, y = divmod(c, size)
+        items = []
+        for k in range(-REACH, REACH + 1):
+            nx, ny = x + dx * k, y + dy * k
+            if k != 0 and 0 <= nx < size and 0 <= ny < size:
+                items.append((nx * size + ny, 2 * slot_of(-k)))
+        self[c] = items
+        return items
+
+
+class SparseEvaluator(PatternEvaluator):
+    """PatternEvaluator와 같은 갱신과 평가를 칸별 표 없이 (바뀐 칸만 딕셔너리에 저장)"""
+    def __init__(self, size=BOARD_SIZE):
+        self.size = size
+        self.table = build_pattern_table()
+        self.neighbors = [SparseNeighbors(size, d) for d in range(len(DIRECTIONS))]
+        self.codes = [WallCodes(size, d) for d in range(len(DIRECTIONS))]
+        self.occupied = defaultdict(bool)
+        self.scores = [None, defaultdict(int), defaultdict(int)]
+        # 돌이 없으면 어느 칸에도 2목 이상 패턴이 없으므로 위협 점수는 모두 0
+        self.totals = [0, 0, 0]
@@ -0,0 +1,366 @@
+"""VCF(연속 4로 승리) / VCT(연속 위협으로 승리) 강제승 탐색
+
+사용법:
+    python gomoku_vcf.py position.txt [--vct] [--time 1.0]
+
+position.txt는 한 줄에 한 행씩 '.'(빈 칸), 'X'(흑), 'O'(백)로 쓴 보드다.
+두는 차례는 돌 수로 정한다 (흑백 수가 같으면 흑).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from gomoku_engine import DIRECTIONS, GomokuEngine
+from gomoku_eval import FIVE, REACH, SLOTS, slot_of
+
+# 창 슬롯 -> 가운데에서의 거리
+SLOT_OFFSETS = [k for k in range(-REACH, REACH + 1) if k != 0]
+
+DEFENCE_TIME_FACTOR = 4  # defences()가 쓰는 최대 시간 (time_limit의 배수)
+
+_THREAT_CACHE = {}
+
+
+def build_threat_tables():
+    """창 코드 -> (5목 자리 슬롯 마스크, 열린 3 방어 슬롯 마스크) 표, [None, 흑, 백]
+
+    가운데 칸에 player가 두었을 때
+    - 5칸 창 안에 자기 돌 4개와 빈 칸 1개가 생기면 그 빈 칸이 5목 자리 (4)
+    - 6칸 창의 양 끝이 비어 있고 안쪽 4칸에 자기 돌 3개와 빈 칸 1개면 열린 3이고,
+      안쪽 빈 칸과 양 끝이 막아야 하는 자리
+    """
+    if "tables" in _THREAT_CACHE:
+        return _THREAT_CACHE["tables"]
+    codes = np.arange(4 ** SLOTS)
+    slots = (codes[:, None] >> (2 * np.arange(SLOTS))) & 3
+    # 9칸 창 (가운데 포함), 각 위치의 슬롯 비트
+    order = [slot_of(k) if k else None for k in range(-REACH, REACH + 1)]
+    slot_bits = np.array([0 if s is None else 1 << s for s in order])
+
+    four_tables, three_tables = [None], [None]
+    for player in (1, 2):
+        line = np.stack([np.full(len(codes), player) if s is None else slots[:, s]
+                         for s in order], axis=1)
+        own = line == player
+        empty = line == 0
+
+        four = np.zeros(len(codes), dtype=np.int64)
+        for start in range(REACH + 1):  # 가운데를 포함하는 5칸 창
+            window = slice(start, start + 5)
+            hit = (own[:, window].sum(axis=1) == 4) & (empty[:, window].sum(axis=1) == 1)
+            four |= np.where(hit, (empty[:, window] * slot_bits[window]).sum(axis=1), 0)
+
+        three = np.zeros(len(codes), dtype=np.int64)
+        for start in range(REACH):  # 가운데가 안쪽 4칸에 드는 6칸 창
+            inner = slice(start + 1, start + 5)
+            hit = (empty[:, start] & empty[:, start + 5] &
+                   (own[:, inner].sum(axis=1) == 3) & (empty[:, inner].sum(axis=1) == 1))
+            cells = (empty[:, inner] * slot_bits[inner]).sum(axis=1)
+            cells |= slot_bits[start] | slot_bits[start + 5]
+            three |= np.where(hit, cells, 0)
+
+        four_tables.append(four.tolist())
+        three_tables.append(three.tolist())
+    _THREAT_CACHE["tables"] = (four_tables, three_tables)
+    return _THREAT_CACHE["tables"]
+
+
+class SolverTimeout(Exception):
+    """강제승 탐색 시간 초과"""
+
+
+class ThreatSolver:
+    """위협 수(4, 열린 3)만 두는 강제승 탐색 (결과는 Zobrist 해시로 캐시)
+
+    공격자는 항상 지금 차례인 쪽이다. 수비는 4에는 5목 자리를 막는 수만,
+    열린 3에는 그 3을 막는 자리와 자기 4로 받아치는 수를 둔다.
+    """
+    def __init__(self, engine, max_depth=12, time_limit=0.2, stop_event=None):
+        self.engine = engine
+        self.size = engine.board_size
+        self.max_depth = max_depth      # 공격자 수 기준 최대 깊이
+        self.time_limit = time_limit
+        self.stop_event = stop_event    # threading.Event, 설정되면 시간 초과처럼 중단
+        self.four_table, self.three_table = build_threat_tables()
+        self.cache = {}                 # (해시, VCT 여부) -> (깊이, 승리 수 또는 None)
+        self.nodes = 0
+        self.deadline = None
+
+    # ----- 위협 찾기 -----
+    def five_cells(self, player):
+        """player가 두면 바로 5목이 되는 빈 칸"""
+        scores = self.engine.evaluator.scores[player]
+        return [c for c in self.engine.candidates.cells if scores[c] >= FIVE]
+
+    def _cells_from_mask(self, c, direction, mask):
+        """칸 c의 창 슬롯 마스크를 칸 번호 목록으로"""
+        dx, dy = DIRECTIONS[direction]
+        x, y = divmod(c, self.size)
+        return [(x + dx * SLOT_OFFSETS[s]) * self.size + y + dy * SLOT_OFFSETS[s]
+                for s in range(SLOTS) if mask >> s & 1]
+
+    def four_moves(self, player):
+        """두면 4(5목 자리)가 생기는 빈 칸"""
+        codes = self.engine.evaluator.codes
+        table = self.four_table[player]
+        return [c for c in self.engine.candidates.cells
+                if table[codes[0][c]] or table[codes[1][c]] or table[codes[2][c]] or table[codes[3][c]]]
+
+    def three_moves(self, player):
+        """두면 열린 3이 생기는 빈 칸 (4가 되는 칸 제외)"""
+        codes = self.engine.evaluator.codes
+        four, three = self.four_table[player], self.three_table[player]
+        moves = []
+        for c in self.engine.candidates.cells:
+            window = (codes[0][c], codes[1][c], codes[2][c], codes[3][c])
+            if not any(four[code] for code in window) and any(three[code] for code in window):
+                moves.append(c)
+        return moves
+
+    def three_defences(self, c, player):
+        """c에 둔 player의 열린 3을 막을 수 있는 빈 칸"""
+        codes = self.engine.evaluator.codes
+        cells = set()
+        for direction in range(len(DIRECTIONS)):
+            mask = self.three_table[player][codes[direction][c]]
+            if mask:
+                cells.update(self._cells_from_mask(c, direction, mask))
+        return cells
+
+    # ----- 탐색 -----
+    def play(self, c):
+        """칸 번호로 수 두기"""
+        self.engine.make_move(*divmod(c, self.size))
+
+    def check_time(self):
+        """시간 초과/중단 요청 확인"""
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SolverTimeout()
+        if self.stop_event is not None and self.stop_event.is_set():
+            raise SolverTimeout()
+
+    def attack(self, depth, vct):
+        """공격자 차례: 강제승 첫 수(칸 번호) 또는 None"""
+        self.check_time()
+        engine = self.engine
+        attacker = engine.current_player
+        defender = 3 - attacker
+
+        wins = self.five_cells(attacker)
+        if wins:
+            return wins[0]
+        if depth == 0:
+            return None
+
+        key = (engine.hash, vct)
+        cached = self.cache.get(key)
+        if cached and (cached[1] is not None or cached[0] >= depth):
+            return cached[1]
+
+        threats = self.five_cells(defender)
+        if len(threats) > 1:
+            moves = []  # 상대 4가 둘이면 막을 수 없음
+        elif threats:
+            moves = threats  # 상대 4는 반드시 막아야 함
+        else:
+            moves = self.four_moves(attacker)
+            if vct:
+                moves += self.three_moves(attacker)
+
+        result = None
+        for c in moves:
+            self.play(c)
+            if engine.winner:
+                result = c
+            elif not engine.game_over and self.defend(depth, vct):
+                result = c
+            engine.undo()
+            if result is not None:
+                break
+        self.cache[key] = (depth, result)
+        return result
+
+    def defend(self, depth, vct):
+        """수비자 차례: 모든 수비에 대해 공격자가 이기면 True"""
+        self.check_time()
+        engine = self.engine
+        defender = engine.current_player
+        attacker = 3 - defender
+
+        if self.five_cells(defender):
+            return False  # 수비자가 먼저 5목
+        blocks = self.five_cells(attacker)
+        if len(blocks) > 1:
+            return True  # 4가 둘 (열린 4 포함)
+        if blocks:
+            replies = blocks
+        elif vct:
+            last = engine.history[-1]
+            c = last[0] * self.size + last[1]
+            replies = list(self.three_defences(c, attacker) | set(self.four_moves(defender)))
+            if not replies:
+                return False  # 위협이 아니었음
+        else:
+            return False  # VCF에서는 4가 아니면 실패
+
+        for c in replies:
+            self.play(c)
+            won = not engine.game_over and self.attack(depth - 1, vct) is not None
+            engine.undo()
+            if not won:
+                return False
+        return True
+
+    def principal_line(self, vct):
+        """찾은 강제승 수순 (칸 좌표 목록)"""
+        engine = self.engine
+        line = []
+        played = 0
+        depth = self.max_depth
+        while not engine.game_over and depth >= 0:
+            c = self.attack(depth, vct)
+            if c is None:
+                break
+            line.append(divmod(c, self.size))
+            self.play(c)
+            played += 1
+            if engine.game_over:
+                break
+            # 수비는 첫 번째 5목 자리(또는 아무 수비)로 이어간다
+            blocks = self.five_cells(3 - engine.current_player)
+            if not blocks:
+                break
+            line.append(divmod(blocks[0], self.size))
+            self.play(blocks[0])
+            played += 1
+            depth -= 1
+        for _ in range(played):
+            engine.undo()
+        return line
+
+    def solve(self, vct=False):
+        """지금 차례인 쪽의 강제승 첫 수 (x, y), 없거나 시간 초과면 None"""
+        self.deadline = time.perf_counter() + self.time_limit
+        self.nodes = 0
+        root_length = len(self.engine.history)
+        try:
+            for depth in range(1, self.max_depth + 1):  # 짧은 수순부터
+                c = self.attack(depth, vct)
+                if c is not None:
+                    return divmod(c, self.size)
+        except SolverTimeout:
+            while len(self.engine.history) > root_length:
+                self.engine.undo()
+        return None
+
+    def solve_vcf(self):
+        """VCF 첫 수"""
+        return self.solve(vct=False)
+
+    def solve_vct(self):
+        """VCT 첫 수 (VCF 포함)"""
+        return self.solve(vct=True)
+
+    def pass_turn(self):
+        """차례만 넘김 (상대의 강제승을 확인할 때 사용)"""
+        engine = self.engine
+        engine.current_player = 3 - engine.current_player
+        engine.hash ^= engine.side_key
+
+    def defences(self, moves=None):
+        """상대의 VCF를 막는 수 목록 (상대에게 VCF가 없으면 None)
+
+        moves를 주면 그 중에서만 찾는다. 빈 목록이면 막을 수 없다.
+        4를 만들어 미루기만 하는 수는 상대가 막은 뒤에도 VCF가 남으면 빼므로,
+        목록에 든 수는 두고 나서 상대의 VCF가 없어지는 수다.
+        전체 시간이 time_limit의 몇 배를 넘거나 중단 요청이 오면 확인을 멈추고 None을 반환한다.
+        """
+        engine = self.engine
+        give_up = time.perf_counter() + self.time_limit * DEFENCE_TIME_FACTOR
+        self.pass_turn()
+        try:
+            threat = self.solve_vcf()
+        finally:
+            self.pass_turn()
+        if threat is None:
+            return None
+        if moves is None:
+            moves = engine.candidate_moves()
+        result = []
+        stop_event = self.stop_event
+        for x, y in moves:
+            if time.perf_counter() > give_up or (stop_event is not None and stop_event.is_set()):
+                return None
+            engine.make_move(x, y)
+            if self.blocked():
+                result.append((x, y))
+            engine.undo()
+        return result
+
+    def blocked(self):
+        """방금 둔 수로 상대의 VCF가 없어졌는지 (defences에서 사용)"""
+        engine = self.engine
+        if engine.winner:
+            return True
+        attacker = engine.current_player
+        if self.five_cells(attacker):
+            return False
+        fours = self.five_cells(3 - attacker)
+        if len(fours) > 1:
+            return True  # 막을 수 없는 4
+        if not fours:
+            return self.solve_vcf() is None
+        # 4는 상대가 반드시 막으므로, 막은 뒤에도 상대에게 VCF가 남으면 미루기만 한 수
+        self.play(fours[0])
+        self.pass_turn()
+        try:
+            return self.solve_vcf() is None
+        finally:
+            self.pass_turn()
+            engine.undo()
+
+
+def load_position(path):
+    """텍스트 보드 파일에서 엔진 생성 (흑백을 번갈아 다시 둠)"""
+    with open(path, encoding="utf-8") as f:
+        rows = [line.strip() for line in f if line.strip()]
+    black = [(x, y) for x, row in enumerate(rows) for y, ch in enumerate(row) if ch in "XxB"]
+    white = [(x, y) for x, row in enumerate(rows) for y, ch in enumerate(row) if ch in "OoW"]
+    if not (len(black) == len(white) or len(black) == len(white) + 1):
+        raise ValueError(f"흑 {len(black)}개, 백 {len(white)}개: 번갈아 둔 국면이 아님")
+    engine = GomokuEngine(len(rows))
+    for i in range(len(black) + len(white)):
+        x, y = black[i // 2] if i % 2 == 0 else white[i // 2]
+        engine.make_move(x, y)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VCF/VCT 강제승 탐색")
+    parser.add_argument("position", help="텍스트 보드 파일 (.XO)")
+    parser.add_argument("--vct", action="store_true", help="열린 3 위협까지 사용")
+    parser.add_argument("--time", type=float, default=1.0, help="시간 제한 (초)")
+    parser.add_argument("--depth", type=int, default=12, help="공격 수 최대 깊이")
+    args = parser.parse_args()
+
+    engine = load_position(args.position)
+    player = "흑" if engine.current_player == 1 else "백"
+    solver = ThreatSolver(engine, max_depth=args.depth, time_limit=args.time)
+    start = time.perf_counter()
+    move = solver.solve(vct=args.vct)
+    elapsed = (time.perf_counter() - start) * 1000
+    kind = "VCT" if args.vct else "VCF"
+    if move is None:
+        print(f"{player}: {kind} 없음 ({solver.nodes} 노드, {elapsed:.1f}ms)")
+        defences = solver.defences()
+        if defences is not None:
+            print(f"상대 VCF를 막는 수: {defences}")
+    else:
+        print(f"{player}: {kind} 승리 {move} ({solver.nodes} 노드, {elapsed:.1f}ms)")
+        print(f"수순: {solver.principal_line(args.vct)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import numpy as np
+
+from gomoku_engine import CANDIDATE_RADIUS, DIRECTIONS, WIN_LENGTH
+
+REACH = WIN_LENGTH - 1
+WALL = 3  # 보드 밖
+
+# evaluate_direction 점수표: [min(연속 수, 5) * 3 + 막힌 끝 수]
+DIRECTION_TABLE = np.zeros(6 * 3, dtype=np.int64)
+DIRECTION_TABLE[5 * 3:] = 10000
+DIRECTION_TABLE[4 * 3] = 1000
+DIRECTION_TABLE[3 * 3] = 100
+DIRECTION_TABLE[2 * 3] = 10
+
+
+def _pad(boards):
+    """마지막 두 축 둘레에 벽을 REACH칸씩 두른 배열"""
+    pad = [(0, 0)] * (boards.ndim - 2) + [(REACH, REACH), (REACH, REACH)]
+    return np.pad(boards, pad, constant_values=WALL)
+
+
+def _shifted(padded, n, dx, dy, k):
+    """각 칸에서 (dx, dy) 방향으로 k칸 떨어진 값 (..., n, n)"""
+    x0 = REACH + dx * k
+    y0 = REACH + dy * k
+    return padded[..., x0:x0 + n, y0:y0 + n]
+
+
+def _player_array(player, boards):
+    """player를 보드 축에 맞게 브로드캐스트 (스칼라 또는 보드별 배열)"""
+    player = np.asarray(player)
+    if player.ndim:
+        player = player.reshape(player.shape + (1, 1))
+    return player
+
+
+def direction_scores(boards, player):
+    """모든 칸에 대해 evaluate_direction(x, y, player)를 한 번에 계산
+
+    boards: (..., n, n) 배열 (0: 빈 칸, 1: 흑, 2: 백)
+    player: 1/2 또는 보드별 배열 (...,)
+    가운데 칸 값은 쓰지 않으므로 빈 칸에서는 그 칸에 player의 돌을 놓았다고 본 점수다.
+    """
+    boards = np.asarray(boards)
+    n = boards.shape[-1]
+    padded = _pad(boards)
+    player = _player_array(player, boards)
+    total = np.zeros(boards.shape, dtype=np.int64)
+
+    for dx, dy in DIRECTIONS:
+        # 점수표 인덱스 연속 수 * 3 + 막힌 끝 수를 int8 하나로 바로 셈
+        index = np.full(boards.shape, 3, dtype=np.int8)
+        for sign in (1, -1):
+            running = np.ones(boards.shape, dtype=bool)  # 지금까지 player 돌이 이어짐
+            for k in range(1, REACH + 1):
+                cell = _shifted(padded, n, dx * sign, dy * sign, k)
+                same = cell == player
+                # 처음 끊긴 칸이 상대 돌이나 벽이면 막힘
+                index += running & ~same & (cell != 0)
+                running &= same
+                index += running * np.int8(3)
+
+        # 점수 계산 (evaluate_direction과 같은 규칙, 5목 이상은 모두 마지막 칸들과 같은 점수)
+        total += DIRECTION_TABLE[np.minimum(index, len(DIRECTION_TABLE) - 1)]
+    return total
+
+
+def position_score_map(boards, player):
+    """모든 빈 칸의 evaluate_position 점수 (공격 * 2 + 방어), 돌이 있는 칸은 -1"""
+    boards = np.asarray(boards)
+    player = np.asarray(player)
+    opponent = 3 - player
+    scores = direction_scores(boards, player) * 2 + direction_scores(boards, opponent)
+    return np.where(boards == 0, scores, -1)
+
+
+def medium_priority_map(boards):
+    """모든 빈 칸의 "중" 난이도 점수 (중앙 7x7 +10, 주변 8칸의 돌마다 +1), 돌이 있는 칸은 -1"""
+    boards = np.asarray(boards)
+    n = boards.shape[-1]
+    center = n // 2
+    stones = np.pad(boards != 0, [(0, 0)] * (boards.ndim - 2) + [(1, 1), (1, 1)]).astype(np.int64)
+    neighbors = sum(stones[..., 1 + dx:1 + dx + n, 1 + dy:1 + dy + n]
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+    near_center = np.zeros((n, n), dtype=np.int64)
+    near_center[max(0, center - 3):center + 4, max(0, center - 3):center + 4] = 10
+    return np.where(boards == 0, neighbors + near_center, -1)
+
+
+def candidate_mask(boards, radius=CANDIDATE_RADIUS):
+    """CandidateSet과 같은 후보 칸 (돌에서 radius칸 안의 빈 칸), 돌이 없는 보드는 가운데만"""
+    boards = np.asarray(boards)
+    n = boards.shape[-1]
+    stones = boards != 0
+    # 가로, 세로로 한 번씩 넓히면 (2 * radius + 1)^2 정사각형 안에 돌이 있는 칸
+    pad = [(0, 0)] * (boards.ndim - 2) + [(radius, radius), (0, 0)]
+    padded = np.pad(stones, pad)
+    near = np.zeros(boards.shape, dtype=bool)
+    for d in range(2 * radius + 1):
+        near |= padded[..., d:d + n, :]
+    padded = np.pad(near, pad[:-2] + [(0, 0), (radius, radius)])
+    near = np.zeros(boards.shape, dtype=bool)
+    for d in range(2 * radius + 1):
+        near |= padded[..., d:d + n]
+    mask = near & ~stones
+    mask[..., n // 2, n // 2] |= ~stones.any(axis=(-2, -1))
+    return mask
+
+
+def current_players(boards):
+    """보드별 둘 차례 (흑 돌이 백 돌보다 많으면 2, 아니면 1)"""
+    boards = np.asarray(boards)
+    black = np.count_nonzero(boards == 1, axis=(-2, -1))
+    white = np.count_nonzero(boards == 2, axis=(-2, -1))
+    return 1 + (black > white)
+
+
+def choose_moves(boards, difficulty="중", players=None, rng=None):
+    """보드 묶음 (..., n, n)의 보드마다 AI 수 하나를 한 번에 골라 (..., 2) 배열 (x, y)로 반환
+
+    하: 무작위 빈 칸
+    중: GomokuEngine.medium_move와 같은 규칙 (점수 상위 5칸 중 무작위)
+    상: 탐색 없는 상 (GomokuEngine.hard_move와 같은 점수로 후보 칸 중 최고점)
+        알파베타 탐색과 정석은 보드마다 따로 해야 하므로 묶음에서는 쓰지 않는다.
+    players는 1/2 또는 보드별 배열이고, 없으면 돌 수로 정한다 (상만 사용).
+    rng는 NumPy Generator이다. 빈 칸이 없는 보드는 (-1, -1), 이미 끝난 대국은 넣지 않는다.
+    """
+    boards = np.asarray(boards)
+    n = boards.shape[-1]
+    cell_count = n * n
+    flat_shape = boards.shape[:-2] + (cell_count,)
+    if rng is None:
+        rng = np.random.default_rng()
+    empty = (boards == 0).reshape(flat_shape)
+
+    if difficulty == "하":
+        cells = np.where(empty, rng.random(flat_shape), -1.0).argmax(axis=-1)
+    elif difficulty == "중":
+        # (점수, x, y) 내림차순 정렬 순서를 정수 하나로 (돌이 있는 칸은 음수)
+        keys = medium_priority_map(boards).reshape(flat_shape) * cell_count + np.arange(cell_count)
+        top = min(5, cell_count)
+        best = -np.sort(-np.partition(keys, cell_count - top, axis=-1)[..., -top:], axis=-1)
+        count = np.minimum(empty.sum(axis=-1), top)
+        pick = (rng.random(count.shape) * count).astype(np.int64)
+        cells = np.take_along_axis(best, pick[..., None], axis=-1)[..., 0] % cell_count
+    else:
+        if players is None:
+            players = current_players(boards)
+        scores = position_score_map(boards, players).reshape(flat_shape)
+        mask = candidate_mask(boards).reshape(flat_shape)
+        cells = np.where(mask, scores, -2).argmax(axis=-1)
+
+    moves = np.stack(np.divmod(cells, n), axis=-1)
+    moves[~empty.any(axis=-1)] = -1
+    return moves
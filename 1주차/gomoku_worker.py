@@ -0,0 +1,117 @@
+import threading
+
+from gomoku_search import AlphaBetaSearch, SearchProgress, principal_variation
+
+
+class AIWorker:
+    """AI 수 계산을 백그라운드 스레드에서 실행 (화면 루프는 poll로 결과 확인)
+
+    엔진 복사본에서 계산하므로 계산 중에도 화면은 원래 엔진을 그대로 읽을 수 있다.
+    """
+    thread_name = "gomoku-ai"
+
+    def __init__(self):
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.progress = SearchProgress()
+        self.lock = threading.Lock()
+        self.job = 0
+        self.result = None          # (작업 번호, 수순 길이, 수, 탐색 결과)
+
+    @property
+    def busy(self):
+        """계산 중인지 여부"""
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, engine, difficulty, player, time_limit):
+        """현재 국면에서 AI 수 계산 시작"""
+        def compute(snapshot, stop_event, progress):
+            move = snapshot.choose_move(difficulty, player, time_limit=time_limit,
+                                        stop_event=stop_event, progress=progress)
+            return move, snapshot.last_search
+
+        self._start(engine, compute)
+
+    def _start(self, engine, compute):
+        """엔진 복사본에서 compute(복사본, 중단 이벤트, 진행 상황) -> (수, 탐색 결과)를 스레드로 실행"""
+        self.cancel()
+        with self.lock:
+            self.job += 1
+            job = self.job
+            self.result = None
+        self.stop_event = threading.Event()
+        self.progress = SearchProgress()
+        snapshot = engine.copy()
+        stop_event, progress = self.stop_event, self.progress
+
+        root_length = len(snapshot.history)
+
+        def run():
+            try:
+                move, search_result = compute(snapshot, stop_event, progress)
+            except Exception as e:
+                # 스레드가 조용히 죽으면 화면 루프가 매 프레임 새 계산을 시작하므로 대신할 결과를 남김
+                while len(snapshot.history) > root_length:
+                    snapshot.undo()
+                move, search_result = self.fallback(snapshot, e)
+            with self.lock:
+                if job == self.job and not stop_event.is_set():
+                    self.result = (job, len(snapshot.history), move, search_result)
+
+        self.thread = threading.Thread(target=run, name=self.thread_name, daemon=True)
+        self.thread.start()
+
+    def fallback(self, snapshot, error):
+        """계산 중 예외가 나면 대신 둘 (수, 탐색 결과): 중 난이도 수"""
+        print(f"AI 계산 실패: {error!r}, 중 난이도 수로 대신 둠")
+        return snapshot.medium_move(), None
+
+    def poll(self, engine):
+        """계산이 끝났으면 (수, 탐색 결과), 아니면 None. 국면이 바뀌었으면 결과를 버림."""
+        with self.lock:
+            result, self.result = self.result, None
+        if result is None:
+            return None
+        _, history_length, move, search_result = result
+        if history_length != len(engine.history) or move is None:
+            return None
+        return move, search_result
+
+    def cancel(self):
+        """계산 중단 (결과는 버림)"""
+        with self.lock:
+            self.job += 1
+            self.result = None
+        self.stop_event.set()
+        if self.thread is not None:
+            # 탐색과 강제승 탐색은 노드마다 중단 요청을 확인하므로 곧 끝난다
+            self.thread.join()
+            self.thread = None
+
+
+class AnalysisWorker(AIWorker):
+    """힌트용 분석: 현재 국면을 짧게 탐색하고 치환표를 따라 예상 수순을 만듦
+
+    poll 결과의 수 자리에는 예상 수순 [(x, y)]이 온다. 강제승 탐색과 정석은 건너뛰어
+    cancel이 다음 노드에서 바로 끝나므로, AI가 생각을 시작하기 전에 멈추면 AI 응답 시간에 영향이 없다.
+    치환표는 원래 엔진과 공유하므로 분석한 결과는 이어지는 AI 탐색에도 쓰인다.
+    """
+    thread_name = "gomoku-analysis"
+
+    def start(self, engine, time_limit, length=8):
+        """현재 국면 분석 시작"""
+        def compute(snapshot, stop_event, progress):
+            tt = snapshot.get_transposition_table()
+            search = AlphaBetaSearch(snapshot, transposition_table=tt,
+                                     stop_event=stop_event, progress=progress)
+            result = search.search(time_limit)
+            if stop_event.is_set():
+                return None, result
+            return principal_variation(snapshot, result.move, tt, length), result
+
+        self._start(engine, compute)
+
+    def fallback(self, snapshot, error):
+        """분석 중 예외가 나면 예상 수순 없이 끝냄 (같은 국면은 다시 분석하지 않음)"""
+        print(f"힌트 분석 실패: {error!r}")
+        return [], None